@@ -44,8 +44,12 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'my_app.metrics.MetricsMiddleware',
+    'my_app.timing.ServerTimingMiddleware',
+    'my_app.slow_queries.SlowQueryMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    'my_app.snapshots.SnapshotMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -100,6 +104,31 @@ else:
     }
 
 
+# Cache
+# https://docs.djangoproject.com/en/6.0/topics/cache/
+# The 'api' cache holds rendered list responses; model signals purge the
+# entries a write affects, but only in the cache the writing process can see.
+# The default file-based cache under API_CACHE_LOCATION is shared by every
+# worker on the host (see my_app/cache_backends.py). With several hosts use
+# Redis or Memcached, whose incr() is atomic. A LocMemCache is per process:
+# other workers keep serving their copy, ETag included, for up to
+# API_CACHE_TIMEOUT seconds after a write.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'api': {
+        'BACKEND': os.environ.get('API_CACHE_BACKEND', 'my_app.cache_backends.FileBasedCache'),
+        'LOCATION': os.environ.get('API_CACHE_LOCATION', str(BASE_DIR / 'api_cache')),
+        'TIMEOUT': int(os.environ.get('API_CACHE_TIMEOUT', '300')),
+        'OPTIONS': {
+            'MAX_ENTRIES': 2000,
+        },
+    },
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
 
@@ -145,3 +174,104 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 # Media files
 MEDIA_URL = 'media/'
 MEDIA_ROOT = BASE_DIR / 'media'
+
+# Processes that render resized copies of uploaded images (see my_app/images.py).
+# 0 renders them in the request process right after commit.
+IMAGE_DERIVATIVE_WORKERS = int(os.environ.get('IMAGE_DERIVATIVE_WORKERS', '2'))
+
+# Resumable uploads (see my_app/uploads.py). Chunks are appended to part files
+# in CHUNKED_UPLOAD_DIR, which should be on the same filesystem as MEDIA_ROOT so
+# finalizing is a rename. Unfinished uploads expire after the given hours.
+CHUNKED_UPLOAD_DIR = Path(os.environ.get('CHUNKED_UPLOAD_DIR', BASE_DIR / 'upload_chunks'))
+CHUNKED_UPLOAD_MAX_SIZE = int(os.environ.get('CHUNKED_UPLOAD_MAX_SIZE', str(50 * 1024 * 1024)))
+CHUNKED_UPLOAD_MAX_CHUNK = 8 * 1024 * 1024
+CHUNKED_UPLOAD_EXPIRY_HOURS = int(os.environ.get('CHUNKED_UPLOAD_EXPIRY_HOURS', '24'))
+
+# Contact form intake (see my_app/contact_spool.py). 'spool' acknowledges
+# submissions with 202 after appending them to a SQLite journal; each web
+# process flushes it into the database every CONTACT_SPOOL_FLUSH_INTERVAL
+# seconds (0 leaves that to `manage.py flush_contact_spool --interval`).
+# 'direct' inserts on the request thread.
+CONTACT_INTAKE = os.environ.get('CONTACT_INTAKE', 'direct')
+CONTACT_SPOOL_PATH = Path(os.environ.get('CONTACT_SPOOL_PATH', BASE_DIR / 'contact_spool.sqlite3'))
+CONTACT_SPOOL_FLUSH_INTERVAL = float(os.environ.get('CONTACT_SPOOL_FLUSH_INTERVAL', '2'))
+
+# Write rate limits (see my_app/throttling.py). Each rate is a token bucket:
+# '<scope>' per client address and endpoint, '<scope>_endpoint' per endpoint
+# for all clients together. Views pick a scope with `throttle_scope`; the
+# rest use 'write'. Buckets are kept in RATE_LIMIT_STORE, shared by every
+# worker on the host. NUM_PROXIES is the number of reverse proxies in front
+# of the app; each appends the address it saw to X-Forwarded-For, so the
+# client is the entry that many places from the end. With 0 the client is
+# REMOTE_ADDR and X-Forwarded-For is ignored.
+REST_FRAMEWORK = {
+    'NUM_PROXIES': int(os.environ.get('NUM_PROXIES', '0')),
+    'DEFAULT_THROTTLE_CLASSES': ['my_app.throttling.WriteRateThrottle'],
+    'DEFAULT_THROTTLE_RATES': {
+        'write': '60/min',
+        'write_endpoint': '600/min',
+        'contact': '5/min',
+        'contact_endpoint': '120/min',
+        'uploads': '600/min',
+        'uploads_endpoint': '6000/min',
+    },
+}
+RATE_LIMITS_ENABLED = os.environ.get('RATE_LIMITS_ENABLED', 'True').lower() == 'true'
+RATE_LIMIT_STORE = Path(os.environ.get('RATE_LIMIT_STORE', BASE_DIR / 'rate_limits.sqlite3'))
+
+# Static snapshot of the public API (see my_app/snapshots.py), published with
+# `manage.py publish_snapshot` and then kept up to date on every save.
+# SnapshotMiddleware serves it at API_SNAPSHOT_URL, e.g. /api-snapshot/pages/
+# for /api/pages/, without running a view or a query.
+API_SNAPSHOT_ROOT = Path(os.environ.get('API_SNAPSHOT_ROOT', BASE_DIR / 'api_snapshot'))
+API_SNAPSHOT_URL = '/api-snapshot/'
+# Origin the snapshot's absolute URLs (image links) point at, since it is
+# rendered outside any request. Its host must be in ALLOWED_HOSTS.
+API_SNAPSHOT_BASE_URL = os.environ.get('API_SNAPSHOT_BASE_URL', 'https://nikstavr46.pythonanywhere.com')
+API_SNAPSHOT_MAX_AGE = 60
+# Saves are published by a background thread in batches, this many seconds
+# after the first queued change; 0 publishes on the saving thread.
+API_SNAPSHOT_PUBLISH_DELAY = float(os.environ.get('API_SNAPSHOT_PUBLISH_DELAY', '2'))
+
+# Per-request timings (see my_app/timing.py). This share of requests gets a
+# Server-Timing header with db, serialize and render time and a JSON line on
+# the my_app.timing logger; the rest skip the instrumentation entirely.
+SERVER_TIMING_SAMPLE_RATE = float(os.environ.get('SERVER_TIMING_SAMPLE_RATE', '0.05'))
+
+# Prometheus metrics (see my_app/metrics.py), served at /metrics. Each worker
+# adds its counts to the SQLite file at METRICS_STORE every
+# METRICS_FLUSH_INTERVAL seconds (0 flushes only when /metrics is scraped), so
+# a scrape of any worker covers them all.
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'True').lower() == 'true'
+METRICS_STORE = Path(os.environ.get('METRICS_STORE', BASE_DIR / 'metrics.sqlite3'))
+METRICS_FLUSH_INTERVAL = float(os.environ.get('METRICS_FLUSH_INTERVAL', '5'))
+# Bearer token a Prometheus scraper sends (`authorization` in its scrape
+# config); staff users can read /metrics without it. Empty allows staff only.
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
+# Slow-query log (see my_app/slow_queries.py). Statements run by my_app views
+# that take SLOW_QUERY_THRESHOLD_MS or longer are logged with their plan on
+# the my_app.slow_queries logger and totalled by fingerprint in
+# SLOW_QUERY_STORE; `manage.py slow_queries` lists the worst. With
+# SLOW_QUERY_EXPLAIN_ANALYZE, Postgres plans come from EXPLAIN (ANALYZE,
+# BUFFERS), which runs the slow SELECT again.
+SLOW_QUERY_LOG_ENABLED = os.environ.get('SLOW_QUERY_LOG_ENABLED', 'True').lower() == 'true'
+SLOW_QUERY_THRESHOLD_MS = float(os.environ.get('SLOW_QUERY_THRESHOLD_MS', '100'))
+SLOW_QUERY_EXPLAIN_ANALYZE = os.environ.get('SLOW_QUERY_EXPLAIN_ANALYZE', 'False').lower() == 'true'
+SLOW_QUERY_STORE = Path(os.environ.get('SLOW_QUERY_STORE', BASE_DIR / 'slow_queries.sqlite3'))
+
+# Rate limits, timings, metrics and the slow-query log are off in tests unless
+# a test turns them on (see backend/test_runner.py).
+TEST_RUNNER = 'backend.test_runner.TestRunner'
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'my_app.timing': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+        'my_app.slow_queries': {'handlers': ['console'], 'level': 'WARNING', 'propagate': False},
+    },
+}
@@ -0,0 +1,33 @@
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class TestRunner(DiscoverRunner):
+    """
+    Runs the suite with the per-request instrumentation and rate limits off.
+    The suite shares one client address and asserts on exact query counts
+    and log output, so tests that need one of these turn it back on with
+    override_settings. The shared API response cache is pointed at a
+    directory of its own so runs never see each other's entries.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.api_cache_dir = tempfile.mkdtemp(prefix='api_cache.')
+        self.instrumentation = override_settings(
+            CACHES={**settings.CACHES, 'api': {**settings.CACHES['api'], 'LOCATION': self.api_cache_dir}},
+            RATE_LIMITS_ENABLED=False,
+            SERVER_TIMING_SAMPLE_RATE=0.0,
+            METRICS_ENABLED=False,
+            SLOW_QUERY_LOG_ENABLED=False,
+        )
+        self.instrumentation.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.instrumentation.disable()
+        shutil.rmtree(self.api_cache_dir, ignore_errors=True)
+        super().teardown_test_environment(**kwargs)
@@ -18,10 +18,12 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
+from my_app.metrics import MetricsView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('my_app.urls')),
+    path('metrics', MetricsView.as_view(), name='metrics'),
 ]
 
 if settings.DEBUG:
@@ -3,3 +3,11 @@ from django.apps import AppConfig
 
 class MyAppConfig(AppConfig):
     name = 'my_app'
+
+    def ready(self):
+        from . import contact_spool, signals  # noqa: F401
+
+        # Flush what a previous process left in the spool without waiting
+        # for the next submission.
+        if contact_spool.is_enabled():
+            contact_spool.ensure_flusher()
@@ -0,0 +1,205 @@
+"""
+Async variants of the public read endpoints, mounted under /api/async/.
+
+They take the same query parameters and return the same bodies, validators
+and cursors as the views in views.py, but read through the async ORM so an
+ASGI server can park a slow client on the event loop instead of holding a
+worker thread for it. Writes stay on the sync views. These views are not
+wrapped in `cache_response`: the cache backend is synchronous, and the point
+of this path is to avoid blocking calls on the loop.
+"""
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from django.views import View
+from rest_framework import serializers, status
+from rest_framework.exceptions import APIException
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from . import timing
+from .conditional import Validators
+from .models import Page, MediaItem, EventGallery
+from .pagination import KeysetPagination
+from .serializers import (
+    PageSerializer, ClassSectionSerializer, NewsPostSerializer, SocialLinkSerializer,
+    MediaItemSerializer, EventGallerySerializer, EventGalleryWithMediaSerializer
+)
+from .views import exclude_pages, gallery_includes, page_exclusions, published_media_prefetch
+
+
+class AsyncReadView(View):
+    """Base for the async reads: handlers get a DRF Request, and API errors are rendered as JSON."""
+    http_method_names = ['get', 'head', 'options']
+    renderer = JSONRenderer()
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            return await super().dispatch(Request(request), *args, **kwargs)
+        except APIException as exc:
+            detail = exc.detail if isinstance(exc.detail, (dict, list)) else {'detail': exc.detail}
+            return self.render(detail, exc.status_code)
+
+    def render(self, data, status_code=status.HTTP_200_OK):
+        with timing.phase('render'):
+            body = self.renderer.render(data)
+        response = HttpResponse(body, status=status_code, content_type='application/json')
+        patch_vary_headers(response, ('Accept',))
+        return response
+
+
+class AsyncListView(AsyncReadView):
+    serializer_class = None
+    ordering = ('-created_at', 'id')
+
+    def get_queryset(self, request):
+        return self.serializer_class.Meta.model.objects.all()
+
+    def get_related(self, request, queryset):
+        return ()
+
+    def get_serializer_class(self, request):
+        return self.serializer_class
+
+    async def get(self, request):
+        serializer_class = self.get_serializer_class(request)
+        queryset = self.get_queryset(request)
+        related = self.get_related(request, queryset)
+        selection = serializer_class.get_sparse_fieldset(request)
+        queryset = serializer_class.restrict_queryset(queryset, selection, required=self.ordering)
+        validators = await Validators.afor_queryset(request, queryset, *related)
+        not_modified = validators.check(request)
+        if not_modified is not None:
+            return not_modified
+        paginator = KeysetPagination(self.ordering)
+        page = await paginator.apaginate_queryset(queryset, request, view=self)
+        if page is not None:
+            serializer = serializer_class(page, many=True, **selection)
+            return validators.apply(self.render(paginator.get_paginated_response(serializer.data).data))
+        rows = [row async for row in queryset.order_by(*self.ordering)]
+        serializer = serializer_class(rows, many=True, **selection)
+        return validators.apply(self.render(serializer.data))
+
+
+class AsyncObjectView(AsyncReadView):
+    """Detail or by-slug read; the URL keyword (`pk` or `slug`) is the lookup."""
+    serializer_class = None
+
+    def get_queryset(self, request):
+        return self.serializer_class.Meta.model.objects.all()
+
+    def get_validators(self, request, obj):
+        return Validators.for_object(request, obj)
+
+    def get_serializer_class(self, request):
+        return self.serializer_class
+
+    async def get(self, request, **lookup):
+        queryset = self.get_queryset(request)
+        try:
+            obj = await queryset.aget(**lookup)
+        except queryset.model.DoesNotExist:
+            return HttpResponse(status=status.HTTP_404_NOT_FOUND)
+        validators = self.get_validators(request, obj)
+        not_modified = validators.check(request)
+        if not_modified is not None:
+            return not_modified
+        serializer = self.get_serializer_class(request)(obj)
+        return validators.apply(self.render(serializer.data))
+
+
+class AsyncPageListView(AsyncListView):
+    serializer_class = PageSerializer
+    ordering = ('order', 'id')
+
+    def get_queryset(self, request):
+        return exclude_pages(Page.objects.all(), page_exclusions(request))
+
+
+class AsyncPageView(AsyncObjectView):
+    serializer_class = PageSerializer
+
+
+class AsyncClassSectionListView(AsyncListView):
+    serializer_class = ClassSectionSerializer
+    ordering = ('order', 'id')
+
+
+class AsyncClassSectionView(AsyncObjectView):
+    serializer_class = ClassSectionSerializer
+
+
+class AsyncNewsPostListView(AsyncListView):
+    serializer_class = NewsPostSerializer
+    ordering = ('-published_at', 'id')
+
+
+class AsyncNewsPostView(AsyncObjectView):
+    serializer_class = NewsPostSerializer
+
+
+class AsyncSocialLinkListView(AsyncListView):
+    serializer_class = SocialLinkSerializer
+    ordering = ('order', 'id')
+
+
+class AsyncSocialLinkView(AsyncObjectView):
+    serializer_class = SocialLinkSerializer
+
+
+class AsyncMediaItemListView(AsyncListView):
+    serializer_class = MediaItemSerializer
+
+    def get_queryset(self, request):
+        items = MediaItem.objects.all()
+        event = request.query_params.get('event')
+        if event is not None:
+            if not event.isdigit():
+                raise serializers.ValidationError({'event': 'A valid integer is required.'})
+            items = items.filter(event_id=int(event))
+        return items
+
+
+class AsyncMediaItemView(AsyncObjectView):
+    serializer_class = MediaItemSerializer
+
+
+class AsyncEventGalleryListView(AsyncListView):
+    serializer_class = EventGallerySerializer
+
+    def get_serializer_class(self, request):
+        if 'media_items' in gallery_includes(request):
+            return EventGalleryWithMediaSerializer
+        return EventGallerySerializer
+
+    def get_queryset(self, request):
+        galleries = EventGallery.objects.all()
+        if 'media_items' in gallery_includes(request):
+            galleries = galleries.prefetch_related(published_media_prefetch(request))
+        return galleries
+
+    def get_related(self, request, queryset):
+        if 'media_items' in gallery_includes(request):
+            return (MediaItem.published.filter(event__in=EventGallery.objects.all()),)
+        return ()
+
+
+class AsyncEventGalleryView(AsyncObjectView):
+    serializer_class = EventGallerySerializer
+
+
+class AsyncEventGalleryBySlugView(AsyncObjectView):
+    def get_queryset(self, request):
+        galleries = EventGallery.objects.all()
+        if 'media_items' in gallery_includes(request):
+            galleries = galleries.prefetch_related(published_media_prefetch(request))
+        return galleries
+
+    def get_validators(self, request, obj):
+        if 'media_items' in gallery_includes(request):
+            return Validators.for_objects(request, obj._meta.label, [obj, *obj.published_media_items])
+        return Validators.for_object(request, obj)
+
+    def get_serializer_class(self, request):
+        if 'media_items' in gallery_includes(request):
+            return EventGalleryWithMediaSerializer
+        return EventGallerySerializer
@@ -0,0 +1,454 @@
+"""
+Endpoint benchmark suite.
+
+`seed(rows)` fills the tables with a synthetic dataset: `rows` news posts,
+media items and contact messages, and a thousandth as many (at least ten)
+pages, class sections, social links and galleries. `run()` sends every
+scenario in SCENARIOS through the test client and records p50/p95 latency,
+query count, response bytes and peak traced memory per endpoint. Writes are
+measured like reads, so callers run everything in a transaction that is
+rolled back and under `isolated_settings()`.
+
+`compare(results, baseline)` lists the measurements that are worse than a
+baseline by more than the allowed margins.
+"""
+import io
+import itertools
+import math
+import os
+import statistics
+import time
+import tracemalloc
+from collections import namedtuple
+from functools import cache
+
+from PIL import Image
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from . import response_cache, search, uploads, urls
+from .models import Page, ClassSection, NewsPost, ContactMessage, SocialLink, MediaItem, EventGallery, ChunkedUpload
+
+METHODS = ('get', 'post', 'put', 'patch', 'delete')
+WORDS = (
+    'ballet hip hop jazz contemporary latin salsa tango waltz street beginner advanced kids adults '
+    'workshop summer recital show studio rehearsal technique rhythm choreography performance'
+).split()
+IMAGE_NAME = 'benchmark/photo-320w.jpg'
+Scenario = namedtuple('Scenario', 'name url_name method build')
+
+
+@cache
+def jpeg():
+    """A small photo for the upload and image variant scenarios."""
+    buffer = io.BytesIO()
+    Image.new('RGB', (320, 240), 'purple').save(buffer, 'JPEG')
+    return buffer.getvalue()
+
+
+def isolated_settings(root):
+    """Settings that keep a run's files, cache entries, rate limits and metrics away from the real ones."""
+    return override_settings(
+        MEDIA_ROOT=os.path.join(root, 'media'),
+        CHUNKED_UPLOAD_DIR=os.path.join(root, 'chunks'),
+        METRICS_STORE=os.path.join(root, 'metrics.sqlite3'),
+        METRICS_FLUSH_INTERVAL=0,
+        SLOW_QUERY_LOG_ENABLED=False,
+        IMAGE_DERIVATIVE_WORKERS=0,
+        CONTACT_INTAKE='direct',
+        RATE_LIMITS_ENABLED=False,
+        ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+        CACHES={
+            **settings.CACHES,
+            'api': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'benchmark'},
+        },
+    )
+
+
+class Dataset:
+    """What the scenarios address: a few seeded rows of each model, and fresh names for writes."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.small = max(10, rows // 1000)
+        self.serial = itertools.count()
+        self.ids = {}
+
+    def unique(self, prefix):
+        return f'{prefix}-{next(self.serial)}'
+
+    def text(self, i, words):
+        return ' '.join(WORDS[(i * 7 + n) % len(WORDS)] for n in range(words))
+
+    def new_upload(self, complete=False):
+        upload = ChunkedUpload.objects.create(filename='photo.jpg', size=len(jpeg()))
+        uploads.create_part(upload)
+        if complete:
+            upload = uploads.append_chunk(upload.pk, 0, io.BytesIO(jpeg()), len(jpeg()))
+        return upload
+
+
+def seed(rows, batch_size=5000):
+    """Create the synthetic dataset and return its Dataset."""
+    data = Dataset(rows)
+    now = timezone.now()
+    srcset = {'320w': {'image/jpeg': [default_storage.save(IMAGE_NAME, ContentFile(jpeg())), len(jpeg())]}}
+
+    Page.objects.bulk_create(
+        Page(title=f'Page {i}', slug=f'bench-page-{i}', content=data.text(i, 200), order=i + 1,
+             is_published=i % 10 != 0)
+        for i in range(data.small)
+    )
+    ClassSection.objects.bulk_create(
+        ClassSection(name=f'Class {i}', slug=f'bench-class-{i}', description=data.text(i, 60), age_group='Kids',
+                     level='Beginner', schedule='Mon 17:00', order=i + 1, is_active=i % 10 != 0)
+        for i in range(data.small)
+    )
+    SocialLink.objects.bulk_create(
+        SocialLink(platform=f'Network {i}', url=f'https://example.com/{i}', order=i + 1, is_active=i % 10 != 0)
+        for i in range(data.small)
+    )
+    EventGallery.objects.bulk_create(
+        EventGallery(title=f'Gallery {i}', slug=f'bench-gallery-{i}', excerpt=data.text(i, 12))
+        for i in range(data.small)
+    )
+    gallery_ids = list(EventGallery.objects.order_by('pk').values_list('pk', flat=True))
+    NewsPost.objects.bulk_create(
+        (
+            NewsPost(title=data.text(i, 5).capitalize(), slug=f'bench-post-{i}', body=data.text(i, 150),
+                     image=IMAGE_NAME, image_srcset=srcset, published_at=now, is_published=i % 10 != 0)
+            for i in range(rows)
+        ),
+        batch_size=batch_size,
+    )
+    MediaItem.objects.bulk_create(
+        (
+            MediaItem(media_type='photo', title=f'Photo {i}', image=IMAGE_NAME, image_srcset=srcset,
+                      event_id=gallery_ids[i % len(gallery_ids)], is_published=i % 10 != 0)
+            if i % 4 else
+            MediaItem(media_type='video', title=f'Video {i}', video_url=f'https://example.com/v/{i}')
+            for i in range(rows)
+        ),
+        batch_size=batch_size,
+    )
+    ContactMessage.objects.bulk_create(
+        (
+            ContactMessage(name=f'Sender {i}', email=f'sender{i}@example.com', subject='Enrolment',
+                           message=data.text(i, 80))
+            for i in range(rows)
+        ),
+        batch_size=batch_size,
+    )
+    try:
+        search.rebuild()
+    except search.SearchNotSupported:
+        pass
+
+    for model in (Page, ClassSection, NewsPost, ContactMessage, SocialLink, EventGallery):
+        data.ids[model] = list(model.objects.order_by('pk').values_list('pk', flat=True)[:50])
+    data.ids[MediaItem] = list(MediaItem.objects.filter(media_type='photo').order_by('pk').values_list('pk', flat=True)[:50])
+    data.page = Page.objects.get(pk=data.ids[Page][1])
+    data.section = ClassSection.objects.get(pk=data.ids[ClassSection][1])
+    data.post = NewsPost.objects.get(pk=data.ids[NewsPost][1])
+    data.gallery = EventGallery.objects.get(pk=data.ids[EventGallery][1])
+    data.upload = data.new_upload()
+    return data
+
+
+def url(name, **kwargs):
+    return reverse(name, kwargs=kwargs or None)
+
+
+def json_body(data):
+    return {'data': data, 'format': 'json'}
+
+
+def page_fields(data, slug):
+    return {'title': 'Bench page', 'slug': slug, 'content': data.text(1, 200)}
+
+
+def section_fields(data, slug):
+    return {'name': 'Bench class', 'slug': slug, 'description': data.text(2, 60), 'age_group': 'Adults',
+            'level': 'Advanced', 'schedule': 'Tue 19:00'}
+
+
+def post_fields(data, slug):
+    return {'title': 'Bench post', 'slug': slug, 'body': data.text(3, 150), 'published_at': timezone.now().isoformat()}
+
+
+def message_fields(data):
+    return {'name': 'Jo', 'email': 'jo@example.com', 'subject': 'Enrolment', 'message': data.text(4, 80)}
+
+
+def link_fields(data):
+    return {'platform': 'Bench', 'url': 'https://example.com/bench'}
+
+
+def video_fields(data):
+    return {'media_type': 'video', 'title': data.unique('Bench video'), 'video_url': 'https://example.com/v'}
+
+
+def gallery_fields(data, slug):
+    return {'title': 'Bench gallery', 'slug': slug}
+
+
+def fresh(model, **fields):
+    """A row created outside the timed request, for scenarios that delete one."""
+    return model.objects.create(**fields).pk
+
+
+def build_scenarios():
+    scenarios = [
+        # Pages
+        ('page-list', 'get', '', lambda data: (url('page-list'), {})),
+        ('page-list', 'get', '?limit=20', lambda data: (url('page-list'), {'data': {'limit': 20}})),
+        ('page-list', 'post', '', lambda data: (url('page-list'), json_body(page_fields(data, data.unique('new-page'))))),
+        ('page-reorder', 'post', '', lambda data: (url('page-reorder'), json_body({'ids': data.ids[Page][:10][::-1]}))),
+        ('page-by-slug', 'get', '', lambda data: (url('page-by-slug', slug=data.page.slug), {})),
+        ('page-detail', 'get', '', lambda data: (url('page-detail', pk=data.page.pk), {})),
+        ('page-detail', 'put', '', lambda data: (
+            url('page-detail', pk=data.page.pk), json_body(page_fields(data, data.page.slug)))),
+        ('page-detail', 'delete', '', lambda data: (url('page-detail', pk=fresh(
+            Page, title='Doomed', slug=data.unique('doomed-page'), content='Gone')), {})),
+        # Class sections
+        ('class-section-list', 'get', '', lambda data: (url('class-section-list'), {})),
+        ('class-section-list', 'post', '', lambda data: (
+            url('class-section-list'), json_body(section_fields(data, data.unique('new-class'))))),
+        ('class-section-reorder', 'post', '', lambda data: (
+            url('class-section-reorder'), json_body({'ids': data.ids[ClassSection][:10][::-1]}))),
+        ('class-section-by-slug', 'get', '', lambda data: (url('class-section-by-slug', slug=data.section.slug), {})),
+        ('class-section-detail', 'get', '', lambda data: (url('class-section-detail', pk=data.section.pk), {})),
+        ('class-section-detail', 'put', '', lambda data: (
+            url('class-section-detail', pk=data.section.pk), json_body(section_fields(data, data.section.slug)))),
+        ('class-section-detail', 'delete', '', lambda data: (url('class-section-detail', pk=fresh(
+            ClassSection, name='Doomed', slug=data.unique('doomed-class'), description='Gone', age_group='Kids',
+            level='Beginner', schedule='Mon')), {})),
+        # News posts
+        ('news-post-list', 'get', '', lambda data: (url('news-post-list'), {})),
+        ('news-post-list', 'get', '?limit=50', lambda data: (url('news-post-list'), {'data': {'limit': 50}})),
+        ('news-post-list', 'post', '', lambda data: (
+            url('news-post-list'), json_body(post_fields(data, data.unique('new-post'))))),
+        ('news-post-by-slug', 'get', '', lambda data: (url('news-post-by-slug', slug=data.post.slug), {})),
+        ('news-post-detail', 'get', '', lambda data: (url('news-post-detail', pk=data.post.pk), {})),
+        ('news-post-detail', 'put', '', lambda data: (
+            url('news-post-detail', pk=data.post.pk), json_body(post_fields(data, data.post.slug)))),
+        ('news-post-detail', 'delete', '', lambda data: (url('news-post-detail', pk=fresh(
+            NewsPost, title='Doomed', slug=data.unique('doomed-post'), body='Gone', published_at=timezone.now())), {})),
+        ('news-post-image', 'get', '', lambda data: (
+            url('news-post-image', pk=data.post.pk, descriptor='320w'), {'HTTP_ACCEPT': 'image/jpeg'})),
+        # Contact messages
+        ('contact-message-list', 'get', '', lambda data: (url('contact-message-list'), {})),
+        ('contact-message-list', 'get', '?limit=50', lambda data: (url('contact-message-list'), {'data': {'limit': 50}})),
+        ('contact-message-list', 'get', '?stream=true', lambda data: (
+            url('contact-message-list'), {'data': {'stream': 'true'}})),
+        ('contact-message-list', 'post', '', lambda data: (url('contact-message-list'), json_body(message_fields(data)))),
+        ('contact-message-detail', 'get', '', lambda data: (
+            url('contact-message-detail', pk=data.ids[ContactMessage][1]), {})),
+        ('contact-message-detail', 'put', '', lambda data: (
+            url('contact-message-detail', pk=data.ids[ContactMessage][1]), json_body(message_fields(data)))),
+        ('contact-message-detail', 'delete', '', lambda data: (url('contact-message-detail', pk=fresh(
+            ContactMessage, name='Doomed', email='gone@example.com', subject='Gone', message='Gone')), {})),
+        # Social links
+        ('social-link-list', 'get', '', lambda data: (url('social-link-list'), {})),
+        ('social-link-list', 'post', '', lambda data: (url('social-link-list'), json_body(link_fields(data)))),
+        ('social-link-reorder', 'post', '', lambda data: (
+            url('social-link-reorder'), json_body({'ids': data.ids[SocialLink][:10][::-1]}))),
+        ('social-link-detail', 'get', '', lambda data: (url('social-link-detail', pk=data.ids[SocialLink][1]), {})),
+        ('social-link-detail', 'put', '', lambda data: (
+            url('social-link-detail', pk=data.ids[SocialLink][1]), json_body(link_fields(data)))),
+        ('social-link-detail', 'delete', '', lambda data: (url('social-link-detail', pk=fresh(
+            SocialLink, platform='Doomed', url='https://example.com/gone')), {})),
+        # Media items
+        ('media-item-list', 'get', '', lambda data: (url('media-item-list'), {})),
+        ('media-item-list', 'get', '?limit=50', lambda data: (url('media-item-list'), {'data': {'limit': 50}})),
+        ('media-item-list', 'get', '?stream=true', lambda data: (url('media-item-list'), {'data': {'stream': 'true'}})),
+        ('media-item-list', 'get', '?event=<gallery>', lambda data: (url('media-item-list'), {'data': {'event': data.gallery.pk}})),
+        ('media-item-list', 'post', '', lambda data: (url('media-item-list'), json_body(video_fields(data)))),
+        ('media-item-bulk', 'post', '', lambda data: (
+            url('media-item-bulk'), json_body([video_fields(data) for _ in range(50)]))),
+        ('media-item-bulk', 'patch', '', lambda data: (url('media-item-bulk'), json_body(
+            [{'id': pk, 'title': data.unique('Renamed')} for pk in data.ids[MediaItem]]))),
+        ('media-item-bulk', 'delete', '', lambda data: (url('media-item-bulk'), json_body({'ids': [
+            item.pk for item in MediaItem.objects.bulk_create(
+                MediaItem(media_type='video', video_url='https://example.com/gone') for _ in range(50))
+        ]}))),
+        ('media-item-detail', 'get', '', lambda data: (url('media-item-detail', pk=data.ids[MediaItem][1]), {})),
+        ('media-item-detail', 'put', '', lambda data: (url('media-item-detail', pk=fresh(
+            MediaItem, media_type='video', video_url='https://example.com/v')), json_body(video_fields(data)))),
+        ('media-item-detail', 'delete', '', lambda data: (url('media-item-detail', pk=fresh(
+            MediaItem, media_type='video', video_url='https://example.com/gone')), {})),
+        ('media-item-image', 'get', '', lambda data: (
+            url('media-item-image', pk=data.ids[MediaItem][1], descriptor='320w'), {'HTTP_ACCEPT': 'image/jpeg'})),
+        # Chunked uploads
+        ('chunked-upload-list', 'post', '', lambda data: (
+            url('chunked-upload-list'), json_body({'filename': 'photo.jpg', 'size': len(jpeg())}))),
+        ('chunked-upload-detail', 'get', '', lambda data: (url('chunked-upload-detail', pk=data.upload.pk), {})),
+        ('chunked-upload-detail', 'patch', '', lambda data: (url('chunked-upload-detail', pk=data.new_upload().pk), {
+            'data': jpeg(), 'content_type': 'application/offset+octet-stream', 'HTTP_UPLOAD_OFFSET': '0'})),
+        ('chunked-upload-detail', 'delete', '', lambda data: (url('chunked-upload-detail', pk=data.new_upload().pk), {})),
+        ('chunked-upload-finalize', 'post', '', lambda data: (
+            url('chunked-upload-finalize', pk=data.new_upload(complete=True).pk), {})),
+        # Event galleries
+        ('event-gallery-list', 'get', '', lambda data: (url('event-gallery-list'), {})),
+        ('event-gallery-list', 'get', '?include=media_items', lambda data: (
+            url('event-gallery-list'), {'data': {'include': 'media_items', 'media_limit': 12}})),
+        ('event-gallery-list', 'post', '', lambda data: (
+            url('event-gallery-list'), json_body(gallery_fields(data, data.unique('new-gallery'))))),
+        ('event-gallery-by-slug', 'get', '', lambda data: (
+            url('event-gallery-by-slug', slug=data.gallery.slug), {'data': {'include': 'media_items'}})),
+        ('event-gallery-detail', 'get', '', lambda data: (url('event-gallery-detail', pk=data.gallery.pk), {})),
+        ('event-gallery-detail', 'put', '', lambda data: (
+            url('event-gallery-detail', pk=data.gallery.pk), json_body(gallery_fields(data, data.gallery.slug)))),
+        ('event-gallery-detail', 'delete', '', lambda data: (url('event-gallery-detail', pk=fresh(
+            EventGallery, title='Doomed', slug=data.unique('doomed-gallery'))), {})),
+        # Aggregates
+        ('layout-bundle', 'get', '', lambda data: (url('layout-bundle'), {})),
+        ('search', 'get', '', lambda data: (url('search'), {'data': {'q': 'ballet rehearsal'}})),
+        # Async read views
+        ('async-page-list', 'get', '', lambda data: (url('async-page-list'), {})),
+        ('async-page-by-slug', 'get', '', lambda data: (url('async-page-by-slug', slug=data.page.slug), {})),
+        ('async-page-detail', 'get', '', lambda data: (url('async-page-detail', pk=data.page.pk), {})),
+        ('async-class-section-list', 'get', '', lambda data: (url('async-class-section-list'), {})),
+        ('async-class-section-by-slug', 'get', '', lambda data: (
+            url('async-class-section-by-slug', slug=data.section.slug), {})),
+        ('async-class-section-detail', 'get', '', lambda data: (
+            url('async-class-section-detail', pk=data.section.pk), {})),
+        ('async-news-post-list', 'get', '', lambda data: (url('async-news-post-list'), {})),
+        ('async-news-post-by-slug', 'get', '', lambda data: (url('async-news-post-by-slug', slug=data.post.slug), {})),
+        ('async-news-post-detail', 'get', '', lambda data: (url('async-news-post-detail', pk=data.post.pk), {})),
+        ('async-social-link-list', 'get', '', lambda data: (url('async-social-link-list'), {})),
+        ('async-social-link-detail', 'get', '', lambda data: (
+            url('async-social-link-detail', pk=data.ids[SocialLink][1]), {})),
+        ('async-media-item-list', 'get', '', lambda data: (url('async-media-item-list'), {})),
+        ('async-media-item-detail', 'get', '', lambda data: (
+            url('async-media-item-detail', pk=data.ids[MediaItem][1]), {})),
+        ('async-event-gallery-list', 'get', '', lambda data: (url('async-event-gallery-list'), {})),
+        ('async-event-gallery-by-slug', 'get', '', lambda data: (
+            url('async-event-gallery-by-slug', slug=data.gallery.slug), {'data': {'include': 'media_items'}})),
+        ('async-event-gallery-detail', 'get', '', lambda data: (
+            url('async-event-gallery-detail', pk=data.gallery.pk), {})),
+    ]
+    return [
+        Scenario(f'{method.upper()} {url_name}{variant}', url_name, method, build)
+        for url_name, method, variant, build in scenarios
+    ]
+
+
+SCENARIOS = build_scenarios()
+
+
+def routes(patterns=None):
+    """(url name, method) for every route in my_app/urls.py, which SCENARIOS must cover."""
+    found = []
+    for pattern in urls.urlpatterns if patterns is None else patterns:
+        if isinstance(pattern, URLResolver):
+            found.extend(routes(pattern.url_patterns))
+        elif isinstance(pattern, URLPattern):
+            view_class = getattr(pattern.callback, 'view_class', None)
+            found.extend((pattern.name, method) for method in METHODS if hasattr(view_class, method))
+    return found
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile: the p95 of 20 timings is the 19th, not the slowest."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(len(ordered) * fraction) - 1)]
+
+
+def send(client, scenario, path, options):
+    response = getattr(client, scenario.method)(path, **options)
+    body = b''.join(response.streaming_content) if response.streaming else response.content
+    return response, body
+
+
+def measure(client, scenario, data, requests, warm=False):
+    """
+    Latency percentiles over `requests` calls after an untimed warm-up, plus
+    the queries, bytes and peak memory of one more call. Each call's path and
+    body are built first, so rows a scenario creates for it (`fresh()`) are
+    not timed.
+    """
+    send(client, scenario, *scenario.build(data))
+    timings = []
+    for _ in range(requests):
+        if not warm:
+            response_cache.clear()
+        path, options = scenario.build(data)
+        started = time.perf_counter()
+        send(client, scenario, path, options)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    if not warm:
+        response_cache.clear()
+    path, options = scenario.build(data)
+    tracemalloc.start()
+    try:
+        with CaptureQueriesContext(connection) as queries:
+            response, body = send(client, scenario, path, options)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {
+        'path': response.request['PATH_INFO'],
+        'status': response.status_code,
+        'p50_ms': round(statistics.median(timings), 3),
+        'p95_ms': round(percentile(timings, 0.95), 3),
+        'queries': len(queries.captured_queries),
+        'bytes': len(body),
+        'peak_kib': round(peak / 1024, 1),
+    }
+
+
+def run(data, requests=20, only=(), warm=False, progress=None):
+    """{scenario name: measurements} for the scenarios whose name contains any of `only`."""
+    client = APIClient()
+    results = {}
+    for scenario in SCENARIOS:
+        if only and not any(term in scenario.name for term in only):
+            continue
+        results[scenario.name] = measure(client, scenario, data, requests, warm)
+        if progress is not None:
+            progress(scenario.name, results[scenario.name])
+    return results
+
+
+def compare(results, baseline, latency_tolerance=0.5, p95_tolerance=1.0, size_tolerance=0.25,
+            query_slack=0, min_ms=2.0, min_kib=256.0):
+    """
+    Regressions of `results` against `baseline`, both {rows: {scenario: measurements}}.
+
+    Tolerances are allowed growth as a fraction: p50 latency by
+    `latency_tolerance`, p95 (which one slow request moves) by
+    `p95_tolerance`, bytes and peak memory by `size_tolerance`. Latency and
+    memory may always grow by `min_ms`/`min_kib` so noise on fast endpoints
+    does not trip the gate. Query counts may grow by `query_slack`. A changed
+    status is always a regression.
+    """
+    regressions = []
+    for rows, scenarios in results.items():
+        for name, current in scenarios.items():
+            previous = baseline.get(rows, {}).get(name)
+            if previous is None:
+                continue
+            label = f'{name} @ {rows} rows'
+            if current['status'] != previous['status']:
+                regressions.append(f"{label}: status {previous['status']} -> {current['status']}")
+            if current['queries'] > previous['queries'] + query_slack:
+                regressions.append(f"{label}: queries {previous['queries']} -> {current['queries']}")
+            for key, tolerance, floor in (
+                ('p50_ms', latency_tolerance, min_ms),
+                ('p95_ms', p95_tolerance, min_ms),
+                ('bytes', size_tolerance, 0),
+                ('peak_kib', size_tolerance, min_kib),
+            ):
+                limit = max(previous[key] * (1 + tolerance), previous[key] + floor)
+                if current[key] > limit:
+                    regressions.append(f'{label}: {key} {previous[key]} -> {current[key]} (limit {limit:.1f})')
+    return regressions
@@ -0,0 +1,37 @@
+"""
+Cache backends for the 'api' response cache.
+
+response_cache numbers its index slots with incr() and relies on it being
+atomic across workers. Django's FileBasedCache implements incr() and add()
+as a read followed by a write, so two workers can draw the same slot and
+one index entry is lost, leaving its response to go stale. The backend here
+runs both under an flock on the cache directory.
+"""
+import contextlib
+import fcntl
+import os
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.cache.backends.filebased import FileBasedCache as BaseFileBasedCache
+
+LOCK_NAME = '.lock'
+
+
+class FileBasedCache(BaseFileBasedCache):
+    """FileBasedCache shared by every worker on the host, with atomic add() and incr()."""
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        with self._lock():
+            return super().add(key, value, timeout, version)
+
+    def incr(self, key, delta=1, version=None):
+        with self._lock():
+            return super().incr(key, delta, version)
+
+    @contextlib.contextmanager
+    def _lock(self):
+        # The lock file lacks the .djcache suffix, so clear() and culling skip it.
+        self._createdir()
+        with open(os.path.join(self._dir, LOCK_NAME), 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            yield
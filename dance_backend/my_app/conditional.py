@@ -0,0 +1,88 @@
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+
+class Validators:
+    """
+    ETag / Last-Modified for a list or a single object, computed from
+    `updated_at` without touching the serializer.
+
+    A list's version is its row count plus the newest `updated_at`, so
+    inserts, edits and deletes all produce a new ETag. The request path and
+    query string are folded in because they select a different body.
+
+    Only single objects send Last-Modified. Deleting a row from a list does
+    not move its newest `updated_at`, so If-Modified-Since would answer 304
+    for a list that changed.
+    """
+
+    def __init__(self, request, label, marker, updated_at, last_modified=None):
+        self.last_modified = last_modified
+        seed = '|'.join((
+            label,
+            str(marker),
+            updated_at.isoformat() if updated_at else '',
+            request.get_full_path(),
+        ))
+        digest = hashlib.md5(seed.encode('utf-8'), usedforsecurity=False).hexdigest()
+        self.etag = f'W/"{digest}"'
+
+    @classmethod
+    def for_queryset(cls, request, queryset, *related):
+        """
+        Validators for a list. `related` querysets cover rows nested into
+        the response, e.g. the media items of each gallery.
+        """
+        stats = [qs.order_by().aggregate(**cls.list_aggregates()) for qs in (queryset, *related)]
+        return cls.from_stats(request, queryset, related, stats)
+
+    @classmethod
+    async def afor_queryset(cls, request, queryset, *related):
+        stats = [await qs.order_by().aaggregate(**cls.list_aggregates()) for qs in (queryset, *related)]
+        return cls.from_stats(request, queryset, related, stats)
+
+    @staticmethod
+    def list_aggregates():
+        return {'count': Count('pk'), 'last_modified': Max('updated_at')}
+
+    @classmethod
+    def from_stats(cls, request, queryset, related, stats):
+        markers = []
+        updated_at = None
+        for qs, row in zip((queryset, *related), stats):
+            markers.append(f"{qs.model._meta.label}:{row['count']}")
+            if row['last_modified'] and (updated_at is None or row['last_modified'] > updated_at):
+                updated_at = row['last_modified']
+        return cls(request, queryset.model._meta.label, ','.join(markers), updated_at)
+
+    @classmethod
+    def for_object(cls, request, obj):
+        return cls(request, obj._meta.label, obj.pk, obj.updated_at, last_modified=obj.updated_at)
+
+    @classmethod
+    def for_objects(cls, request, label, objects):
+        """Validators for a response composed of already-loaded rows of several models."""
+        marker = hashlib.md5(
+            ','.join(f'{obj._meta.label}:{obj.pk}:{obj.updated_at.isoformat()}' for obj in objects).encode('utf-8'),
+            usedforsecurity=False,
+        ).hexdigest()
+        return cls(request, label, marker, max((obj.updated_at for obj in objects), default=None))
+
+    def check(self, request):
+        """Return a 304 response when the client's copy is current, else None."""
+        timestamp = int(self.last_modified.timestamp()) if self.last_modified else None
+        response = get_conditional_response(request, etag=self.etag, last_modified=timestamp)
+        if response is not None:
+            self.apply(response)
+        return response
+
+    def apply(self, response):
+        response['ETag'] = self.etag
+        if self.last_modified:
+            response['Last-Modified'] = http_date(self.last_modified.timestamp())
+        # Let browsers keep the body but revalidate before reusing it.
+        patch_cache_control(response, no_cache=True)
+        return response
@@ -0,0 +1,177 @@
+"""
+Write-behind intake for contact form submissions.
+
+With CONTACT_INTAKE = 'spool' the view validates a submission, appends it to
+a SQLite journal at CONTACT_SPOOL_PATH and answers 202 without touching the
+main database. `flush()` moves spooled rows into ContactMessage with
+bulk_create, from a background thread in each web process or from the
+`flush_contact_spool` command.
+
+A spooled row is deleted only after its batch has committed, and carries an
+`intake_id` that is unique on ContactMessage, so a flush interrupted between
+the two steps is replayed without duplicates. Rows left behind by a restart
+are picked up when the process comes back: `MyAppConfig.ready()` starts the
+flush thread, not just the first new submission.
+
+If a batch fails, its rows are retried one at a time; a row the database
+rejects (or that no longer builds a ContactMessage) is moved to the
+`quarantine` table with the error instead of blocking the rows behind it.
+Connection errors are not quarantined; the batch is retried on the next flush.
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.db import DataError, IntegrityError, connection, transaction
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS spool ('
+    'id INTEGER PRIMARY KEY AUTOINCREMENT, payload TEXT NOT NULL, received_at REAL NOT NULL)',
+    'CREATE TABLE IF NOT EXISTS quarantine ('
+    'id INTEGER PRIMARY KEY, payload TEXT NOT NULL, received_at REAL NOT NULL, error TEXT NOT NULL)',
+)
+# Errors that belong to one row rather than to the database as a whole.
+ROW_ERRORS = (DataError, IntegrityError, TypeError, ValueError)
+BATCH_SIZE = 500
+
+_local = threading.local()
+_flusher = None
+_flusher_lock = threading.Lock()
+
+
+def is_enabled():
+    return settings.CONTACT_INTAKE == 'spool'
+
+
+def _connection():
+    # One connection per process and thread; sqlite3 objects must not cross a fork.
+    key = (os.getpid(), str(settings.CONTACT_SPOOL_PATH))
+    connections = _local.__dict__.setdefault('connections', {})
+    conn = connections.get(key)
+    if conn is None:
+        os.makedirs(os.path.dirname(key[1]) or '.', exist_ok=True)
+        conn = sqlite3.connect(key[1], timeout=10, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        # Sync the WAL on every commit so an acknowledged submission survives a crash.
+        conn.execute('PRAGMA synchronous=FULL')
+        for statement in SCHEMA:
+            conn.execute(statement)
+        connections[key] = conn
+    return conn
+
+
+def enqueue(data):
+    """Append validated ContactMessage fields to the spool and return their intake id."""
+    intake_id = uuid.uuid4()
+    payload = json.dumps({**data, 'intake_id': str(intake_id)})
+    _connection().execute('INSERT INTO spool (payload, received_at) VALUES (?, ?)', (payload, time.time()))
+    ensure_flusher()
+    return intake_id
+
+
+def flush(batch_size=BATCH_SIZE):
+    """Move every spooled submission into ContactMessage; returns how many were moved."""
+    conn = _connection()
+    moved = 0
+    while True:
+        rows = conn.execute(
+            'SELECT id, payload, received_at FROM spool ORDER BY id LIMIT ?', (batch_size,)
+        ).fetchall()
+        if not rows:
+            return moved
+        try:
+            with transaction.atomic():
+                _insert([_message(payload, received_at) for _, payload, received_at in rows])
+        except Exception:
+            logger.warning('Inserting a batch of %d spooled contact messages failed; '
+                           'retrying them one at a time.', len(rows), exc_info=True)
+            moved += _flush_rows(conn, rows)
+            continue
+        conn.execute('DELETE FROM spool WHERE id <= ?', (rows[-1][0],))
+        moved += len(rows)
+
+
+def _message(payload, received_at):
+    from .models import ContactMessage
+
+    return ContactMessage(submitted_at=datetime.fromtimestamp(received_at, tz=timezone.utc), **json.loads(payload))
+
+
+def _insert(messages):
+    from .models import ContactMessage
+
+    ContactMessage.objects.bulk_create(messages, ignore_conflicts=True)
+
+
+def _flush_rows(conn, rows):
+    moved = 0
+    for row_id, payload, received_at in rows:
+        try:
+            with transaction.atomic():
+                _insert([_message(payload, received_at)])
+        except ROW_ERRORS as exc:
+            logger.exception('Quarantining spooled contact message %d.', row_id)
+            with conn:
+                conn.execute('BEGIN IMMEDIATE')
+                conn.execute('INSERT OR REPLACE INTO quarantine (id, payload, received_at, error) VALUES (?, ?, ?, ?)',
+                             (row_id, payload, received_at, repr(exc)))
+                conn.execute('DELETE FROM spool WHERE id = ?', (row_id,))
+            continue
+        conn.execute('DELETE FROM spool WHERE id = ?', (row_id,))
+        moved += 1
+    return moved
+
+
+def stats():
+    conn = _connection()
+    depth, oldest = conn.execute('SELECT COUNT(*), MIN(received_at) FROM spool').fetchone()
+    return {
+        'depth': depth,
+        'oldest_age': time.time() - oldest if oldest is not None else 0.0,
+        'quarantined': conn.execute('SELECT COUNT(*) FROM quarantine').fetchone()[0],
+    }
+
+
+def ensure_flusher():
+    """Start this process's flush thread unless CONTACT_SPOOL_FLUSH_INTERVAL is 0."""
+    global _flusher
+    interval = settings.CONTACT_SPOOL_FLUSH_INTERVAL
+    if interval <= 0:
+        return
+    with _flusher_lock:
+        if _flusher is not None and _flusher.is_alive():
+            return
+        _flusher = threading.Thread(target=_run_flusher, args=(interval,), name='contact-spool-flusher', daemon=True)
+        _flusher.start()
+
+
+def _run_flusher(interval):
+    while True:
+        time.sleep(interval)
+        try:
+            flush()
+        except Exception:
+            logger.exception('Flushing the contact spool failed; will retry.')
+        finally:
+            connection.close()
+
+
+def _restart_flusher():
+    # Threads do not survive a fork; a worker forked from a process that was
+    # flushing (e.g. gunicorn --preload) starts its own.
+    global _flusher, _flusher_lock
+    _flusher_lock = threading.Lock()
+    if _flusher is not None:
+        _flusher = None
+        ensure_flusher()
+
+
+os.register_at_fork(after_in_child=_restart_flusher)
@@ -0,0 +1,234 @@
+"""
+Compiled row encoders for large list responses.
+
+`encoder_for(SerializerClass, selection)` turns a ModelSerializer into a
+function from values_list() rows to the dicts the serializer would return,
+generated once per serializer class and field selection. The hot loop then
+skips model instantiation and DRF's per-field dispatch, and the dicts
+render to the same bytes through JSONRenderer.
+
+Fields backed by a single column are compiled, plus SrcsetField. Anything
+else (nested or method fields, custom sources) makes encoder_for() return
+None, and `serialize_list()` falls back to the serializer.
+"""
+import hashlib
+from functools import lru_cache
+
+from django.core.exceptions import FieldDoesNotExist
+from django.core.files.storage import FileSystemStorage
+from django.db import models
+from django.urls import reverse
+from django.utils.encoding import filepath_to_uri
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+
+from . import timing
+from .images import fallback_name
+from .serializers import SrcsetField
+
+# Fields whose to_representation() returns the database value unchanged.
+PASSTHROUGH_FIELDS = (
+    serializers.CharField, serializers.IntegerField, serializers.BooleanField, serializers.ChoiceField,
+    serializers.ReadOnlyField,
+)
+PK_PLACEHOLDER = 987654321
+DESCRIPTOR_PLACEHOLDER = 'DESCRIPTOR'
+
+
+class NotCompilable(Exception):
+    pass
+
+
+def datetime_converter(field, model_field):
+    def bind(context):
+        output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+        field_timezone = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+        if output_format is None or output_format.lower() != ISO_8601 or field_timezone is None:
+            return field.to_representation
+
+        def convert(value):
+            if value.utcoffset() is None:
+                return field.to_representation(value)
+            value = value.astimezone(field_timezone).isoformat()
+            return value[:-6] + 'Z' if value.endswith('+00:00') else value
+        return convert
+    return bind
+
+
+def url_builder(storage):
+    """storage.url, minus the urljoin() for file system storage where joining is concatenation."""
+    base_url = storage.base_url if isinstance(storage, FileSystemStorage) else None
+    if base_url is None or not base_url.endswith('/') or '?' in base_url or '#' in base_url:
+        return storage.url
+
+    def url(name):
+        path = filepath_to_uri(name).lstrip('/')
+        if '/.' in '/' + path:
+            return storage.url(name)
+        return base_url + path
+    return url
+
+
+def file_converter(field, model_field):
+    use_url = getattr(field, 'use_url', api_settings.UPLOADED_FILES_USE_URL)
+
+    def bind(context):
+        request = context.get('request')
+        storage_url = url_builder(model_field.storage)
+
+        def convert(name):
+            if not name:
+                return None
+            if not use_url:
+                return name
+            url = storage_url(name)
+            return request.build_absolute_uri(url) if request is not None else url
+        return convert
+    return bind
+
+
+def srcset_converter(field):
+    # reverse() once with placeholders; rows only fill in pk and descriptor.
+    template = reverse(field.view_name, kwargs={'pk': PK_PLACEHOLDER, 'descriptor': DESCRIPTOR_PLACEHOLDER})
+    head, rest = template.split(str(PK_PLACEHOLDER), 1)
+    middle, tail = rest.split(DESCRIPTOR_PLACEHOLDER, 1)
+
+    def bind(context):
+        request = context.get('request')
+
+        def convert(pk, image_srcset):
+            srcset = {}
+            for descriptor, variants in (image_srcset or {}).items():
+                version = hashlib.md5(fallback_name(variants).encode('utf-8'), usedforsecurity=False).hexdigest()[:8]
+                if descriptor.isalnum():
+                    path = f'{head}{pk}{middle}{descriptor}{tail}'
+                else:
+                    path = reverse(field.view_name, kwargs={'pk': pk, 'descriptor': descriptor})
+                url = f'{path}?v={version}'
+                srcset[descriptor] = request.build_absolute_uri(url) if request is not None else url
+            return srcset
+        return convert
+    return bind
+
+
+def generic_converter(field, model_field):
+    return lambda context: field.to_representation
+
+
+def plan_field(field, opts):
+    """(columns, converter factory or None, nullable) for one serializer field."""
+    if isinstance(field, SrcsetField):
+        return (opts.pk.attname, 'image_srcset'), srcset_converter(field), False
+    if len(field.source_attrs) != 1:
+        raise NotCompilable(field.field_name)
+    try:
+        model_field = opts.get_field(field.source_attrs[0])
+    except FieldDoesNotExist:
+        raise NotCompilable(field.field_name)
+    if not model_field.concrete or model_field.many_to_many:
+        raise NotCompilable(field.field_name)
+    columns = (model_field.attname,)
+    if isinstance(field, serializers.RelatedField):
+        if not isinstance(field, serializers.PrimaryKeyRelatedField) or field.pk_field is not None:
+            raise NotCompilable(field.field_name)
+        return columns, None, model_field.null
+    if isinstance(field, serializers.DateTimeField) and isinstance(model_field, models.DateTimeField):
+        return columns, datetime_converter(field, model_field), model_field.null
+    if isinstance(field, serializers.FileField) and isinstance(model_field, models.FileField):
+        return columns, file_converter(field, model_field), model_field.null
+    if isinstance(field, serializers.JSONField) and not field.binary:
+        return columns, None, model_field.null
+    if isinstance(field, PASSTHROUGH_FIELDS) and not isinstance(model_field, models.DecimalField):
+        if not isinstance(field, serializers.ChoiceField) or all(isinstance(key, str) for key in field.choices):
+            return columns, None, model_field.null
+    return columns, generic_converter(field, model_field), model_field.null
+
+
+class RowEncoder:
+    def __init__(self, columns, source, factories):
+        self.columns = columns
+        self.source = source
+        self.factories = factories
+        namespace = {}
+        exec(compile(source, f'<row encoder {columns}>', 'exec'), namespace)
+        self.encode_rows = namespace['encode_rows']
+
+    def encode(self, rows, context=None):
+        """The serializer's `data` for `rows` of values_list(*self.columns)."""
+        context = context or {}
+        return self.encode_rows(rows, *(factory(context) for factory in self.factories))
+
+    def serialize(self, queryset, context=None):
+        return self.encode(queryset.values_list(*self.columns), context)
+
+
+# Selections are normalised before lookup, but their number still grows with
+# the combinations clients ask for; the popular ones stay compiled.
+@lru_cache(maxsize=256)
+def compile_encoder(serializer_class, fields=None, omit=None):
+    selection = {}
+    if fields is not None:
+        selection['fields'] = fields
+    if omit is not None:
+        selection['omit'] = omit
+    serializer = serializer_class(**selection)
+    opts = serializer.Meta.model._meta
+    columns = []
+    factories = []
+    items = []
+    try:
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            field_columns, factory, nullable = plan_field(field, opts)
+            args = []
+            for column in field_columns:
+                if column not in columns:
+                    columns.append(column)
+                args.append(f'v{columns.index(column)}')
+            if factory is None:
+                value = args[0]
+            else:
+                factories.append(factory)
+                value = f"c{len(factories) - 1}({', '.join(args)})"
+                if nullable:
+                    value = f'({value} if {args[0]} is not None else None)'
+            items.append(f'{name!r}: {value}')
+    except NotCompilable:
+        return None
+    converter_args = ''.join(f', c{i}' for i in range(len(factories)))
+    row_args = ''.join(f'v{i}, ' for i in range(len(columns)))
+    source = (
+        f'def encode_rows(rows{converter_args}):\n'
+        f"    return [{{{', '.join(items)}}} for ({row_args}) in rows]\n"
+    )
+    return RowEncoder(tuple(columns), source, factories)
+
+
+@lru_cache(maxsize=None)
+def field_names(serializer_class):
+    return frozenset(serializer_class().fields)
+
+
+def encoder_for(serializer_class, selection=None):
+    """Cached RowEncoder for `serializer_class` and a sparse fieldset selection, or None."""
+    selection = selection or {}
+    if not selection:
+        return compile_encoder(serializer_class)
+    # Every spelling of a selection (order, repeats, omitting what was not
+    # selected) shares the encoder for the fields it actually leaves.
+    available = field_names(serializer_class)
+    fields = available.intersection(selection.get('fields', available)) - set(selection.get('omit', ()))
+    if fields == available:
+        return compile_encoder(serializer_class)
+    return compile_encoder(serializer_class, tuple(sorted(fields)))
+
+
+def serialize_list(serializer_class, queryset, selection=None, context=None):
+    """`serializer_class(queryset, many=True).data`, through a compiled encoder when there is one."""
+    selection = selection or {}
+    encoder = encoder_for(serializer_class, selection)
+    if encoder is None:
+        return serializer_class(queryset, many=True, context=context or {}, **selection).data
+    with timing.phase('serialize'):
+        return encoder.serialize(queryset, context)
@@ -0,0 +1,259 @@
+"""
+Resized and transcoded copies of uploaded images for `srcset`.
+
+After a MediaItem or NewsPost with a new image commits, `generate()` hands
+the file to a process pool. The worker writes each width in
+DERIVATIVE_WIDTHS (never upscaled; narrower images get one copy at their
+own width) in AVIF and WebP where Pillow supports them plus a JPEG or PNG
+fallback, all without EXIF. The result is stored in the row's
+`image_srcset` as {'320w': {'image/webp': [name, bytes], ...}} and served
+by `ImageVariantView`, which picks the smallest format the browser's
+Accept header allows. Derivatives that no row lists any more, because the
+image was replaced or cleared or a re-render dropped a format, are deleted
+once the change commits.
+"""
+import io
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from django.utils import timezone
+
+from . import response_cache, snapshots
+
+logger = logging.getLogger(__name__)
+
+DERIVATIVE_WIDTHS = {'thumbnail': 320, 'card': 768, 'full': 1600}
+# MIME type -> (Pillow format, extension), most compact first.
+FORMATS = {
+    'image/avif': ('AVIF', '.avif'),
+    'image/webp': ('WEBP', '.webp'),
+    'image/jpeg': ('JPEG', '.jpg'),
+    'image/png': ('PNG', '.png'),
+}
+# Quality per size; small images tolerate more compression.
+QUALITY = {
+    'thumbnail': {'AVIF': 50, 'WEBP': 70, 'JPEG': 75},
+    'card': {'AVIF': 55, 'WEBP': 75, 'JPEG': 80},
+    'full': {'AVIF': 60, 'WEBP': 80, 'JPEG': 82},
+}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def models():
+    from .models import MediaItem, NewsPost
+    return (MediaItem, NewsPost)
+
+
+def output_formats(has_alpha):
+    from PIL import features
+
+    formats = [mime for mime, feature in (('image/avif', 'avif'), ('image/webp', 'webp')) if features.check(feature)]
+    return formats + ['image/png' if has_alpha else 'image/jpeg']
+
+
+def render(name):
+    """Write the derivatives of stored image `name` and return its srcset map."""
+    from PIL import Image, ImageOps
+
+    with default_storage.open(name, 'rb') as source:
+        with Image.open(source) as original:
+            image = ImageOps.exif_transpose(original)
+            image.load()
+
+    has_alpha = image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info)
+    image = image.convert('RGBA' if has_alpha else 'RGB')
+    icc_profile = image.info.get('icc_profile')
+    image.info = {}
+
+    sizes = [(label, width) for label, width in sorted(DERIVATIVE_WIDTHS.items(), key=lambda item: item[1])
+             if width < image.width]
+    if image.width <= max(DERIVATIVE_WIDTHS.values()):
+        sizes.append(('full', image.width))
+
+    root, _ = os.path.splitext(name)
+    srcset = {}
+    for label, width in sizes:
+        height = max(1, round(image.height * width / image.width))
+        resized = image if width == image.width else image.resize(
+            (width, height), Image.Resampling.LANCZOS, reducing_gap=3.0
+        )
+        variants = {}
+        for mime in output_formats(has_alpha):
+            content = encode(resized, mime, QUALITY[label], icc_profile)
+            variants[mime] = [_save(f'{root}-{label}{FORMATS[mime][1]}', content), len(content)]
+        srcset[f'{width}w'] = variants
+    return srcset
+
+
+def encode(image, mime, quality, icc_profile=None):
+    codec = FORMATS[mime][0]
+    options = {'icc_profile': icc_profile} if icc_profile else {}
+    if codec == 'JPEG':
+        options.update(quality=quality['JPEG'], optimize=True, progressive=True)
+    elif codec == 'WEBP':
+        options.update(quality=quality['WEBP'], method=5)
+    elif codec == 'AVIF':
+        options.update(quality=quality['AVIF'])
+    else:
+        options.update(optimize=True)
+    buffer = io.BytesIO()
+    image.save(buffer, codec, **options)
+    return buffer.getvalue()
+
+
+def accepted_ranges(accept):
+    """{'image/webp': 1.0, 'image/*': 1.0, '*/*': 0.8} from an Accept header."""
+    ranges = {}
+    for part in accept.split(','):
+        media_range, *params = part.split(';')
+        quality = 1.0
+        for param in params:
+            key, _, value = param.strip().partition('=')
+            if key == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if media_range.strip():
+            ranges[media_range.strip().lower()] = quality
+    return ranges
+
+
+def negotiate(variants, accept):
+    """
+    Return the (mime, [name, bytes]) of the smallest variant the Accept
+    header allows, falling back to the JPEG/PNG copy every browser reads.
+    """
+    ranges = accepted_ranges(accept or '*/*')
+
+    def allowed(mime):
+        for key in (mime, mime.split('/')[0] + '/*', '*/*'):
+            if key in ranges:
+                return ranges[key] > 0
+        return False
+
+    candidates = [(mime, variant) for mime, variant in variants.items() if allowed(mime)]
+    if not candidates:
+        fallback = next(mime for mime in ('image/jpeg', 'image/png') if mime in variants)
+        return fallback, variants[fallback]
+    return min(candidates, key=lambda candidate: candidate[1][1])
+
+
+def fallback_name(variants):
+    for mime in ('image/jpeg', 'image/png'):
+        if mime in variants:
+            return variants[mime][0]
+    return next(iter(variants.values()))[0]
+
+
+def _save(name, content):
+    # Derivative names follow the original's, so replace rather than suffix.
+    if default_storage.exists(name):
+        default_storage.delete(name)
+    return default_storage.save(name, ContentFile(content))
+
+
+def derivative_names(srcset):
+    return {name for variants in (srcset or {}).values() for name, _ in variants.values()}
+
+
+def in_use(name):
+    """Whether any MediaItem or NewsPost still has image `name`."""
+    return any(model.objects.filter(image=name).exists() for model in models())
+
+
+def discard(srcset, keep=None):
+    """Delete the derivative files listed in `srcset` but not in `keep`."""
+    for name in sorted(derivative_names(srcset) - derivative_names(keep)):
+        try:
+            default_storage.delete(name)
+        except OSError:
+            logger.warning('Could not delete derivative %s', name, exc_info=True)
+
+
+def release(instance, name, srcset):
+    """Delete the derivatives of `instance`'s previous image once its save commits, unless a row still uses it."""
+    if not srcset or name == instance.image.name:
+        return
+    transaction.on_commit(lambda: in_use(name) or discard(srcset))
+
+
+def store(model, pk, name, srcset):
+    """
+    Record `srcset` on the row unless its image was replaced meanwhile.
+    Whichever of the old and new derivatives the row does not list is
+    deleted once that commits.
+    """
+    rows = model.objects.filter(pk=pk, image=name)
+    previous = rows.values_list('image_srcset', flat=True).first()
+    updated = rows.update(image_srcset=srcset, updated_at=timezone.now())
+    if updated:
+        response_cache.invalidate(model)
+        # update() sends no post_save, so the snapshot is refreshed here.
+        if model in snapshots.resources():
+            snapshots.schedule(model, set(model.objects.filter(pk=pk).values_list('slug', flat=True)))
+        transaction.on_commit(lambda: discard(previous, keep=srcset))
+    else:
+        transaction.on_commit(lambda: in_use(name) or discard(srcset))
+    return bool(updated)
+
+
+def generate(instance):
+    """Render derivatives for `instance` in the background once the transaction commits."""
+    name = instance.image.name if instance.image else None
+    if not name:
+        return
+    model, pk = type(instance), instance.pk
+    transaction.on_commit(lambda: _submit(model, pk, name))
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = create_executor(settings.IMAGE_DERIVATIVE_WORKERS)
+    return _executor
+
+
+def create_executor(workers):
+    # Spawned workers start clean instead of inheriting a forked DB connection.
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=_init_worker,
+    )
+
+
+def _init_worker():
+    import django
+    django.setup()
+
+
+def _submit(model, pk, name):
+    if settings.IMAGE_DERIVATIVE_WORKERS <= 0:
+        try:
+            store(model, pk, name, render(name))
+        except Exception:
+            logger.exception('Could not render derivatives of %s', name)
+        return
+    future = get_executor().submit(render, name)
+    future.add_done_callback(lambda done: _store_result(model, pk, name, done))
+
+
+def _store_result(model, pk, name, future):
+    # Runs on the executor's result thread, which has its own DB connection.
+    try:
+        store(model, pk, name, future.result())
+    except Exception:
+        logger.exception('Could not render derivatives of %s', name)
+    finally:
+        connection.close()
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from my_app import response_cache
+
+
+class Command(BaseCommand):
+    help = (
+        'Show hit/miss counts of the API response cache, or clear it. '
+        'Counts are only visible across processes when API_CACHE_BACKEND is shared.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clear', action='store_true', help='Drop every cached response and reset the counters.')
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            response_cache.clear()
+            self.stdout.write(self.style.SUCCESS('API response cache cleared.'))
+            return
+        stats = response_cache.stats()
+        self.stdout.write(f"hits: {stats['hits']}")
+        self.stdout.write(f"misses: {stats['misses']}")
+        self.stdout.write(f"hit ratio: {stats['hit_ratio']:.2%}")
@@ -0,0 +1,99 @@
+import json
+import platform
+import shutil
+import tempfile
+import time
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from my_app import benchmarks
+
+
+class Command(BaseCommand):
+    help = (
+        'Time every API route against seeded datasets and record p50/p95 latency, '
+        'query count, response bytes and peak memory per endpoint. Each dataset is '
+        'seeded inside a transaction that is rolled back, so nothing is kept. '
+        'With --baseline, exits non-zero when a result regresses past the thresholds. '
+        'Unpaginated lists at 1M rows take minutes per request; narrow those runs '
+        'with --requests and --only.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+', default=[1000],
+                            help='Dataset sizes, e.g. --rows 1000 100000 1000000.')
+        parser.add_argument('--requests', type=int, default=20, help='Timed requests per endpoint.')
+        parser.add_argument('--only', nargs='+', default=(),
+                            help='Run only scenarios whose name contains one of these, e.g. "GET news-post".')
+        parser.add_argument('--warm', action='store_true',
+                            help='Keep the response cache between requests instead of measuring misses.')
+        parser.add_argument('--output', help='Write the results to this JSON file.')
+        parser.add_argument('--baseline', help='Compare against the results in this JSON file.')
+        parser.add_argument('--latency-tolerance', type=float, default=0.5,
+                            help='Allowed growth of p50 latency, as a fraction.')
+        parser.add_argument('--p95-tolerance', type=float, default=1.0,
+                            help='Allowed growth of p95 latency, as a fraction.')
+        parser.add_argument('--size-tolerance', type=float, default=0.25,
+                            help='Allowed growth of response bytes and peak memory, as a fraction.')
+        parser.add_argument('--query-slack', type=int, default=0, help='Allowed extra queries per request.')
+        parser.add_argument('--min-ms', type=float, default=2.0, help='Latency growth always allowed, in ms.')
+        parser.add_argument('--min-kib', type=float, default=256.0, help='Peak memory growth always allowed, in KiB.')
+
+    def handle(self, *args, **options):
+        results = {}
+        root = tempfile.mkdtemp(prefix='benchmark-')
+        try:
+            with benchmarks.isolated_settings(root):
+                for rows in options['rows']:
+                    results[str(rows)] = self.run_dataset(rows, options)
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+
+        report = {
+            'meta': {
+                'created': timezone.now().isoformat(),
+                'database': connection.vendor,
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'requests': options['requests'],
+                'warm': options['warm'],
+            },
+            'results': results,
+        }
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                json.dump(report, handle, indent=2, sort_keys=True)
+            self.stdout.write(f"results written to {options['output']}")
+
+        if options['baseline']:
+            with open(options['baseline']) as handle:
+                baseline = json.load(handle)['results']
+            regressions = benchmarks.compare(
+                results, baseline,
+                **{key: options[key] for key in (
+                    'latency_tolerance', 'p95_tolerance', 'size_tolerance', 'query_slack', 'min_ms', 'min_kib'
+                )},
+            )
+            if regressions:
+                raise CommandError('Regressions against the baseline:\n  ' + '\n  '.join(regressions))
+            self.stdout.write('no regressions against the baseline')
+
+    def run_dataset(self, rows, options):
+        with transaction.atomic():
+            started = time.perf_counter()
+            data = benchmarks.seed(rows)
+            self.stdout.write(f'rows: {rows}  seeded in {time.perf_counter() - started:.1f}s')
+            results = benchmarks.run(
+                data, requests=options['requests'], only=options['only'], warm=options['warm'], progress=self.report,
+            )
+            transaction.set_rollback(True)
+        return results
+
+    def report(self, name, result):
+        self.stdout.write(
+            f"  {name:<48} {result['status']}  p50 {result['p50_ms']:>9.2f}ms  p95 {result['p95_ms']:>9.2f}ms  "
+            f"{result['queries']:>3} queries  {result['bytes']:>10} B  peak {result['peak_kib']:>9.1f} KiB"
+        )
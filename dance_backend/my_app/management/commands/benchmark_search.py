@@ -0,0 +1,70 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from my_app import search
+
+WORDS = (
+    'ballet hip hop jazz contemporary latin salsa tango waltz street breaking '
+    'beginner advanced kids adults teens workshop summer winter recital show '
+    'studio rehearsal technique stretching rhythm choreography performance '
+    'χορός μπαλέτο παιδιά ενήλικες εργαστήριο παράσταση καλοκαίρι'
+).split()
+
+
+class Command(BaseCommand):
+    help = (
+        'Time index build and query latency against synthetic documents. '
+        'Runs inside a transaction that is rolled back, so nothing is kept.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--documents', type=int, default=100_000)
+        parser.add_argument('--queries', type=int, default=200)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        try:
+            backend = search.get_backend()
+        except search.SearchNotSupported as exc:
+            raise CommandError(str(exc))
+
+        rows = [
+            (
+                'news',
+                10_000_000 + i,
+                f'bench-{i}',
+                ' '.join(rng.choices(WORDS, k=6)).capitalize(),
+                ' '.join(rng.choices(WORDS, k=120)),
+            )
+            for i in range(options['documents'])
+        ]
+        queries = [' '.join(rng.choices(WORDS, k=rng.randint(1, 2))) for _ in range(options['queries'])]
+
+        with transaction.atomic():
+            started = time.perf_counter()
+            for start in range(0, len(rows), 5000):
+                backend.bulk_insert(rows[start:start + 5000])
+            build = time.perf_counter() - started
+
+            timings = []
+            for query in queries:
+                started = time.perf_counter()
+                search.search(query)
+                timings.append((time.perf_counter() - started) * 1000)
+
+            started = time.perf_counter()
+            backend.upsert('news', 10_000_000, 'bench-0', 'Updated title', 'updated body')
+            update = (time.perf_counter() - started) * 1000
+            transaction.set_rollback(True)
+
+        timings.sort()
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        self.stdout.write(f"documents: {len(rows)}")
+        self.stdout.write(f"index build: {build:.2f}s")
+        self.stdout.write(f"single-document update: {update:.2f}ms")
+        self.stdout.write(f"query p50: {statistics.median(timings):.2f}ms  p95: {p95:.2f}ms")
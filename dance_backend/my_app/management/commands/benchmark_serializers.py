@@ -0,0 +1,83 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from my_app import encoders
+from my_app.models import MediaItem, NewsPost
+from my_app.serializers import MediaItemSerializer, NewsPostSerializer
+
+SRCSET = {
+    '320w': {'image/webp': ['media/photos/bench-320w.webp', 18000], 'image/jpeg': ['media/photos/bench-320w.jpg', 26000]},
+    '640w': {'image/webp': ['media/photos/bench-640w.webp', 52000], 'image/jpeg': ['media/photos/bench-640w.jpg', 78000]},
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Time list serialization through the DRF serializers and the compiled row '
+        'encoders against synthetic rows, checking both render the same bytes. '
+        'Runs inside a transaction that is rolled back, so nothing is kept.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000])
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def handle(self, *args, **options):
+        total = max(options['rows'])
+        now = timezone.now()
+        with transaction.atomic():
+            MediaItem.objects.bulk_create(
+                (
+                    MediaItem(
+                        media_type='photo', title=f'Rehearsal {i}', image=f'media/photos/bench-{i}.jpg',
+                        image_srcset=SRCSET,
+                    )
+                    for i in range(total)
+                ),
+                batch_size=2000,
+            )
+            NewsPost.objects.bulk_create(
+                (
+                    NewsPost(
+                        title=f'Recital {i}', slug=f'bench-{i}', body='Tickets on sale. ' * 20,
+                        image=f'news/bench-{i}.jpg', image_srcset=SRCSET, published_at=now,
+                    )
+                    for i in range(total)
+                ),
+                batch_size=2000,
+            )
+            for label, serializer_class, queryset in (
+                ('media items', MediaItemSerializer, MediaItem.objects.order_by('-created_at', 'id')),
+                ('news posts', NewsPostSerializer, NewsPost.objects.order_by('-published_at', 'id')),
+            ):
+                for rows in sorted(options['rows']):
+                    self.compare(label, serializer_class, queryset[:rows], rows, options['repeat'])
+            transaction.set_rollback(True)
+
+    def compare(self, label, serializer_class, queryset, rows, repeat):
+        renderer = JSONRenderer()
+        serializer_time, serializer_body = self.best_of(
+            repeat, lambda: renderer.render(serializer_class(queryset, many=True).data)
+        )
+        encoder_time, encoder_body = self.best_of(
+            repeat, lambda: renderer.render(encoders.serialize_list(serializer_class, queryset))
+        )
+        if encoder_body != serializer_body:
+            raise CommandError(f'{label}: the encoder output differs from the serializer at {rows} rows.')
+        self.stdout.write(
+            f'{label} x {rows}: serializer {serializer_time * 1000:.0f}ms  '
+            f'encoder {encoder_time * 1000:.0f}ms  ({serializer_time / encoder_time:.1f}x, '
+            f'{len(encoder_body) / 1e6:.1f} MB)'
+        )
+
+    def best_of(self, repeat, render):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            body = render()
+            timings.append(time.perf_counter() - started)
+        return min(timings), body
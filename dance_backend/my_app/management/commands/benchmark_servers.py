@@ -0,0 +1,152 @@
+import asyncio
+import importlib.util
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+READ_SIZE = 4096
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare throughput of the sync views under gunicorn (WSGI) with the '
+        'async views under uvicorn (ASGI) when many clients send their '
+        'requests slowly. Both servers get the same number of processes.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/api/news-posts/',
+                            help='Sync endpoint; the async one is the same path under /api/async/.')
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--concurrency', type=int, default=200)
+        parser.add_argument('--trickle', type=float, default=0.5,
+                            help='Seconds each client takes to send its request headers.')
+        parser.add_argument('--read-delay', type=float, default=0.0,
+                            help='Pause between 4KB reads of the response, to model a slow downlink.')
+        parser.add_argument('--workers', type=int, default=2)
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--wsgi-url', help='Benchmark a running WSGI server instead of starting gunicorn.')
+        parser.add_argument('--asgi-url', help='Benchmark a running ASGI server instead of starting uvicorn.')
+
+    def handle(self, *args, **options):
+        sync_path = options['path']
+        if not sync_path.startswith('/api/'):
+            raise CommandError('--path must be an /api/ endpoint.')
+        async_path = '/api/async/' + sync_path[len('/api/'):]
+        port = options['port']
+        workers = str(options['workers'])
+
+        runs = (
+            ('wsgi (gunicorn, sync)', options['wsgi_url'], sync_path, port, [
+                '-m', 'gunicorn', 'backend.wsgi:application', '--workers', workers,
+                '--bind', f'127.0.0.1:{port}', '--log-level', 'warning',
+            ]),
+            ('asgi (uvicorn, async)', options['asgi_url'], async_path, port + 1, [
+                '-m', 'uvicorn', 'backend.asgi:application', '--workers', workers,
+                '--host', '127.0.0.1', '--port', str(port + 1), '--log-level', 'warning',
+            ]),
+        )
+        for label, url, path, server_port, command in runs:
+            server = None
+            if url is None:
+                if importlib.util.find_spec(command[1]) is None:
+                    raise CommandError(f'{command[1]} is not installed; pip install -r requirements.txt.')
+                url = f'http://127.0.0.1:{server_port}'
+                server = self.start(command, url)
+            try:
+                results = asyncio.run(self.load(url.rstrip('/') + path, options))
+            finally:
+                if server is not None:
+                    server.terminate()
+                    server.wait(timeout=10)
+            self.report(label, results)
+
+    def start(self, command, url):
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'backend.settings')}
+        server = subprocess.Popen([sys.executable, *command], cwd=settings.BASE_DIR, env=env)
+        parts = urlsplit(url)
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            try:
+                socket.create_connection((parts.hostname, parts.port), timeout=0.5).close()
+                return server
+            except OSError:
+                if server.poll() is not None:
+                    break
+                time.sleep(0.2)
+        server.terminate()
+        raise CommandError(f'Server did not start: {" ".join(command)}')
+
+    async def load(self, url, options):
+        parts = urlsplit(url)
+        target = parts.path + (f'?{parts.query}' if parts.query else '')
+        head = f'GET {target} HTTP/1.1\r\n'.encode('ascii')
+        rest = f'Host: {self.host_header(parts)}\r\nAccept: application/json\r\nConnection: close\r\n\r\n'.encode('ascii')
+        semaphore = asyncio.Semaphore(options['concurrency'])
+        trickle = options['trickle']
+        read_delay = options['read_delay']
+
+        async def connect():
+            # A small receive buffer keeps the kernel from absorbing the whole
+            # response on behalf of a slow reader.
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, READ_SIZE)
+            sock.setblocking(False)
+            await asyncio.get_running_loop().sock_connect(sock, (parts.hostname, parts.port))
+            return await asyncio.open_connection(sock=sock)
+
+        async def receive(reader):
+            chunks = []
+            while chunk := await reader.read(READ_SIZE):
+                chunks.append(chunk)
+                if read_delay:
+                    await asyncio.sleep(read_delay)
+            return b''.join(chunks)
+
+        async def one():
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    reader, writer = await connect()
+                    writer.write(head)
+                    await writer.drain()
+                    await asyncio.sleep(trickle)
+                    writer.write(rest)
+                    await writer.drain()
+                    response = await receive(reader)
+                    writer.close()
+                except OSError:
+                    return None
+                if not response.startswith(b'HTTP/1.1 200'):
+                    return None
+                return time.perf_counter() - started
+
+        started = time.perf_counter()
+        timings = await asyncio.gather(*(one() for _ in range(options['requests'])))
+        elapsed = time.perf_counter() - started
+        return elapsed, [timing for timing in timings if timing is not None], len(timings)
+
+    def host_header(self, parts):
+        # The servers run the real settings, so send a Host they accept.
+        allowed = [host for host in settings.ALLOWED_HOSTS if host != '*']
+        return allowed[0].lstrip('.') if allowed else parts.netloc
+
+    def report(self, label, results):
+        elapsed, timings, total = results
+        self.stdout.write(label)
+        if not timings:
+            self.stdout.write(f'  no successful requests out of {total}')
+            return
+        timings.sort()
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        self.stdout.write(f'  ok: {len(timings)}/{total}  throughput: {len(timings) / elapsed:.1f} req/s')
+        self.stdout.write(
+            f'  latency p50: {statistics.median(timings) * 1000:.0f}ms  p95: {p95 * 1000:.0f}ms'
+        )
@@ -0,0 +1,28 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from my_app import uploads
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete resumable uploads untouched for CHUNKED_UPLOAD_EXPIRY_HOURS, part files '
+        'without an upload and abandoned staged chunks. Meant to run from cron.'
+    )
+
+    def handle(self, *args, **options):
+        expired = list(uploads.expired())
+        for upload in expired:
+            uploads.discard(upload)
+        orphans = uploads.orphaned_parts()
+        for path in orphans:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        self.stdout.write(self.style.SUCCESS(
+            f'Removed {len(expired)} expired uploads and {len(orphans)} orphaned part files '
+            f'from {settings.CHUNKED_UPLOAD_DIR}.'
+        ))
@@ -0,0 +1,38 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from my_app import contact_spool
+
+
+class Command(BaseCommand):
+    help = (
+        'Insert spooled contact form submissions into the database. Run once after '
+        'a deploy to drain what a stopped process left behind, or with --interval '
+        'as a dedicated flusher when CONTACT_SPOOL_FLUSH_INTERVAL is 0.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=0,
+                            help='Keep running and flush every this many seconds.')
+        parser.add_argument('--batch-size', type=int, default=contact_spool.BATCH_SIZE)
+        parser.add_argument('--status', action='store_true', help='Only print the spool depth.')
+
+    def handle(self, *args, **options):
+        if options['status']:
+            stats = contact_spool.stats()
+            self.stdout.write(f"spool: {settings.CONTACT_SPOOL_PATH}")
+            self.stdout.write(f"depth: {stats['depth']}")
+            self.stdout.write(f"oldest: {stats['oldest_age']:.1f}s")
+            self.stdout.write(f"quarantined: {stats['quarantined']}")
+            return
+        while True:
+            moved = contact_spool.flush(batch_size=options['batch_size'])
+            if moved or not options['interval']:
+                self.stdout.write(self.style.SUCCESS(f'Flushed {moved} contact messages.'))
+            if not options['interval']:
+                return
+            connection.close()
+            time.sleep(options['interval'])
@@ -0,0 +1,44 @@
+import os
+from concurrent.futures import as_completed
+
+from django.core.management.base import BaseCommand
+
+from my_app import images
+
+
+class Command(BaseCommand):
+    help = 'Render resized copies of media item and news images in parallel (only those without any by default).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Re-render images that already have derivatives.')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 2, help='0 renders in this process.')
+
+    def handle(self, *args, **options):
+        jobs = []
+        for model in images.models():
+            rows = model.objects.exclude(image='').exclude(image__isnull=True).values_list('pk', 'image', 'image_srcset')
+            jobs.extend((model, pk, name) for pk, name, srcset in rows.iterator() if options['all'] or not srcset)
+        if not jobs:
+            self.stdout.write('Nothing to render.')
+            return
+
+        done = failed = 0
+        for (model, pk, name), result in self.render_all(jobs, options['workers']):
+            try:
+                images.store(model, pk, name, result())
+                done += 1
+            except Exception as exc:
+                failed += 1
+                self.stderr.write(f'{model.__name__} {pk} ({name}): {exc}')
+        self.stdout.write(self.style.SUCCESS(f'Rendered {done} images, {failed} failed.'))
+
+    def render_all(self, jobs, workers):
+        """Yield (job, callable returning its srcset) as each render finishes."""
+        if workers <= 0:
+            for job in jobs:
+                yield job, lambda name=job[2]: images.render(name)
+            return
+        with images.create_executor(workers) as executor:
+            futures = {executor.submit(images.render, job[2]): job for job in jobs}
+            for future in as_completed(futures):
+                yield futures[future], future.result
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from my_app import search
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index from published pages, news posts and active classes.'
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                count = search.rebuild()
+        except search.SearchNotSupported as exc:
+            raise CommandError(str(exc))
+        self.stdout.write(self.style.SUCCESS(f'Indexed {count} documents.'))
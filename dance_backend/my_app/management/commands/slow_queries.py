@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from my_app import slow_queries
+
+
+class Command(BaseCommand):
+    help = (
+        'List the slowest queries recorded by the slow-query log, totalled by '
+        'fingerprint across every worker, with the views that ran them and their plan.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=20, help='How many fingerprints to show.')
+        parser.add_argument('--plans', action='store_true', help='Print each query plan.')
+        parser.add_argument('--clear', action='store_true', help='Forget every recorded query.')
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            slow_queries.clear()
+            self.stdout.write(self.style.SUCCESS('Slow-query log cleared.'))
+            return
+        rows = slow_queries.offenders(options['limit'])
+        if not rows:
+            self.stdout.write(f'No queries over {settings.SLOW_QUERY_THRESHOLD_MS:g}ms recorded.')
+            return
+        for row in rows:
+            self.stdout.write(
+                f"{row['fingerprint']}  {row['count']}x  total {row['total_ms']:.1f}ms  max {row['max_ms']:.1f}ms  "
+                f"views: {row['views']}"
+            )
+            self.stdout.write(f"  {row['statement']}")
+            if options['plans'] and row['plan']:
+                for line in row['plan'].splitlines():
+                    self.stdout.write(f'    {line}')
@@ -0,0 +1,336 @@
+"""
+Prometheus metrics per URL name, shared by every worker on the host.
+
+MetricsMiddleware records each request into a dict in its own process: one
+lock acquisition per request, no I/O. A background thread in each process
+adds those deltas to a SQLite file at METRICS_STORE every
+METRICS_FLUSH_INTERVAL seconds, so counters and histograms there are the
+sums over all workers. In-flight gauges are per process; each worker writes
+its current value with a timestamp and the endpoint sums the ones that are
+recent, so a worker that died stops counting.
+
+MetricsView serves the store at /metrics in the text exposition format,
+after flushing its own process so a scrape sees at least its own requests.
+Only staff users and scrapers sending `Authorization: Bearer
+<METRICS_TOKEN>` may read it. Series are labelled with the URL name
+(`page-list`, `news-post-by-slug`), never the path, and with the method
+when it is a standard one, `other` otherwise, so their number stays bounded.
+"""
+import bisect
+import hmac
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from functools import lru_cache
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from django.views import View
+
+from . import contact_spool
+from .timing import wrap_connections
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS samples ('
+    'name TEXT NOT NULL, labels TEXT NOT NULL, value REAL NOT NULL, PRIMARY KEY (name, labels)) WITHOUT ROWID',
+    'CREATE TABLE IF NOT EXISTS gauges ('
+    'name TEXT NOT NULL, labels TEXT NOT NULL, pid INTEGER NOT NULL, value REAL NOT NULL, updated REAL NOT NULL, '
+    'PRIMARY KEY (name, labels, pid)) WITHOUT ROWID',
+)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+# Upper bounds of the latency histogram buckets, in seconds.
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float('inf'))
+UNMATCHED = 'unmatched'
+METHODS = frozenset({'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'})
+OTHER_METHOD = 'other'
+
+FAMILIES = {
+    'http_requests_total': ('counter', 'Requests by URL name, method and status code.'),
+    'http_request_duration_seconds': ('histogram', 'Request latency by URL name and method.'),
+    'http_request_db_queries_total': ('counter', 'Database queries run by requests, by URL name and method.'),
+    'http_requests_in_flight': ('gauge', 'Requests being handled, by URL name.'),
+    'api_cache_requests_total': ('counter', 'Response cache lookups by URL name and result (hit or miss).'),
+    'contact_spool_depth': ('gauge', 'Contact submissions waiting in the spool.'),
+    'contact_spool_oldest_age_seconds': ('gauge', 'Age of the oldest spooled contact submission.'),
+    'contact_spool_quarantined': ('gauge', 'Spooled contact submissions the database rejected.'),
+}
+SUFFIX_ORDER = {'_bucket': 0, '_sum': 1, '_count': 2}
+
+_local = threading.local()
+_lock = threading.Lock()
+_pending = defaultdict(float)
+_in_flight = defaultdict(int)
+_flusher = None
+_flusher_lock = threading.Lock()
+
+
+def _forget_parent():
+    # A forked worker starts from zero; otherwise it would flush the parent's
+    # unflushed counts a second time.
+    global _lock, _pending, _in_flight
+    _lock = threading.Lock()
+    _pending = defaultdict(float)
+    _in_flight = defaultdict(int)
+
+
+os.register_at_fork(after_in_child=_forget_parent)
+
+
+def is_enabled():
+    return settings.METRICS_ENABLED
+
+
+def _connection():
+    key = (os.getpid(), str(settings.METRICS_STORE))
+    opened = _local.__dict__.setdefault('connections', {})
+    conn = opened.get(key)
+    if conn is None:
+        os.makedirs(os.path.dirname(key[1]) or '.', exist_ok=True)
+        conn = sqlite3.connect(key[1], timeout=5, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        # Losing the last few seconds of counts in a crash is harmless.
+        conn.execute('PRAGMA synchronous=OFF')
+        for statement in SCHEMA:
+            conn.execute(statement)
+        opened[key] = conn
+    return conn
+
+
+def escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+@lru_cache(maxsize=4096)
+def labels(**values):
+    return ','.join(f'{name}="{escape(value)}"' for name, value in values.items())
+
+
+@lru_cache(maxsize=1024)
+def bucket_labels(route, method):
+    return tuple(labels(route=route, method=method, le='+Inf' if bound == float('inf') else repr(bound))
+                 for bound in BUCKETS)
+
+
+def method_label(method):
+    return method if method in METHODS else OTHER_METHOD
+
+
+def record(route, method, status, seconds, queries, cache=None):
+    """Count one finished request. The only lock is this process's, held for a few dict updates."""
+    route_method = labels(route=route, method=method)
+    first = bisect.bisect_left(BUCKETS, seconds)
+    with _lock:
+        _pending['http_requests_total', labels(route=route, method=method, status=status)] += 1
+        _pending['http_request_duration_seconds_sum', route_method] += seconds
+        _pending['http_request_duration_seconds_count', route_method] += 1
+        # Every bucket gets a series, even while it is still zero.
+        for index, bucket in enumerate(bucket_labels(route, method)):
+            _pending['http_request_duration_seconds_bucket', bucket] += index >= first
+        if queries:
+            _pending['http_request_db_queries_total', route_method] += queries
+        if cache:
+            _pending['api_cache_requests_total', labels(route=route, result=cache)] += 1
+
+
+def enter(route):
+    with _lock:
+        _in_flight[route] += 1
+
+
+def leave(route):
+    with _lock:
+        _in_flight[route] -= 1
+
+
+def flush():
+    """Add this process's pending counts to the shared store and publish its in-flight gauges."""
+    global _pending
+    with _lock:
+        pending, _pending = _pending, defaultdict(float)
+        in_flight = dict(_in_flight)
+    now = time.time()
+    conn = _connection()
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        conn.executemany(
+            'INSERT INTO samples (name, labels, value) VALUES (?, ?, ?) '
+            'ON CONFLICT (name, labels) DO UPDATE SET value = value + excluded.value',
+            [(name, label_string, value) for (name, label_string), value in pending.items()],
+        )
+        conn.executemany(
+            'INSERT OR REPLACE INTO gauges (name, labels, pid, value, updated) VALUES (?, ?, ?, ?, ?)',
+            [('http_requests_in_flight', labels(route=route), os.getpid(), value, now)
+             for route, value in in_flight.items()],
+        )
+        conn.execute('COMMIT')
+    except BaseException:
+        conn.execute('ROLLBACK')
+        with _lock:
+            for key, value in pending.items():
+                _pending[key] += value
+        raise
+
+
+def collect():
+    """(name, labels, value) for every series in the store plus the live gauges."""
+    conn = _connection()
+    series = conn.execute('SELECT name, labels, value FROM samples').fetchall()
+    # A worker that has not reported for a few flush intervals is gone.
+    stale = time.time() - 3 * max(settings.METRICS_FLUSH_INTERVAL, 1)
+    series += conn.execute(
+        'SELECT name, labels, SUM(value) FROM gauges WHERE updated >= ? GROUP BY name, labels', (stale,)
+    ).fetchall()
+    if contact_spool.is_enabled():
+        spool = contact_spool.stats()
+        series += [('contact_spool_depth', '', spool['depth']),
+                   ('contact_spool_oldest_age_seconds', '', spool['oldest_age']),
+                   ('contact_spool_quarantined', '', spool['quarantined'])]
+    return series
+
+
+def family(name):
+    for suffix in SUFFIX_ORDER:
+        if name.endswith(suffix) and name[:-len(suffix)] in FAMILIES:
+            return name[:-len(suffix)], suffix
+    return name, ''
+
+
+def _sort_key(sample):
+    name, label_string, _ = sample
+    base, suffix = family(name)
+    le = re.search(r'(?:^|,)le="([^"]*)"', label_string)
+    without_le = re.sub(r',?le="[^"]*"', '', label_string)
+    return base, without_le, SUFFIX_ORDER.get(suffix, 0), float(le[1]) if le else 0.0
+
+
+def render(series):
+    lines = []
+    current = None
+    for name, label_string, value in sorted(series, key=_sort_key):
+        base, _ = family(name)
+        if base != current:
+            current = base
+            kind, help_text = FAMILIES.get(base, ('untyped', ''))
+            lines += [f'# HELP {base} {help_text}', f'# TYPE {base} {kind}']
+        value = int(value) if float(value).is_integer() else value
+        lines.append(f'{name}{{{label_string}}} {value}' if label_string else f'{name} {value}')
+    return '\n'.join(lines) + '\n'
+
+
+def is_authorized(request):
+    """Staff users, or a scraper sending METRICS_TOKEN as a bearer token."""
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_staff:
+        return True
+    token = settings.METRICS_TOKEN
+    scheme, _, credentials = request.headers.get('Authorization', '').partition(' ')
+    return bool(token) and scheme.lower() == 'bearer' and hmac.compare_digest(credentials.encode(), token.encode())
+
+
+def ensure_flusher():
+    """Start this process's flush thread unless METRICS_FLUSH_INTERVAL is 0."""
+    global _flusher
+    interval = settings.METRICS_FLUSH_INTERVAL
+    if interval <= 0 or (_flusher is not None and _flusher.is_alive()):
+        return
+    with _flusher_lock:
+        # A forked worker sees the parent's thread as stopped and starts its own.
+        if _flusher is not None and _flusher.is_alive():
+            return
+        _flusher = threading.Thread(target=_run_flusher, args=(interval,), name='metrics-flusher', daemon=True)
+        _flusher.start()
+
+
+def _run_flusher(interval):
+    while True:
+        time.sleep(interval)
+        try:
+            flush()
+        except Exception:
+            logger.exception('Flushing metrics failed; will retry.')
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class MetricsMiddleware:
+    """Records every request under its URL name; see the module docstring. Runs in sync and async stacks."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not is_enabled():
+            return self.get_response(request)
+        ensure_flusher()
+        counter = QueryCounter()
+        started = time.perf_counter()
+        try:
+            with wrap_connections(counter):
+                response = self.get_response(request)
+        finally:
+            self.finish(request)
+        return self.count(request, response, started, counter)
+
+    async def __acall__(self, request):
+        if not is_enabled():
+            return await self.get_response(request)
+        ensure_flusher()
+        counter = QueryCounter()
+        started = time.perf_counter()
+        try:
+            with wrap_connections(counter):
+                response = await self.get_response(request)
+        finally:
+            self.finish(request)
+        return self.count(request, response, started, counter)
+
+    def finish(self, request):
+        route = getattr(request, '_metrics_route', None)
+        if route is not None:
+            leave(route)
+
+    def count(self, request, response, started, counter):
+        match = request.resolver_match
+        record(
+            match.view_name if match else UNMATCHED, method_label(request.method), response.status_code,
+            time.perf_counter() - started, counter.count,
+            cache={'HIT': 'hit', 'MISS': 'miss'}.get(response.get('X-Cache')),
+        )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if is_enabled():
+            request._metrics_route = request.resolver_match.view_name
+            enter(request._metrics_route)
+
+
+class MetricsView(View):
+    """GET /metrics - every worker's counters in the Prometheus text format."""
+    http_method_names = ['get', 'head']
+
+    def get(self, request):
+        if not is_authorized(request):
+            return HttpResponseForbidden()
+        if is_enabled():
+            flush()
+        return HttpResponse(render(collect()), content_type=CONTENT_TYPE)
@@ -0,0 +1,88 @@
+# Generated by Django 6.0.1 on 2026-10-18 16:05
+
+from django.db import migrations
+from django.db.models.functions import Lower
+
+import my_app.models
+
+SLUGGED_MODELS = ('page', 'classsection', 'newspost', 'eventgallery')
+
+
+def lowercase_slugs(apps, schema_editor):
+    for model_name in SLUGGED_MODELS:
+        model = apps.get_model('my_app', model_name)
+        max_length = model._meta.get_field('slug').max_length
+        taken = set(model.objects.annotate(canonical=Lower('slug')).values_list('canonical', flat=True))
+        for obj in model.objects.exclude(slug=Lower('slug')).order_by('pk'):
+            canonical = obj.slug.lower()
+            # Two slugs differing only by case cannot both keep the same
+            # canonical form; the later row gets its pk appended.
+            if model.objects.filter(slug=canonical).exclude(pk=obj.pk).exists():
+                canonical = suffixed_slug(canonical, obj.pk, taken, max_length)
+            taken.add(canonical)
+            model.objects.filter(pk=obj.pk).update(slug=canonical)
+
+
+def suffixed_slug(slug, pk, taken, max_length):
+    """Return `slug`-`pk`, shortened to fit max_length and counted up until it is not taken."""
+    suffix = f'-{pk}'
+    attempt = 1
+    while True:
+        candidate = slug[:max_length - len(suffix)] + suffix
+        if candidate not in taken:
+            return candidate
+        attempt += 1
+        suffix = f'-{pk}-{attempt}'
+
+
+def create_postgres_upper_indexes(apps, schema_editor):
+    # Remaining slug__iexact callers compile to UPPER(slug) on Postgres; give
+    # them an expression index to fall back on. SQLite compiles iexact to
+    # LIKE, which an expression index cannot serve, so it is skipped there.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for model_name in SLUGGED_MODELS:
+        table = apps.get_model('my_app', model_name)._meta.db_table
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS "{table}_slug_upper_idx" ON "{table}" (UPPER("slug"::text))'
+        )
+
+
+def drop_postgres_upper_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for model_name in SLUGGED_MODELS:
+        table = apps.get_model('my_app', model_name)._meta.db_table
+        schema_editor.execute(f'DROP INDEX IF EXISTS "{table}_slug_upper_idx"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('my_app', '0006_classsection_updated_at_contactmessage_updated_at_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='classsection',
+            name='slug',
+            field=my_app.models.LowercaseSlugField(unique=True),
+        ),
+        migrations.AlterField(
+            model_name='eventgallery',
+            name='slug',
+            field=my_app.models.LowercaseSlugField(unique=True),
+        ),
+        migrations.AlterField(
+            model_name='newspost',
+            name='slug',
+            field=my_app.models.LowercaseSlugField(unique=True),
+        ),
+        migrations.AlterField(
+            model_name='page',
+            name='slug',
+            field=my_app.models.LowercaseSlugField(unique=True),
+        ),
+        migrations.RunPython(lowercase_slugs, migrations.RunPython.noop),
+        migrations.RunPython(create_postgres_upper_indexes, drop_postgres_upper_indexes),
+    ]
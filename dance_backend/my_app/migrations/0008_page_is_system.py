@@ -0,0 +1,30 @@
+# Generated by Django 6.0.1 on 2026-10-18 16:30
+
+from django.db import migrations, models
+
+SYSTEM_SLUGS = ('contact', 'socialmedia')
+
+
+def flag_system_pages(apps, schema_editor):
+    Page = apps.get_model('my_app', 'Page')
+    Page.objects.filter(slug__in=SYSTEM_SLUGS).update(is_system=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('my_app', '0007_canonical_lowercase_slugs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='page',
+            name='is_system',
+            field=models.BooleanField(default=False, help_text='Hidden from page lists by default (e.g. contact, social media)'),
+        ),
+        migrations.AddIndex(
+            model_name='page',
+            index=models.Index(fields=['is_system', 'order', 'id'], name='page_system_order_idx'),
+        ),
+        migrations.RunPython(flag_system_pages, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 6.0.1 on 2026-10-18 17:10
+
+from django.db import migrations
+
+SQLITE_CREATE = """
+CREATE VIRTUAL TABLE IF NOT EXISTS my_app_search_index USING fts5(
+    kind UNINDEXED,
+    object_id UNINDEXED,
+    slug UNINDEXED,
+    title UNINDEXED,
+    body UNINDEXED,
+    search_title,
+    search_body,
+    tokenize = 'unicode61 remove_diacritics 2'
+)
+"""
+
+POSTGRES_CREATE = """
+CREATE TABLE IF NOT EXISTS my_app_search_index (
+    kind varchar(10) NOT NULL,
+    object_id bigint NOT NULL,
+    slug varchar(255) NOT NULL,
+    title text NOT NULL,
+    body text NOT NULL,
+    document tsvector NOT NULL,
+    PRIMARY KEY (kind, object_id)
+);
+CREATE INDEX IF NOT EXISTS my_app_search_index_document_gin ON my_app_search_index USING GIN (document);
+"""
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(SQLITE_CREATE)
+    elif vendor == 'postgresql':
+        schema_editor.execute(POSTGRES_CREATE)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor in ('sqlite', 'postgresql'):
+        schema_editor.execute('DROP TABLE IF EXISTS my_app_search_index')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('my_app', '0008_page_is_system'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 6.0.1 on 2026-10-18 17:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('my_app', '0009_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mediaitem',
+            name='image_srcset',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text="Resized copies of image, e.g. {'320w': name}"),
+        ),
+        migrations.AddField(
+            model_name='newspost',
+            name='image_srcset',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text="Resized copies of image, e.g. {'320w': name}"),
+        ),
+    ]
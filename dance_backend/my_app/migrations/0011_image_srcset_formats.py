@@ -0,0 +1,21 @@
+# Generated by Django 6.0.1 on 2026-10-18 18:05
+
+from django.db import migrations
+
+
+def clear_srcsets(apps, schema_editor):
+    # The stored shape now lists every format per width; rows are re-rendered
+    # by `manage.py generate_image_derivatives`.
+    for model_name in ('MediaItem', 'NewsPost'):
+        apps.get_model('my_app', model_name).objects.update(image_srcset={})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('my_app', '0010_image_srcset'),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_srcsets, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 6.0.1 on 2026-10-18 18:55
+
+from django.db import migrations, models
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+
+
+def seed_sequences(apps, schema_editor):
+    # Rows created before allocation all have order 0; number every row by
+    # (order, id) first so each holds a distinct position.
+    OrderSequence = apps.get_model('my_app', 'OrderSequence')
+    for model_name in ('Page', 'ClassSection', 'SocialLink'):
+        model = apps.get_model('my_app', model_name)
+        rows = list(model.objects.annotate(position=Window(RowNumber(), order_by=[F('order'), F('id')])).only('pk'))
+        for row in rows:
+            row.order = row.position
+        model.objects.bulk_update(rows, ['order'], batch_size=500)
+        OrderSequence.objects.update_or_create(label=model._meta.label_lower, defaults={'value': len(rows)})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('my_app', '0012_chunkedupload'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('label', models.CharField(max_length=100, unique=True)),
+                ('value', models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='classsection',
+            index=models.Index(fields=['order', 'id'], name='classsection_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='page',
+            index=models.Index(fields=['order', 'id'], name='page_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sociallink',
+            index=models.Index(fields=['order', 'id'], name='sociallink_order_idx'),
+        ),
+        migrations.RunPython(seed_sequences, migrations.RunPython.noop),
+    ]
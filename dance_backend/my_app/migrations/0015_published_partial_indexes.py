@@ -0,0 +1,37 @@
+# Generated by Django 6.0.1 on 2026-10-18 20:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('my_app', '0014_contactmessage_intake'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='classsection',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['order', 'id'], name='classsection_active_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='eventgallery',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['-created_at', 'id'], name='eventgallery_published_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mediaitem',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['-created_at', 'id'], name='mediaitem_published_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mediaitem',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['event', 'created_at', 'id'], name='mediaitem_event_published_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='newspost',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['-published_at', 'id'], name='newspost_published_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sociallink',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['order', 'id'], name='sociallink_active_order_idx'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 6.0.1 on 2026-10-18 21:05
+
+from django.db import migrations
+
+
+def index_existing_rows(apps, schema_editor):
+    # 0009 created the index empty; fill it with the rows that predate it.
+    from my_app import search
+
+    if schema_editor.connection.vendor in search.BACKENDS:
+        search.rebuild(apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('my_app', '0015_published_partial_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(index_existing_rows, migrations.RunPython.noop),
+    ]
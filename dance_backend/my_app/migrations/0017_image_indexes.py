@@ -0,0 +1,21 @@
+# Generated by Django 6.0.1 on 2026-10-18 21:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('my_app', '0016_rebuild_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='mediaitem',
+            index=models.Index(fields=['image'], name='mediaitem_image_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='newspost',
+            index=models.Index(fields=['image'], name='newspost_image_idx'),
+        ),
+    ]
@@ -1,34 +1,119 @@
-from django.db import models
-from django.db.models import Max
+import uuid
+
+from django.db import IntegrityError, models, transaction
+from django.db.models import F, Max, Q
+from django.db.models.functions import Greatest
+from django.utils import timezone
 
 # Create your models here.
 
-class Page(models.Model):
+class LowercaseSlugField(models.SlugField):
+    """
+    Slug stored in canonical lowercase. Lookup values are lowercased too, so
+    `slug=` stays case-insensitive for callers while using the unique index.
+    """
+
+    def get_prep_value(self, value):
+        value = super().get_prep_value(value)
+        return value.lower() if isinstance(value, str) else value
+
+    def pre_save(self, model_instance, add):
+        value = getattr(model_instance, self.attname)
+        if isinstance(value, str) and value != value.lower():
+            value = value.lower()
+            setattr(model_instance, self.attname, value)
+        return value
+
+
+class OrderSequence(models.Model):
+    """
+    Last `order` handed out per model. Allocating is one row update, which
+    also serializes concurrent inserts, instead of a Max() scan that two
+    requests can both read before either writes.
+    """
+    label = models.CharField(max_length=100, unique=True)
+    value = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f'{self.label}: {self.value}'
+
+    @classmethod
+    def allocate(cls, model):
+        label = model._meta.label_lower
+        with transaction.atomic():
+            if cls.objects.filter(label=label).update(value=F('value') + 1):
+                return cls.objects.filter(label=label).values_list('value', flat=True).get()
+            # First allocation for this model: continue after the existing rows.
+            start = (model.objects.aggregate(max_order=Max('order'))['max_order'] or 0) + 1
+            try:
+                with transaction.atomic():
+                    cls.objects.create(label=label, value=start)
+            except IntegrityError:
+                return cls.allocate(model)
+            return start
+
+    @classmethod
+    def advance(cls, model, value):
+        """Make sure later allocations come after `value`."""
+        cls.objects.filter(label=model._meta.label_lower).update(value=Greatest(F('value'), value))
+
+
+class OrderedMixin:
+    """Gives rows saved with `order` 0 the next position from OrderSequence."""
+
+    def save(self, *args, **kwargs):
+        if self.order == 0:
+            self.order = OrderSequence.allocate(type(self))
+        elif self._state.adding:
+            OrderSequence.advance(type(self), self.order)
+        super().save(*args, **kwargs)
+
+
+class FlaggedManager(models.Manager):
+    """
+    Only the rows whose boolean `flag` is set: the published or active ones
+    the public views show. Each is backed by a partial index on that flag.
+    """
+
+    def __init__(self, flag):
+        super().__init__()
+        self.flag = flag
+
+    def get_queryset(self):
+        return super().get_queryset().filter(**{self.flag: True})
+
+
+# Exclusion token for pages flagged `is_system`; slugs cannot contain ':'.
+SYSTEM_PAGES = ':system'
+
+
+class Page(OrderedMixin, models.Model):
     title = models.CharField(max_length=200)
-    slug = models.SlugField(unique=True)
+    slug = LowercaseSlugField(unique=True)
     excerpt = models.TextField(blank=True, help_text="Short description for page lists")
     content = models.TextField()
     address = models.CharField(max_length=255, blank=True, help_text="Address for contact page")
     phone = models.CharField(max_length=50, blank=True, help_text="Phone number for contact page")
     email = models.EmailField(blank=True, help_text="Email for contact page")
     is_published = models.BooleanField(default=True)
+    is_system = models.BooleanField(default=False, help_text="Hidden from page lists by default (e.g. contact, social media)")
     order = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['is_system', 'order', 'id'], name='page_system_order_idx'),
+            models.Index(fields=['order', 'id'], name='page_order_idx'),
+        ]
+
     def __str__(self):
         return self.title
-    
-    def save(self, *args, **kwargs):
-        if self.order == 0:
-            last_order = Page.objects.aggregate(max_order=Max('order'))['max_order'] or 0
-            self.order = last_order + 1
-        super().save(*args, **kwargs)
 
 
-class ClassSection(models.Model):
+class ClassSection(OrderedMixin, models.Model):
     name = models.CharField(max_length=150)
-    slug = models.SlugField(unique=True)
+    slug = LowercaseSlugField(unique=True)
     excerpt = models.TextField(blank=True, help_text="Short description for class cards")
     description = models.TextField()
     age_group = models.CharField(max_length=100)
@@ -36,6 +121,16 @@ class ClassSection(models.Model):
     schedule = models.CharField(max_length=200)
     is_active = models.BooleanField(default=True)
     order = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = models.Manager()
+    active = FlaggedManager('is_active')
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['order', 'id'], name='classsection_order_idx'),
+            models.Index(fields=['order', 'id'], name='classsection_active_order_idx', condition=Q(is_active=True)),
+        ]
 
     def __str__(self):
         return self.name
@@ -43,17 +138,27 @@ class ClassSection(models.Model):
 
 class NewsPost(models.Model):
     title = models.CharField(max_length=200)
-    slug = models.SlugField(unique=True)
+    slug = LowercaseSlugField(unique=True)
     body = models.TextField()
     image = models.ImageField(upload_to="news/", blank=True, null=True)
+    image_srcset = models.JSONField(default=dict, blank=True, editable=False, help_text="Resized copies of image, e.g. {'320w': name}")
     published_at = models.DateTimeField()
     is_published = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = models.Manager()
+    published = FlaggedManager('is_published')
 
     def __str__(self):
         return self.title
 
     class Meta:
         ordering = ["-published_at"]
+        indexes = [
+            models.Index(fields=['-published_at', 'id'], name='newspost_published_idx', condition=Q(is_published=True)),
+            # images.in_use(): is a file still referenced before its derivatives go.
+            models.Index(fields=['image'], name='newspost_image_idx'),
+        ]
 
 
 class ContactMessage(models.Model):
@@ -62,18 +167,32 @@ class ContactMessage(models.Model):
     phone = models.CharField(max_length=50, blank=True)
     subject = models.CharField(max_length=200)
     message = models.TextField()
-    submitted_at = models.DateTimeField(auto_now_add=True)
+    # Not auto_now_add: spooled submissions keep the time they were received.
+    submitted_at = models.DateTimeField(default=timezone.now, editable=False)
     is_read = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+    # Set for submissions that came through the intake spool; makes replaying a flush a no-op.
+    intake_id = models.UUIDField(null=True, blank=True, unique=True, editable=False)
 
     def __str__(self):
         return self.subject
 
 
-class SocialLink(models.Model):
+class SocialLink(OrderedMixin, models.Model):
     platform = models.CharField(max_length=50)
     url = models.URLField()
     is_active = models.BooleanField(default=True)
     order = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = models.Manager()
+    active = FlaggedManager('is_active')
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['order', 'id'], name='sociallink_order_idx'),
+            models.Index(fields=['order', 'id'], name='sociallink_active_order_idx', condition=Q(is_active=True)),
+        ]
 
     def __str__(self):
         return self.platform
@@ -84,11 +203,20 @@ MEDIA_TYPE_CHOICES = [('photo', 'Photo'), ('video', 'Video')]
 
 class EventGallery(models.Model):
     title = models.CharField(max_length=200)
-    slug = models.SlugField(unique=True)
+    slug = LowercaseSlugField(unique=True)
     excerpt = models.TextField(blank=True, help_text="Short description for gallery cards")
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     is_published = models.BooleanField(default=True)
 
+    objects = models.Manager()
+    published = FlaggedManager('is_published')
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created_at', 'id'], name='eventgallery_published_idx', condition=Q(is_published=True)),
+        ]
+
     def __str__(self):
         return self.title
 
@@ -97,10 +225,48 @@ class MediaItem(models.Model):
     media_type = models.CharField(max_length=10, choices=MEDIA_TYPE_CHOICES)
     title = models.CharField(max_length=200, blank=True)
     image = models.ImageField(upload_to="media/photos/", blank=True, null=True)
+    image_srcset = models.JSONField(default=dict, blank=True, editable=False, help_text="Resized copies of image, e.g. {'320w': name}")
     video_url = models.URLField(blank=True)
     is_published = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     event = models.ForeignKey(EventGallery, on_delete=models.CASCADE, related_name='media_items', blank=True, null=True)
 
+    objects = models.Manager()
+    published = FlaggedManager('is_published')
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created_at', 'id'], name='mediaitem_published_idx', condition=Q(is_published=True)),
+            # Gallery pages: one gallery's published media, oldest first.
+            models.Index(
+                fields=['event', 'created_at', 'id'], name='mediaitem_event_published_idx', condition=Q(is_published=True)
+            ),
+            # images.in_use(): is a file still referenced before its derivatives go.
+            models.Index(fields=['image'], name='mediaitem_image_idx'),
+        ]
+
     def __str__(self):
         return self.title or self.media_type
+
+
+class ChunkedUpload(models.Model):
+    """
+    A photo upload in progress. Chunks are appended to a part file on disk
+    (see my_app/uploads.py) until `offset` reaches `size`, then the file is
+    finalized into a MediaItem with the fields kept in `media_fields`.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    offset = models.PositiveBigIntegerField(default=0)
+    media_fields = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'{self.filename} ({self.offset}/{self.size})'
+
+    @property
+    def is_complete(self):
+        return self.offset == self.size
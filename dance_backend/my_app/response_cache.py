@@ -0,0 +1,192 @@
+import functools
+import hashlib
+import uuid
+
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+
+CACHE_ALIAS = 'api'
+STATE_PREFIX = 'api:state:'
+INDEX_PREFIX = 'api:index:'
+ENTRY_PREFIX = 'api:response:'
+STATS_KEYS = {'hits': 'api:stats:hits', 'misses': 'api:stats:misses'}
+# An endpoint with more cached query-string variants than this starts over
+# rather than letting its index grow without bound.
+MAX_VARIANTS = 256
+# Index slot of a variant that invalidate() has already purged.
+PURGED = (None, None)
+REPLAYED_HEADERS = ('ETag', 'Last-Modified', 'Cache-Control')
+
+
+def get_cache():
+    return caches[CACHE_ALIAS]
+
+
+def cache_response(*models, exclusions=None):
+    """
+    Cache the rendered JSON body of a GET handler per path and query string.
+
+    Entries are purged by `invalidate()` when any of `models` changes.
+    `exclusions(request)` may return tokens (slugs, ':system') naming the rows
+    a variant filters out, so a change to one of those rows leaves that
+    variant in place.
+    """
+    labels = tuple(model._meta.label_lower for model in models)
+
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(view, request, *args, **kwargs):
+            if request.accepted_renderer.format != 'json':
+                return method(view, request, *args, **kwargs)
+
+            cache = get_cache()
+            generations = _generations(cache, labels)
+            key = _entry_key(request, generations)
+            entry = cache.get(key)
+            if entry is not None:
+                _count(cache, 'hits')
+                return _replay(request, entry)
+
+            _count(cache, 'misses')
+            response = method(view, request, *args, **kwargs)
+            if response.status_code == 200 and hasattr(response, 'add_post_render_callback'):
+                excluded = sorted(exclusions(request)) if exclusions else None
+                response.add_post_render_callback(
+                    lambda rendered: _store(cache, key, rendered, generations, excluded)
+                )
+            response['X-Cache'] = 'MISS'
+            return response
+        return wrapper
+    return decorator
+
+
+def invalidate(model, hidden_if=None):
+    """
+    Purge cached responses that depend on `model`.
+
+    `hidden_if` lists token sets that each hide the changed row both before
+    and after the change, e.g. [{'old-slug', 'new-slug'}, {':system'}].
+    Variants whose exclusions contain any of those sets are kept since the
+    row is invisible to them.
+    """
+    cache = get_cache()
+    state_key = STATE_PREFIX + model._meta.label_lower
+    generation = cache.get(state_key)
+    if generation is None:
+        return
+    count = cache.get(_count_key(generation)) or 0
+    slot_keys = [_slot_key(generation, slot) for slot in range(1, count + 1)]
+    slots = cache.get_many(slot_keys)
+    if len(slots) < count:
+        # A slot was evicted, or claimed by a request still storing its
+        # entry; neither can be purged by key, so drop the whole generation.
+        cache.set(state_key, uuid.uuid4().hex, None)
+        return
+    hidden_if = [set(tokens) for tokens in hidden_if or () if tokens]
+    stale = {
+        slot_key: key for slot_key, (key, excluded) in slots.items()
+        if key is not None and (excluded is None or not any(tokens <= set(excluded) for tokens in hidden_if))
+    }
+    if not stale:
+        return
+    cache.delete_many(list(stale.values()))
+    cache.set_many(dict.fromkeys(stale, PURGED), None)
+
+
+def clear():
+    get_cache().clear()
+
+
+def stats():
+    cache = get_cache()
+    values = cache.get_many(STATS_KEYS.values())
+    hits = values.get(STATS_KEYS['hits'], 0)
+    misses = values.get(STATS_KEYS['misses'], 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': hits / total if total else 0.0,
+    }
+
+
+def _generations(cache, labels):
+    """
+    Each model keeps a random generation token that namespaces the entries
+    cached for it and their index. If the token is evicted a new one is
+    minted, so entries it indexed become unreachable instead of stale.
+    """
+    state_keys = [STATE_PREFIX + label for label in labels]
+    states = cache.get_many(state_keys)
+    generations = []
+    for state_key in state_keys:
+        generation = states.get(state_key)
+        if generation is None:
+            cache.add(state_key, uuid.uuid4().hex, None)
+            generation = cache.get(state_key)
+        generations.append((state_key, generation))
+    return tuple(generations)
+
+
+def _count_key(generation):
+    return f'{INDEX_PREFIX}{generation}:count'
+
+
+def _slot_key(generation, slot):
+    return f'{INDEX_PREFIX}{generation}:{slot}'
+
+
+def _entry_key(request, generations):
+    seed = '|'.join([request.get_full_path()] + [generation for _, generation in generations])
+    return ENTRY_PREFIX + hashlib.md5(seed.encode('utf-8'), usedforsecurity=False).hexdigest()
+
+
+def _store(cache, key, response, generations, excluded):
+    """
+    Cache the entry and index it under every generation. Each index entry
+    is a slot of its own, numbered by an atomic incr(), so workers storing
+    at the same time never overwrite each other's.
+    """
+    cache.set(key, {
+        'content': response.content,
+        'content_type': response['Content-Type'],
+        'headers': {name: response[name] for name in REPLAYED_HEADERS if response.has_header(name)},
+    })
+    for state_key, generation in generations:
+        count_key = _count_key(generation)
+        cache.add(count_key, 0, None)
+        try:
+            slot = cache.incr(count_key)
+        except ValueError:
+            # The counter was evicted; an entry nothing indexes could go stale.
+            cache.delete(key)
+            return
+        if slot > MAX_VARIANTS:
+            cache.set(state_key, uuid.uuid4().hex, None)
+        else:
+            cache.set(_slot_key(generation, slot), (key, excluded), None)
+
+
+def _replay(request, entry):
+    headers = entry['headers']
+    not_modified = get_conditional_response(
+        request,
+        etag=headers.get('ETag'),
+        last_modified=parse_http_date_safe(headers.get('Last-Modified', '')),
+    )
+    response = not_modified or HttpResponse(entry['content'], content_type=entry['content_type'])
+    for name, value in headers.items():
+        response[name] = value
+    response['X-Cache'] = 'HIT'
+    return response
+
+
+def _count(cache, name):
+    key = STATS_KEYS[name]
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
@@ -0,0 +1,281 @@
+"""
+Full-text search over pages, news posts and class sections.
+
+Documents live in `my_app_search_index`, an FTS5 virtual table on SQLite or a
+table with a GIN-indexed tsvector on Postgres (created by migration 0009 and
+filled by 0016). Both hold an accent- and case-folded copy of the text for
+matching plus the original for display. The database does the matching and ranking; highlighting is
+done here on the few rows returned so both backends render the same way.
+"""
+import html
+import re
+import unicodedata
+from functools import lru_cache
+
+from django.db import connection
+from django.utils.html import escape, strip_tags
+
+TABLE = 'my_app_search_index'
+SNIPPET_WORDS = 30
+MARK_OPEN, MARK_CLOSE = '<mark>', '</mark>'
+WORD_RE = re.compile(r'\w+')
+
+
+class SearchNotSupported(Exception):
+    pass
+
+
+def _page_document(page):
+    return page.is_published, page.title, ' '.join((page.excerpt, page.content))
+
+
+def _news_document(post):
+    return post.is_published, post.title, post.body
+
+
+def _class_document(section):
+    return section.is_active, section.name, ' '.join((section.excerpt, section.description))
+
+
+def _sources(apps=None):
+    # Migrations pass their historical app registry.
+    if apps is None:
+        from django.apps import apps
+    return {
+        'page': (apps.get_model('my_app', 'Page'), _page_document),
+        'news': (apps.get_model('my_app', 'NewsPost'), _news_document),
+        'class': (apps.get_model('my_app', 'ClassSection'), _class_document),
+    }
+
+
+def kind_for(model):
+    for kind, (source, _) in _sources().items():
+        if source is model:
+            return kind
+    return None
+
+
+@lru_cache(maxsize=4096)
+def _fold_char(char):
+    base = unicodedata.normalize('NFD', char)[0].lower()
+    if len(base) != 1:
+        base = char
+    return 'σ' if base == 'ς' else base
+
+
+def fold(text):
+    """Strip accents and case one character at a time, keeping offsets intact."""
+    return ''.join(_fold_char(char) for char in text)
+
+
+def plain_text(markup):
+    return ' '.join(html.unescape(strip_tags(markup or '')).split())
+
+
+def query_terms(query):
+    return WORD_RE.findall(fold(query))[:16]
+
+
+def index_instance(instance):
+    kind = kind_for(type(instance))
+    visible, title, body = _sources()[kind][1](instance)
+    backend = get_backend()
+    if not visible:
+        backend.delete(kind, instance.pk)
+        return
+    title, body = plain_text(title), plain_text(body)
+    backend.upsert(kind, instance.pk, instance.slug, title, body)
+
+
+def remove_instance(instance):
+    get_backend().delete(kind_for(type(instance)), instance.pk)
+
+
+def rebuild(apps=None):
+    backend = get_backend()
+    backend.clear()
+    count = 0
+    for kind, (model, document) in _sources(apps).items():
+        rows = []
+        for instance in model.objects.iterator(chunk_size=500):
+            visible, title, body = document(instance)
+            if visible:
+                rows.append((kind, instance.pk, instance.slug, plain_text(title), plain_text(body)))
+        backend.bulk_insert(rows)
+        count += len(rows)
+    return count
+
+
+def search(query, kinds=None, limit=20):
+    terms = query_terms(query)
+    if not terms:
+        return []
+    rows = get_backend().query(terms, kinds, limit)
+    return [
+        {
+            'type': kind,
+            'id': object_id,
+            'slug': slug,
+            'title': highlight(title, terms),
+            'snippet': snippet(body, terms),
+            'rank': round(rank, 6),
+        }
+        for kind, object_id, slug, title, body, rank in rows
+    ]
+
+
+def _match_spans(text, terms):
+    folded = fold(text)
+    return [
+        match.span() for match in WORD_RE.finditer(folded)
+        if any(match.group().startswith(term) for term in terms)
+    ]
+
+
+def _render(text, spans, start, end):
+    out, cursor = [], start
+    for span_start, span_end in spans:
+        if span_start < start or span_end > end:
+            continue
+        out.append(escape(text[cursor:span_start]))
+        out.append(MARK_OPEN + escape(text[span_start:span_end]) + MARK_CLOSE)
+        cursor = span_end
+    out.append(escape(text[cursor:end]))
+    return ''.join(out)
+
+
+def highlight(text, terms):
+    return _render(text, _match_spans(text, terms), 0, len(text))
+
+
+def snippet(text, terms, words=SNIPPET_WORDS):
+    """HTML-escaped window of `words` words around the first match."""
+    boundaries = [match.span() for match in WORD_RE.finditer(text)]
+    if not boundaries:
+        return ''
+    spans = _match_spans(text, terms)
+    first = 0
+    if spans:
+        first = next((i for i, (start, _) in enumerate(boundaries) if start >= spans[0][0]), 0)
+    lo = max(0, first - words // 3)
+    hi = min(len(boundaries), lo + words)
+    lo = max(0, hi - words)
+    start = 0 if lo == 0 else boundaries[lo][0]
+    end = len(text) if hi == len(boundaries) else boundaries[hi - 1][1]
+    body = _render(text, spans, start, end)
+    return ('…' if start > 0 else '') + body + ('…' if end < len(text) else '')
+
+
+class SQLiteBackend:
+    """
+    FTS5 table with kind/object_id/slug/title/body UNINDEXED and the folded
+    copies indexed. The rowid is derived from (kind, object_id) so single
+    documents are replaced by rowid rather than by scanning the table.
+    """
+    kind_codes = {'page': 1, 'news': 2, 'class': 3}
+
+    def rowid(self, kind, object_id):
+        return object_id * 8 + self.kind_codes[kind]
+
+    def upsert(self, kind, object_id, slug, title, body):
+        self.delete(kind, object_id)
+        self.bulk_insert([(kind, object_id, slug, title, body)])
+
+    def bulk_insert(self, rows):
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT INTO {TABLE} (rowid, kind, object_id, slug, title, body, search_title, search_body) '
+                'VALUES (%s, %s, %s, %s, %s, %s, %s, %s)',
+                [(self.rowid(kind, object_id), kind, object_id, slug, title, body, fold(title), fold(body))
+                 for kind, object_id, slug, title, body in rows],
+            )
+
+    def delete(self, kind, object_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {TABLE} WHERE rowid = %s', [self.rowid(kind, object_id)])
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {TABLE}')
+
+    def query(self, terms, kinds, limit):
+        match = ' '.join(f'"{term}"*' for term in terms)
+        sql = (
+            f'SELECT kind, object_id, slug, title, body, -bm25({TABLE}, 0, 0, 0, 0, 0, 10.0, 1.0) AS rank '
+            f'FROM {TABLE} WHERE {TABLE} MATCH %s'
+        )
+        params = [match]
+        if kinds:
+            sql += f" AND kind IN ({', '.join(['%s'] * len(kinds))})"
+            params += list(kinds)
+        sql += ' ORDER BY rank DESC LIMIT %s'
+        params.append(limit)
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+
+
+class PostgresBackend:
+    """Plain table with a weighted tsvector over the folded text and a GIN index."""
+    config = 'simple'
+
+    def _document_sql(self):
+        return (
+            f"setweight(to_tsvector('{self.config}', %s), 'A') || "
+            f"setweight(to_tsvector('{self.config}', %s), 'B')"
+        )
+
+    def upsert(self, kind, object_id, slug, title, body):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {TABLE} (kind, object_id, slug, title, body, document) '
+                f'VALUES (%s, %s, %s, %s, %s, {self._document_sql()}) '
+                'ON CONFLICT (kind, object_id) DO UPDATE SET slug = EXCLUDED.slug, '
+                'title = EXCLUDED.title, body = EXCLUDED.body, document = EXCLUDED.document',
+                [kind, object_id, slug, title, body, fold(title), fold(body)],
+            )
+
+    def bulk_insert(self, rows):
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT INTO {TABLE} (kind, object_id, slug, title, body, document) '
+                f'VALUES (%s, %s, %s, %s, %s, {self._document_sql()})',
+                [(kind, object_id, slug, title, body, fold(title), fold(body))
+                 for kind, object_id, slug, title, body in rows],
+            )
+
+    def delete(self, kind, object_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {TABLE} WHERE kind = %s AND object_id = %s', [kind, object_id])
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'TRUNCATE {TABLE}')
+
+    def query(self, terms, kinds, limit):
+        sql = (
+            f'SELECT kind, object_id, slug, title, body, ts_rank_cd(document, q) AS rank '
+            f"FROM {TABLE}, to_tsquery('{self.config}', %s) q WHERE document @@ q"
+        )
+        params = [' & '.join(f'{term}:*' for term in terms)]
+        if kinds:
+            sql += ' AND kind = ANY(%s)'
+            params.append(list(kinds))
+        sql += ' ORDER BY rank DESC LIMIT %s'
+        params.append(limit)
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+
+
+BACKENDS = {
+    'sqlite': SQLiteBackend,
+    'postgresql': PostgresBackend,
+}
+
+
+def get_backend():
+    try:
+        return BACKENDS[connection.vendor]()
+    except KeyError:
+        raise SearchNotSupported(f'Full-text search is not available on {connection.vendor}.')
@@ -1,8 +1,92 @@
-from rest_framework import serializers
-from .models import Page, ClassSection, NewsPost, ContactMessage, SocialLink, MediaItem, EventGallery
-
+import hashlib
+import os
 
-class PageSerializer(serializers.ModelSerializer):
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.validators import get_available_image_extensions
+from django.urls import reverse
+from rest_framework import serializers
+from . import timing
+from .images import fallback_name
+from .models import Page, ClassSection, NewsPost, ContactMessage, SocialLink, MediaItem, EventGallery, ChunkedUpload
+
+
+class TimedRepresentationMixin:
+    """Counts to_representation() as serialize time in a sampled request's Server-Timing."""
+
+    def to_representation(self, instance):
+        if timing.current.get() is None:
+            return super().to_representation(instance)
+        with timing.phase('serialize'):
+            return super().to_representation(instance)
+
+
+class SparseFieldsetMixin(TimedRepresentationMixin):
+    """
+    Trims the output to the fields named in `?fields=` or drops those in
+    `?omit=`, and pushes the same projection into the queryset with only()
+    so the skipped columns are never read from the database.
+    """
+    fields_query_param = 'fields'
+    omit_query_param = 'omit'
+
+    def __init__(self, *args, fields=None, omit=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+        for name in omit or ():
+            self.fields.pop(name, None)
+
+    @classmethod
+    def get_sparse_fieldset(cls, request):
+        selection = {}
+        available = set(cls().fields)
+        for key, param in (('fields', cls.fields_query_param), ('omit', cls.omit_query_param)):
+            raw = request.query_params.get(param)
+            if raw is None:
+                continue
+            names = [name.strip() for name in raw.split(',') if name.strip()]
+            unknown = sorted(set(names) - available)
+            if unknown:
+                raise serializers.ValidationError({param: f"Unknown field(s): {', '.join(unknown)}"})
+            selection[key] = names
+        return selection
+
+    @classmethod
+    def restrict_queryset(cls, queryset, selection, required=()):
+        columns = {field.name for field in queryset.model._meta.concrete_fields}
+        required = {name.lstrip('-') for name in required}
+        if 'fields' in selection:
+            selected = set(selection['fields']) - set(selection.get('omit', ()))
+            return queryset.only(*sorted((selected | required) & columns))
+        if 'omit' in selection:
+            return queryset.defer(*sorted((set(selection['omit']) - required) & columns))
+        return queryset
+
+
+class SrcsetField(serializers.Field):
+    """
+    {'320w': url} for a row's `image_srcset`. Each URL is the format-negotiating
+    image view, versioned by file name so it can be cached for good.
+    """
+    def __init__(self, view_name, **kwargs):
+        self.view_name = view_name
+        kwargs['source'] = '*'
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, instance):
+        request = self.context.get('request')
+        srcset = {}
+        for descriptor, variants in (instance.image_srcset or {}).items():
+            version = hashlib.md5(fallback_name(variants).encode('utf-8'), usedforsecurity=False).hexdigest()[:8]
+            url = f"{reverse(self.view_name, kwargs={'pk': instance.pk, 'descriptor': descriptor})}?v={version}"
+            srcset[descriptor] = request.build_absolute_uri(url) if request is not None else url
+        return srcset
+
+
+class PageSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Page
         fields = '__all__'
@@ -11,7 +95,7 @@ class PageSerializer(serializers.ModelSerializer):
         return value.strip().lower()
 
 
-class ClassSectionSerializer(serializers.ModelSerializer):
+class ClassSectionSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     def validate_name(self, value):
         return value.strip()
     
@@ -26,7 +110,7 @@ class ClassSectionSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
-class EventGallerySerializer(serializers.ModelSerializer):
+class EventGallerySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = EventGallery
         fields = '__all__'
@@ -35,7 +119,9 @@ class EventGallerySerializer(serializers.ModelSerializer):
         return value.strip().lower()
 
 
-class NewsPostSerializer(serializers.ModelSerializer):
+class NewsPostSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    image_srcset = SrcsetField('news-post-image')
+
     def validate_title(self, value):
         return value.strip()
     
@@ -50,16 +136,16 @@ class NewsPostSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
-class ContactMessageSerializer(serializers.ModelSerializer):
+class ContactMessageSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     def validate_email(self, value):
         return value.lower().strip()
 
     class Meta:
         model = ContactMessage
-        fields = '__all__'
+        exclude = ('intake_id',)
 
 
-class SocialLinkSerializer(serializers.ModelSerializer):
+class SocialLinkSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     def validate_url(self, value):
         if not (value.startswith('http://') or value.startswith('https://')):
             raise serializers.ValidationError("URL must start with http:// or https://")
@@ -70,11 +156,36 @@ class SocialLinkSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
-class MediaItemSerializer(serializers.ModelSerializer):
+class PreloadedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    Resolves ids from `context['preloaded'][field_name]`, a pk -> row dict
+    loaded once for a whole batch, instead of querying once per item.
+    """
+    def to_internal_value(self, data):
+        preloaded = self.context.get('preloaded', {}).get(self.field_name)
+        if preloaded is None:
+            return super().to_internal_value(data)
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            pk = self.get_queryset().model._meta.pk.to_python(data)
+        except (TypeError, ValueError, DjangoValidationError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            return preloaded[pk]
+        except KeyError:
+            self.fail('does_not_exist', pk_value=data)
+
+
+class MediaItemSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    image_srcset = SrcsetField('media-item-image')
+
     def validate(self, data):
-        media_type = data.get('media_type')
-        image = data.get('image')
-        video_url = data.get('video_url')
+        # A partial update is checked against the fields it leaves unchanged.
+        current = self.instance if self.partial and isinstance(self.instance, MediaItem) else None
+        media_type = data.get('media_type', getattr(current, 'media_type', None))
+        image = data.get('image', getattr(current, 'image', None))
+        video_url = data.get('video_url', getattr(current, 'video_url', None))
 
         if media_type == 'photo' and not image:
             raise serializers.ValidationError("Image is required for photo media type.")
@@ -92,4 +203,53 @@ class MediaItemSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = MediaItem
-        fields = '__all__'
\ No newline at end of file
+        fields = '__all__'
+
+
+class MediaItemBulkSerializer(MediaItemSerializer):
+    event = PreloadedPrimaryKeyRelatedField(queryset=EventGallery.objects.all(), required=False, allow_null=True)
+
+
+class EventGalleryWithMediaSerializer(EventGallerySerializer):
+    """Gallery with its published media, read from a `published_media_items` prefetch."""
+    media_items = MediaItemSerializer(many=True, read_only=True, source='published_media_items')
+
+    class Meta(EventGallerySerializer.Meta):
+        pass
+
+
+class ChunkedUploadSerializer(TimedRepresentationMixin, serializers.ModelSerializer):
+    """Starts a resumable photo upload; title/event/is_published are kept for the MediaItem."""
+    media_field_names = ('title', 'event', 'is_published')
+
+    title = serializers.CharField(max_length=200, required=False, allow_blank=True, write_only=True)
+    event = serializers.PrimaryKeyRelatedField(
+        queryset=EventGallery.objects.all(), required=False, allow_null=True, write_only=True
+    )
+    is_published = serializers.BooleanField(required=False, write_only=True)
+
+    class Meta:
+        model = ChunkedUpload
+        fields = ('id', 'filename', 'size', 'offset', 'created_at', 'title', 'event', 'is_published')
+        read_only_fields = ('offset',)
+
+    def validate_filename(self, value):
+        value = os.path.basename(value.strip())
+        extension = os.path.splitext(value)[1][1:].lower()
+        if extension not in get_available_image_extensions():
+            raise serializers.ValidationError(f"File extension '{extension}' is not an image type.")
+        return value
+
+    def validate_size(self, value):
+        if not 0 < value <= settings.CHUNKED_UPLOAD_MAX_SIZE:
+            raise serializers.ValidationError(f'Size must be between 1 and {settings.CHUNKED_UPLOAD_MAX_SIZE} bytes.')
+        return value
+
+    def create(self, validated_data):
+        media_fields = {
+            name: validated_data.pop(name) for name in self.media_field_names if name in validated_data
+        }
+        if media_fields.get('event') is not None:
+            media_fields['event'] = media_fields['event'].pk
+        return ChunkedUpload.objects.create(media_fields=media_fields, **validated_data)
+
@@ -0,0 +1,108 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import images, response_cache, search, snapshots
+from .models import SYSTEM_PAGES, Page, ClassSection, NewsPost, SocialLink, EventGallery, MediaItem
+
+CACHED_MODELS = (Page, ClassSection, NewsPost, SocialLink, EventGallery, MediaItem)
+SEARCHED_MODELS = (Page, NewsPost, ClassSection)
+SNAPSHOT_MODELS = (Page, ClassSection, NewsPost, EventGallery)
+
+
+@receiver(pre_save, sender=Page)
+def remember_page_visibility(sender, instance, **kwargs):
+    # A renamed or re-flagged page leaves the variants that hid its old state.
+    previous = None
+    if instance.pk is not None:
+        previous = sender.objects.filter(pk=instance.pk).values_list('slug', 'is_system').first()
+    instance._previous_visibility = previous
+
+
+def purge_response_cache(sender, instance, **kwargs):
+    hidden_if = None
+    if sender is Page:
+        previous_slug, was_system = getattr(instance, '_previous_visibility', None) or (instance.slug, instance.is_system)
+        hidden_if = [{previous_slug.lower(), instance.slug.lower()}]
+        if was_system and instance.is_system:
+            hidden_if.append({SYSTEM_PAGES})
+
+    purge_cached_responses(sender, hidden_if=hidden_if)
+
+
+def purge_cached_responses(model, hidden_if=None):
+    """Also called directly by bulk writes, which send no model signals."""
+    def purge():
+        response_cache.invalidate(model, hidden_if=hidden_if)
+
+    # Purge now and again after commit, so a reader that refilled the cache
+    # while the transaction was still open cannot pin the old rows.
+    purge()
+    transaction.on_commit(purge)
+
+
+for model in CACHED_MODELS:
+    post_save.connect(purge_response_cache, sender=model, dispatch_uid=f'purge_response_cache_save_{model.__name__}')
+    post_delete.connect(purge_response_cache, sender=model, dispatch_uid=f'purge_response_cache_delete_{model.__name__}')
+
+
+def sync_search_index(sender, instance, **kwargs):
+    # Runs inside the caller's transaction, so a rollback drops the index change too.
+    try:
+        search.index_instance(instance)
+    except search.SearchNotSupported:
+        pass
+
+
+def drop_from_search_index(sender, instance, **kwargs):
+    try:
+        search.remove_instance(instance)
+    except search.SearchNotSupported:
+        pass
+
+
+for model in SEARCHED_MODELS:
+    post_save.connect(sync_search_index, sender=model, dispatch_uid=f'sync_search_index_{model.__name__}')
+    post_delete.connect(drop_from_search_index, sender=model, dispatch_uid=f'drop_from_search_index_{model.__name__}')
+
+
+def reset_image_srcset(sender, instance, raw=False, **kwargs):
+    # A new upload is not committed to storage yet; its old sizes no longer apply.
+    if not instance.image or not instance.image._committed:
+        instance.image_srcset = {}
+        if not raw and instance.pk is not None:
+            instance._previous_image = sender.objects.filter(pk=instance.pk).values_list('image', 'image_srcset').first()
+
+
+def render_image_derivatives(sender, instance, raw=False, **kwargs):
+    previous = instance.__dict__.pop('_previous_image', None)
+    if previous is not None:
+        images.release(instance, *previous)
+    if not raw and instance.image and not instance.image_srcset:
+        images.generate(instance)
+
+
+for model in images.models():
+    pre_save.connect(reset_image_srcset, sender=model, dispatch_uid=f'reset_image_srcset_{model.__name__}')
+    post_save.connect(render_image_derivatives, sender=model, dispatch_uid=f'render_image_derivatives_{model.__name__}')
+
+
+def remember_previous_slug(sender, instance, **kwargs):
+    # Page already loads its old slug in remember_page_visibility.
+    if sender is Page or instance.pk is None or not snapshots.is_published():
+        return
+    instance._previous_slug = sender.objects.filter(pk=instance.pk).values_list('slug', flat=True).first()
+
+
+def publish_snapshot(sender, instance, **kwargs):
+    if sender is Page:
+        previous = (getattr(instance, '_previous_visibility', None) or (None,))[0]
+    else:
+        previous = getattr(instance, '_previous_slug', None)
+    snapshots.schedule(sender, {previous, instance.slug})
+
+
+for model in SNAPSHOT_MODELS:
+    pre_save.connect(remember_previous_slug, sender=model, dispatch_uid=f'remember_previous_slug_{model.__name__}')
+    post_save.connect(publish_snapshot, sender=model, dispatch_uid=f'publish_snapshot_save_{model.__name__}')
+    post_delete.connect(publish_snapshot, sender=model, dispatch_uid=f'publish_snapshot_delete_{model.__name__}')
@@ -0,0 +1,237 @@
+"""
+Slow-query log for SQL issued by my_app views.
+
+SlowQueryMiddleware times every statement a request runs. One that takes
+SLOW_QUERY_THRESHOLD_MS or longer while a my_app view handles the request
+is logged as JSON on the my_app.slow_queries logger with its parameters,
+the view's URL name, a fingerprint and the query plan, and added to the
+per-fingerprint totals in a SQLite file at SLOW_QUERY_STORE shared by every
+worker. `manage.py slow_queries` lists the worst offenders from there.
+
+The fingerprint is the statement with literals, placeholders and IN lists
+collapsed, so `slug = 'a'` and `slug = 'b'`, or IN lists of any length,
+count as one query. Plans come from EXPLAIN QUERY PLAN on SQLite and
+EXPLAIN on Postgres (EXPLAIN (ANALYZE, BUFFERS) with
+SLOW_QUERY_EXPLAIN_ANALYZE, which runs the SELECT a second time). Only
+SELECTs are explained, once per fingerprint per process, on a cursor of
+their own so the EXPLAIN is not counted as a query of the request. The
+log line flags full table scans found in the plan and SELECTs without a
+LIMIT.
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from .timing import wrap_connections
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS offenders ('
+    'fingerprint TEXT NOT NULL, view TEXT NOT NULL, statement TEXT NOT NULL, params TEXT NOT NULL, plan TEXT, '
+    'count INTEGER NOT NULL, total_ms REAL NOT NULL, max_ms REAL NOT NULL, last_seen REAL NOT NULL, '
+    'PRIMARY KEY (fingerprint, view)) WITHOUT ROWID'
+)
+APP_PREFIX = __name__.rpartition('.')[0] + '.'
+# Plans kept per process; a process that has seen more fingerprints starts over.
+MAX_PLANS = 1000
+
+_local = threading.local()
+_plans = {}
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'(?<![\w"])-?\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_SQLITE_SCAN = re.compile(r'^SCAN (?:TABLE )?"?(\w+)"?(?! USING)')
+_POSTGRES_SCAN = re.compile(r'Seq Scan on "?(\w+)"?')
+
+
+def is_enabled():
+    return settings.SLOW_QUERY_LOG_ENABLED
+
+
+def _connection():
+    key = (os.getpid(), str(settings.SLOW_QUERY_STORE))
+    opened = _local.__dict__.setdefault('connections', {})
+    conn = opened.get(key)
+    if conn is None:
+        os.makedirs(os.path.dirname(key[1]) or '.', exist_ok=True)
+        conn = sqlite3.connect(key[1], timeout=5, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=OFF')
+        conn.execute(SCHEMA)
+        opened[key] = conn
+    return conn
+
+
+def normalize(sql):
+    """`sql` with literals and placeholders as ?, IN lists as (...), and whitespace collapsed."""
+    normalized = _STRING.sub('?', sql).replace('%s', '?')
+    normalized = _NUMBER.sub('?', normalized)
+    normalized = _IN_LIST.sub('(...)', normalized)
+    return ' '.join(normalized.split())
+
+
+def fingerprint(sql):
+    return hashlib.md5(normalize(sql).encode('utf-8'), usedforsecurity=False).hexdigest()[:16]
+
+
+def is_select(sql):
+    return sql.lstrip().upper().startswith(('SELECT', 'WITH'))
+
+
+def explain(connection, sql, params):
+    """The plan of a SELECT as text, or None where this database has no EXPLAIN we read."""
+    if connection.vendor == 'sqlite':
+        prefix = 'EXPLAIN QUERY PLAN '
+    elif connection.vendor == 'postgresql':
+        prefix = 'EXPLAIN (ANALYZE, BUFFERS) ' if settings.SLOW_QUERY_EXPLAIN_ANALYZE else 'EXPLAIN '
+    else:
+        return None
+    # A savepoint keeps a failed EXPLAIN from aborting the request's transaction on Postgres.
+    savepoint = connection.vendor == 'postgresql' and connection.in_atomic_block
+    cursor = connection.create_cursor()
+    try:
+        if savepoint:
+            cursor.execute('SAVEPOINT slow_query_explain')
+        try:
+            cursor.execute(prefix + sql, params)
+            rows = cursor.fetchall()
+        except connection.Database.Error:
+            if savepoint:
+                cursor.execute('ROLLBACK TO SAVEPOINT slow_query_explain')
+            logger.debug('Could not explain %s', sql, exc_info=True)
+            return None
+        finally:
+            if savepoint:
+                cursor.execute('RELEASE SAVEPOINT slow_query_explain')
+    finally:
+        cursor.close()
+    if connection.vendor == 'sqlite':
+        depth = {0: -1}
+        lines = []
+        for node, parent, _, detail in rows:
+            depth[node] = depth.get(parent, -1) + 1
+            lines.append('  ' * depth[node] + detail)
+        return '\n'.join(lines)
+    return '\n'.join(row[0] for row in rows)
+
+
+def full_scans(plan):
+    """Tables the plan reads in full, without an index."""
+    if not plan:
+        return []
+    tables = [match[1] for line in plan.splitlines() if (match := _SQLITE_SCAN.match(line.strip()))]
+    return tables + _POSTGRES_SCAN.findall(plan)
+
+
+def plan_for(connection, sql, params, key):
+    if key not in _plans:
+        if len(_plans) >= MAX_PLANS:
+            _plans.clear()
+        _plans[key] = explain(connection, sql, params) if is_select(sql) else None
+    return _plans[key]
+
+
+def report(connection, view, sql, params, many, duration_ms):
+    key = fingerprint(sql)
+    plan = None if many else plan_for(connection, sql, params, key)
+    record = {
+        'view': view,
+        'duration_ms': round(duration_ms, 2),
+        'fingerprint': key,
+        'sql': sql,
+        'params': params,
+        'many': many,
+        'full_scans': full_scans(plan),
+        'unbounded': is_select(sql) and not re.search(r'\bLIMIT\b', sql, re.IGNORECASE),
+        'plan': plan,
+    }
+    logger.warning(json.dumps(record, default=str), extra={'slow_query': record})
+    _connection().execute(
+        'INSERT INTO offenders (fingerprint, view, statement, params, plan, count, total_ms, max_ms, last_seen) '
+        'VALUES (?, ?, ?, ?, ?, 1, ?, ?, ?) '
+        'ON CONFLICT (fingerprint, view) DO UPDATE SET '
+        'count = count + 1, total_ms = total_ms + excluded.total_ms, max_ms = MAX(max_ms, excluded.max_ms), '
+        'last_seen = excluded.last_seen, statement = excluded.statement, params = excluded.params, '
+        'plan = COALESCE(excluded.plan, plan)',
+        (key, view, sql, json.dumps(params, default=str), plan, duration_ms, duration_ms, time.time()),
+    )
+
+
+def offenders(limit=20):
+    """The fingerprints with the most total time over the threshold, slowest first."""
+    rows = _connection().execute(
+        'SELECT fingerprint, SUM(count), SUM(total_ms), MAX(max_ms), GROUP_CONCAT(view, \', \'), '
+        'MAX(statement), MAX(plan) FROM offenders GROUP BY fingerprint ORDER BY SUM(total_ms) DESC LIMIT ?',
+        (limit,),
+    ).fetchall()
+    return [
+        {'fingerprint': key, 'count': count, 'total_ms': total_ms, 'max_ms': max_ms, 'views': views,
+         'statement': normalize(statement), 'plan': plan}
+        for key, count, total_ms, max_ms, views, statement, plan in rows
+    ]
+
+
+def clear():
+    _connection().execute('DELETE FROM offenders')
+    _plans.clear()
+
+
+class Watcher:
+    """execute_wrapper that reports the request's slow statements once a my_app view is handling it."""
+
+    def __init__(self, request, threshold_ms):
+        self.request = request
+        self.threshold_ms = threshold_ms
+
+    def view(self):
+        match = self.request.resolver_match
+        if match is None or not match.func.__module__.startswith(APP_PREFIX):
+            return None
+        return match.view_name or match._func_path
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        result = execute(sql, params, many, context)
+        duration_ms = (time.perf_counter() - started) * 1000
+        if duration_ms >= self.threshold_ms:
+            view = self.view()
+            if view is not None:
+                try:
+                    report(context['connection'], view, sql, params, many, duration_ms)
+                except Exception:
+                    logger.exception('Could not record a slow query')
+        return result
+
+
+class SlowQueryMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not is_enabled():
+            return self.get_response(request)
+        with wrap_connections(Watcher(request, settings.SLOW_QUERY_THRESHOLD_MS)):
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        if not is_enabled():
+            return await self.get_response(request)
+        with wrap_connections(Watcher(request, settings.SLOW_QUERY_THRESHOLD_MS)):
+            return await self.get_response(request)
@@ -0,0 +1,285 @@
+"""
+Static JSON snapshot of the public read API.
+
+`publish()` renders the default list and every by-slug detail of pages,
+class sections, news posts and event galleries through the real views and
+writes each body with gzip and brotli copies, laid out like the API:
+/api/news-posts/slug/x/ becomes news-posts/slug/x/index.json.
+SnapshotMiddleware serves them at API_SNAPSHOT_URL before any view runs.
+
+Every publish builds a new version directory under API_SNAPSHOT_ROOT and
+then repoints the `current` symlink with a rename, so readers see either
+the old snapshot or the new one, never a mix. An incremental publish
+hard-links the unchanged files from the current version and re-renders
+only the list and slugs of the row that changed. Saves do not publish on
+the request thread: they queue their slugs for a background thread that
+publishes everything queued within API_SNAPSHOT_PUBLISH_DELAY seconds as
+one version.
+"""
+import fcntl
+import gzip
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.urls import resolve, reverse
+from whitenoise.base import WhiteNoise
+from whitenoise.middleware import WhiteNoiseMiddleware
+from whitenoise.string_utils import ensure_leading_trailing_slash
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+INDEX = 'index.json'
+CURRENT = 'current'
+VERSIONS = 'versions'
+# Older versions are kept briefly so a response already being streamed from
+# one is not cut off by the cleanup after a swap.
+KEEP_VERSIONS = 3
+
+_pending = {}
+_pending_lock = threading.Lock()
+_wakeup = threading.Event()
+_publisher = None
+_publisher_lock = threading.Lock()
+
+
+def resources():
+    from .models import Page, ClassSection, NewsPost, EventGallery
+    return {
+        Page: ('page-list', 'page-by-slug'),
+        ClassSection: ('class-section-list', 'class-section-by-slug'),
+        NewsPost: ('news-post-list', 'news-post-by-slug'),
+        EventGallery: ('event-gallery-list', 'event-gallery-by-slug'),
+    }
+
+
+def root():
+    return str(settings.API_SNAPSHOT_ROOT)
+
+
+def current_version():
+    """Real path of the published version directory, or None before the first publish."""
+    link = os.path.join(root(), CURRENT)
+    if not os.path.islink(link):
+        return None
+    return os.path.realpath(link)
+
+
+def is_published():
+    return current_version() is not None
+
+
+def urls_for(model, slugs=None):
+    """API URLs to render for `model`: its list plus the given slugs, or every slug."""
+    list_name, slug_name = resources()[model]
+    if slugs is None:
+        slugs = model.objects.order_by().values_list('slug', flat=True).iterator()
+    return [reverse(list_name)] + [reverse(slug_name, kwargs={'slug': slug}) for slug in slugs]
+
+
+def file_for(url):
+    """'/api/pages/slug/about/' -> 'pages/slug/about/index.json'."""
+    api_root = reverse('page-list').removesuffix('pages/')
+    return os.path.join(*url.removeprefix(api_root).strip('/').split('/'), INDEX)
+
+
+def render(url):
+    """Status and body of GET `url` from the view itself."""
+    base = urlsplit(settings.API_SNAPSHOT_BASE_URL)
+    request = RequestFactory().get(
+        url, secure=base.scheme == 'https', HTTP_HOST=base.netloc, HTTP_ACCEPT='application/json'
+    )
+    match = resolve(urlsplit(url).path)
+    response = match.func(request, *match.args, **match.kwargs)
+    if hasattr(response, 'render'):
+        response.render()
+    return response.status_code, response.content
+
+
+def write(directory, url):
+    """Write the rendered body for `url` and its compressed copies; remove them if it is gone."""
+    path = os.path.join(directory, file_for(url))
+    for suffix in ('', '.gz', '.br'):
+        # Unlink first: the file may be a hard link shared with the live version.
+        try:
+            os.unlink(path + suffix)
+        except FileNotFoundError:
+            pass
+    status_code, content = render(url)
+    if status_code != 200:
+        return False
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    copies = [('', content), ('.gz', gzip.compress(content, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        copies.append(('.br', brotli.compress(content)))
+    for suffix, data in copies:
+        with open(path + suffix, 'wb') as handle:
+            handle.write(data)
+    return True
+
+
+def publish(changes=None):
+    """
+    Publish a new snapshot version and return (version path, files written).
+
+    `changes` maps models to the slugs to re-render ({NewsPost: {'a', 'b'}});
+    their lists are always re-rendered. None renders everything from scratch.
+    """
+    os.makedirs(os.path.join(root(), VERSIONS), exist_ok=True)
+    with open(os.path.join(root(), '.lock'), 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        previous = current_version()
+        version = os.path.join(root(), VERSIONS, f'{time.time_ns()}-{uuid.uuid4().hex[:8]}')
+        if changes is None or previous is None:
+            os.makedirs(version)
+            changes = {model: None for model in resources()}
+        else:
+            shutil.copytree(previous, version, copy_function=os.link)
+
+        written = 0
+        for model, slugs in changes.items():
+            for url in urls_for(model, slugs):
+                written += write(version, url)
+
+        swap(version)
+        prune(version, previous)
+    return version, written
+
+
+def swap(version):
+    link = os.path.join(root(), CURRENT)
+    staging = f'{link}.{uuid.uuid4().hex[:8]}'
+    os.symlink(os.path.relpath(version, root()), staging)
+    os.replace(staging, link)
+
+
+def prune(*keep):
+    versions_dir = os.path.join(root(), VERSIONS)
+    versions = sorted(os.listdir(versions_dir))
+    for name in versions[:-KEEP_VERSIONS]:
+        path = os.path.join(versions_dir, name)
+        if path not in keep:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def schedule(model, slugs=()):
+    """
+    Re-publish `model`'s list and `slugs` once the current transaction
+    commits. Does nothing until a full snapshot has been published.
+    """
+    if model not in resources() or not is_published():
+        return
+    transaction.on_commit(lambda: enqueue(model, slugs))
+
+
+def enqueue(model, slugs):
+    """
+    Queue `slugs` of `model` for the publisher thread, which waits
+    API_SNAPSHOT_PUBLISH_DELAY seconds and then publishes everything queued
+    meanwhile as one version. A delay of 0 publishes on the calling thread.
+    """
+    slugs = {slug for slug in slugs if slug}
+    if settings.API_SNAPSHOT_PUBLISH_DELAY <= 0:
+        _publish({model: slugs})
+        return
+    with _pending_lock:
+        _pending.setdefault(model, set()).update(slugs)
+    ensure_publisher()
+    _wakeup.set()
+
+
+def publish_pending():
+    """Publish whatever is queued now; returns the models published."""
+    with _pending_lock:
+        changes = dict(_pending)
+        _pending.clear()
+    if changes:
+        _publish(changes)
+    return list(changes)
+
+
+def _publish(changes):
+    try:
+        publish(changes)
+    except Exception:
+        logger.exception('Publishing the API snapshot for %s failed.',
+                         ', '.join(model._meta.label for model in changes))
+
+
+def ensure_publisher():
+    global _publisher
+    with _publisher_lock:
+        # A forked worker sees the parent's thread as stopped and starts its own.
+        if _publisher is not None and _publisher.is_alive():
+            return
+        _publisher = threading.Thread(target=_run_publisher, name='api-snapshot-publisher', daemon=True)
+        _publisher.start()
+
+
+def _run_publisher():
+    while True:
+        _wakeup.wait()
+        time.sleep(settings.API_SNAPSHOT_PUBLISH_DELAY)
+        _wakeup.clear()
+        try:
+            publish_pending()
+        finally:
+            connection.close()
+
+
+class SnapshotMiddleware(WhiteNoiseMiddleware):
+    """
+    Serves the published snapshot at API_SNAPSHOT_URL ahead of the views,
+    negotiating the .gz/.br copies like WhiteNoise does for static files.
+    Each process indexes a version's files once, the first time `current`
+    points at it, and serves from that index until the next swap. The link
+    is read once per request, so a swap part-way through cannot pair one
+    version's headers with another's body.
+    """
+
+    def __init__(self, get_response=None, settings=settings):
+        self.get_response = get_response
+        WhiteNoise.__init__(
+            self,
+            application=None,
+            max_age=settings.API_SNAPSHOT_MAX_AGE,
+            index_file=INDEX,
+        )
+        self.prefix = ensure_leading_trailing_slash(settings.API_SNAPSHOT_URL)
+        self.indexed = (None, {})
+        self.index_lock = threading.Lock()
+
+    def __call__(self, request):
+        if request.path_info.startswith(self.prefix):
+            static_file = self.files_for(current_version()).get(request.path_info)
+            if static_file is not None:
+                return self.serve(static_file, request)
+        return self.get_response(request)
+
+    def files_for(self, version):
+        if version is None:
+            return {}
+        indexed_version, files = self.indexed
+        if indexed_version == version:
+            return files
+        with self.index_lock:
+            if self.indexed[0] != version:
+                self.files = {}
+                self.update_files_dictionary(version + os.path.sep, self.prefix)
+                self.indexed = (version, self.files)
+            return self.indexed[1]
+
+    def immutable_file_test(self, path, url):
+        return False
@@ -0,0 +1,126 @@
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from my_app import response_cache
+from my_app.models import Page, NewsPost, EventGallery, MediaItem
+
+
+class AsyncReadViewsTestCase(APITestCase):
+    def setUp(self):
+        """Set up test data"""
+        response_cache.clear()
+        self.page = Page.objects.create(title='About', slug='about', content='About us.', order=1)
+        Page.objects.create(title='Home', slug='home', content='Home.', is_system=True, order=2)
+        now = timezone.now()
+        for i in range(5):
+            NewsPost.objects.create(
+                title=f'Post {i}',
+                slug=f'post-{i}',
+                body='Body',
+                published_at=now - timezone.timedelta(days=i),
+                is_published=True
+            )
+        self.gallery = EventGallery.objects.create(title='Spring Festival', slug='spring-festival')
+        for i in range(2):
+            MediaItem.objects.create(
+                media_type='video',
+                title=f'Clip {i}',
+                video_url=f'https://youtube.com/watch?v={i}',
+                event=self.gallery
+            )
+
+    def test_list_matches_sync_view(self):
+        """Test GET /api/async/news-posts/ returns the same body as the sync list"""
+        response = self.client.get(reverse('async-news-post-list'))
+        expected = self.client.get(reverse('news-post-list'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual(response.content, expected.content)
+
+    def test_list_honours_page_exclusions(self):
+        """Test GET /api/async/pages/ hides system pages like the sync list"""
+        default = self.client.get(reverse('async-page-list'))
+        unfiltered = self.client.get(reverse('async-page-list'), {'exclude_slugs': 'none'})
+
+        self.assertEqual([page['slug'] for page in default.json()], ['about'])
+        self.assertEqual(len(unfiltered.json()), 2)
+
+    def test_keyset_pages_match_sync_view(self):
+        """Test following async next links walks the same pages as the sync view"""
+        url = reverse('async-news-post-list') + '?limit=2&fields=id,title'
+        titles = []
+        while url:
+            data = self.client.get(url).json()
+            titles.extend(post['title'] for post in data['results'])
+            url = data['next']
+
+        self.assertEqual(titles, [f'Post {i}' for i in range(5)])
+
+    def test_detail_and_slug_match_sync_views(self):
+        """Test async detail and by-slug bodies equal the sync ones"""
+        detail = self.client.get(reverse('async-page-detail', kwargs={'pk': self.page.pk}))
+        by_slug = self.client.get(reverse('async-page-by-slug', kwargs={'slug': 'about'}))
+        expected = self.client.get(reverse('page-detail', kwargs={'pk': self.page.pk}))
+
+        self.assertEqual(detail.content, expected.content)
+        self.assertEqual(by_slug.content, expected.content)
+
+    def test_gallery_include_media(self):
+        """Test GET /api/async/event-galleries/?include=media_items nests published media"""
+        response = self.client.get(reverse('async-event-gallery-list'), {'include': 'media_items'})
+        expected = self.client.get(reverse('event-gallery-list'), {'include': 'media_items'})
+
+        self.assertEqual(response.content, expected.content)
+        self.assertEqual(len(response.json()[0]['media_items']), 2)
+
+    def test_gallery_by_slug_include_media(self):
+        """Test GET /api/async/event-galleries/slug/<slug>/ supports include"""
+        url = reverse('async-event-gallery-by-slug', kwargs={'slug': 'spring-festival'})
+        response = self.client.get(url, {'include': 'media_items'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.json()['media_items']), 2)
+
+    def test_if_none_match_returns_304(self):
+        """Test the async list honours If-None-Match"""
+        url = reverse('async-news-post-list')
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_missing_object_returns_404(self):
+        """Test GET /api/async/pages/slug/<slug>/ with an unknown slug returns 404"""
+        response = self.client.get(reverse('async-page-by-slug', kwargs={'slug': 'missing'}))
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_invalid_parameters_return_errors(self):
+        """Test validation and cursor errors use the sync views' status codes and bodies"""
+        bad_event = self.client.get(reverse('async-media-item-list'), {'event': 'abc'})
+        expected = self.client.get(reverse('media-item-list'), {'event': 'abc'})
+        bad_cursor = self.client.get(reverse('async-news-post-list'), {'cursor': 'not-a-cursor'})
+
+        self.assertEqual(bad_event.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(bad_event.content, expected.content)
+        self.assertEqual(bad_cursor.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(bad_cursor.json(), {'detail': 'Invalid cursor'})
+
+    def test_writes_are_not_allowed(self):
+        """Test the async endpoints are read-only"""
+        response = self.client.post(reverse('async-page-list'), {'title': 'New'}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    def test_head_and_options(self):
+        """Test HEAD and OPTIONS are answered by the async views"""
+        url = reverse('async-page-list')
+        head = self.client.head(url)
+        options = self.client.options(url)
+
+        self.assertEqual(head.status_code, status.HTTP_200_OK)
+        self.assertEqual(head['ETag'], self.client.get(url)['ETag'])
+        self.assertEqual(options.status_code, status.HTTP_200_OK)
+        self.assertIn('GET', options['Allow'])
@@ -0,0 +1,92 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from rest_framework.test import APIClient
+from my_app import benchmarks
+from my_app.models import MediaItem
+
+RESULT = {'path': '/api/pages/', 'status': 200, 'p50_ms': 10.0, 'p95_ms': 20.0, 'queries': 2, 'bytes': 1000,
+          'peak_kib': 1000.0}
+
+
+class EndpointBenchmarkTestCase(TestCase):
+    def setUp(self):
+        """Set up a throwaway directory for media, chunks and result files"""
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+
+    def test_every_route_has_a_scenario(self):
+        """Test the suite covers each method of each route in my_app/urls.py"""
+        covered = {(scenario.url_name, scenario.method) for scenario in benchmarks.SCENARIOS}
+
+        self.assertEqual(sorted(set(benchmarks.routes()) - covered), [])
+
+    def test_run_measures_every_scenario(self):
+        """Test a tiny dataset runs every scenario successfully and records each measurement"""
+        with benchmarks.isolated_settings(self.root):
+            results = benchmarks.run(benchmarks.seed(12), requests=2)
+
+        self.assertEqual(set(results), {scenario.name for scenario in benchmarks.SCENARIOS})
+        failed = {name: result['status'] for name, result in results.items() if result['status'] >= 400}
+        self.assertEqual(failed, {})
+        self.assertGreater(results['GET media-item-list']['bytes'], 0)
+        self.assertGreater(results['GET media-item-list']['peak_kib'], 0)
+        self.assertEqual(results['GET page-detail']['queries'], 1)
+
+    def test_building_the_request_is_not_timed(self):
+        """Test rows and bodies a scenario prepares are left out of latency and query counts"""
+        def build(data):
+            time.sleep(0.05)
+            return benchmarks.url('media-item-detail', pk=benchmarks.fresh(
+                MediaItem, media_type='video', video_url='https://example.com/gone')), {}
+        scenario = benchmarks.Scenario('DELETE media-item-detail', 'media-item-detail', 'delete', build)
+
+        with benchmarks.isolated_settings(self.root):
+            result = benchmarks.measure(APIClient(), scenario, None, requests=3)
+
+        self.assertEqual(result['status'], 204)
+        self.assertLess(result['p95_ms'], 50)
+        self.assertFalse(MediaItem.objects.exists())
+
+    def test_compare_flags_regressions(self):
+        """Test compare reports slower, bigger or chattier endpoints past the thresholds"""
+        baseline = {'1000': {'GET page-list': RESULT}}
+        current = {'1000': {'GET page-list': {**RESULT, 'p50_ms': 16.0, 'queries': 3, 'bytes': 1300}}}
+
+        regressions = benchmarks.compare(current, baseline)
+
+        self.assertEqual(len(regressions), 3)
+        self.assertTrue(all(line.startswith('GET page-list @ 1000 rows') for line in regressions))
+
+    def test_compare_ignores_noise(self):
+        """Test small changes and scenarios missing from the baseline pass"""
+        baseline = {'1000': {'GET page-list': RESULT}}
+        current = {'1000': {
+            'GET page-list': {**RESULT, 'p50_ms': 11.5, 'p95_ms': 35.0, 'peak_kib': 1200.0},
+            'GET page-detail': RESULT,
+        }}
+
+        self.assertEqual(benchmarks.compare(current, baseline), [])
+
+    def test_command_writes_results_and_gates(self):
+        """Test benchmark_endpoints writes JSON results and fails against a better baseline"""
+        output = os.path.join(self.root, 'results.json')
+        call_command('benchmark_endpoints', '--rows', '12', '--requests', '1', '--only', 'GET page-detail',
+                     '--output', output, stdout=StringIO())
+        with open(output) as handle:
+            report = json.load(handle)
+        self.assertEqual(list(report['results']['12']), ['GET page-detail'])
+
+        report['results']['12']['GET page-detail']['queries'] = 0
+        with open(output, 'w') as handle:
+            json.dump(report, handle)
+        with self.assertRaisesMessage(CommandError, 'GET page-detail @ 12 rows: queries 0 -> 1'):
+            call_command('benchmark_endpoints', '--rows', '12', '--requests', '1', '--only', 'GET page-detail',
+                         '--baseline', output, stdout=StringIO())
@@ -0,0 +1,162 @@
+import io
+import os
+import shutil
+import tempfile
+
+from PIL import Image
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from my_app import uploads
+from my_app.models import ChunkedUpload, MediaItem, EventGallery
+
+
+def jpeg_bytes():
+    buffer = io.BytesIO()
+    Image.new('RGB', (64, 48), 'purple').save(buffer, 'JPEG')
+    return buffer.getvalue()
+
+
+class ChunkedUploadAPITestCase(APITestCase):
+    def setUp(self):
+        """Set up throwaway media and chunk directories"""
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        settings = override_settings(
+            MEDIA_ROOT=os.path.join(root, 'media'),
+            CHUNKED_UPLOAD_DIR=os.path.join(root, 'chunks'),
+            IMAGE_DERIVATIVE_WORKERS=0,
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.event = EventGallery.objects.create(title='Gala', slug='gala')
+        self.content = jpeg_bytes()
+
+    def start(self, **extra):
+        data = {'filename': 'photo.jpg', 'size': len(self.content), **extra}
+        return self.client.post(reverse('chunked-upload-list'), data, format='json')
+
+    def send(self, upload_id, offset, chunk):
+        return self.client.patch(
+            reverse('chunked-upload-detail', kwargs={'pk': upload_id}),
+            data=chunk,
+            content_type='application/offset+octet-stream',
+            HTTP_UPLOAD_OFFSET=str(offset),
+        )
+
+    def finalize(self, upload_id):
+        return self.client.post(reverse('chunked-upload-finalize', kwargs={'pk': upload_id}))
+
+    def test_chunked_upload_creates_media_item(self):
+        """Test POST /api/uploads/ -> PATCH chunks -> finalize creates a photo MediaItem"""
+        response = self.start(title='Gala night', event=self.event.pk)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        upload_id = response.data['id']
+
+        for offset in range(0, len(self.content), 500):
+            response = self.send(upload_id, offset, self.content[offset:offset + 500])
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Upload-Offset'], str(len(self.content)))
+
+        response = self.finalize(upload_id)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        item = MediaItem.objects.get(pk=response.data['id'])
+        self.assertEqual((item.media_type, item.title, item.event), ('photo', 'Gala night', self.event))
+        with item.image.open('rb') as fh:
+            self.assertEqual(fh.read(), self.content)
+        self.assertFalse(ChunkedUpload.objects.exists())
+        self.assertFalse(os.path.exists(uploads.part_path(upload_id)))
+
+    def test_resume_after_offset_mismatch(self):
+        """Test a chunk at the wrong offset returns 409 with the offset to resume from"""
+        upload_id = self.start().data['id']
+        self.send(upload_id, 0, self.content[:100])
+
+        response = self.send(upload_id, 300, self.content[300:400])
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data['offset'], 100)
+
+        status_response = self.client.get(reverse('chunked-upload-detail', kwargs={'pk': upload_id}))
+        self.assertEqual(status_response['Upload-Offset'], '100')
+        self.send(upload_id, 100, self.content[100:])
+        self.assertEqual(self.finalize(upload_id).status_code, status.HTTP_201_CREATED)
+
+    def test_chunk_arrives_outside_a_transaction(self):
+        """Test no transaction or row lock is held while a chunk streams in"""
+        upload_id = self.start().data['id']
+        depth = len(connection.atomic_blocks)
+        reads = []
+
+        class SlowStream(io.BytesIO):
+            def read(stream, size=-1):
+                reads.append(len(connection.atomic_blocks))
+                return super().read(size)
+
+        upload = uploads.append_chunk(upload_id, 0, SlowStream(self.content[:100]), 100)
+
+        self.assertEqual(upload.offset, 100)
+        self.assertEqual(set(reads), {depth})
+        self.assertEqual(sorted(os.listdir(os.path.dirname(uploads.part_path(upload_id)))), [f'{upload_id}.part'])
+        with open(uploads.part_path(upload_id), 'rb') as part:
+            self.assertEqual(part.read(), self.content[:100])
+
+    def test_chunk_past_size_is_rejected(self):
+        """Test a chunk running past the declared size returns 413"""
+        upload_id = self.start().data['id']
+
+        response = self.send(upload_id, 0, self.content + b'extra')
+        self.assertEqual(response.status_code, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+
+    def test_finalize_incomplete_upload(self):
+        """Test finalize before all bytes arrived returns 409"""
+        upload_id = self.start().data['id']
+        self.send(upload_id, 0, self.content[:10])
+
+        self.assertEqual(self.finalize(upload_id).status_code, status.HTTP_409_CONFLICT)
+
+    def test_finalize_rejects_non_image(self):
+        """Test finalize validates the assembled file as an image"""
+        self.content = b'not an image at all'
+        upload_id = self.start().data['id']
+        self.send(upload_id, 0, self.content)
+
+        response = self.finalize(upload_id)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(MediaItem.objects.exists())
+
+    def test_start_validates_filename_and_size(self):
+        """Test POST /api/uploads/ rejects non-image names and oversized uploads"""
+        self.assertEqual(self.start(filename='notes.txt').status_code, status.HTTP_400_BAD_REQUEST)
+        with override_settings(CHUNKED_UPLOAD_MAX_SIZE=10):
+            self.assertEqual(self.start().status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_delete_discards_upload(self):
+        """Test DELETE /api/uploads/<id>/ removes the row and part file"""
+        upload_id = self.start().data['id']
+        response = self.client.delete(reverse('chunked-upload-detail', kwargs={'pk': upload_id}))
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(os.path.exists(uploads.part_path(upload_id)))
+
+    def test_cleanup_removes_expired_and_orphaned(self):
+        """Test cleanup_uploads removes stale uploads and orphaned part files"""
+        stale = self.start().data['id']
+        fresh = self.start().data['id']
+        ChunkedUpload.objects.filter(pk=stale).update(updated_at=timezone.now() - timezone.timedelta(days=2))
+        orphan = uploads.part_path('00000000-0000-0000-0000-000000000000')
+        open(orphan, 'wb').close()
+        staged = os.path.join(os.path.dirname(orphan), f'{fresh}.abc{uploads.STAGED_SUFFIX}')
+        open(staged, 'wb').close()
+        old = timezone.now().timestamp() - 3 * 24 * 3600
+        os.utime(staged, (old, old))
+
+        call_command('cleanup_uploads', stdout=io.StringIO())
+
+        self.assertEqual([str(pk) for pk in ChunkedUpload.objects.values_list('pk', flat=True)], [fresh])
+        self.assertFalse(os.path.exists(uploads.part_path(stale)))
+        self.assertFalse(os.path.exists(orphan))
+        self.assertFalse(os.path.exists(staged))
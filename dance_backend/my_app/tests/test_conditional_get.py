@@ -0,0 +1,103 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.test import APITestCase
+from my_app.models import Page, SocialLink
+
+
+class ConditionalGetTestCase(APITestCase):
+    def setUp(self):
+        """Set up test data"""
+        self.page = Page.objects.create(
+            title='About',
+            slug='about',
+            content='About us.',
+            order=1
+        )
+        self.social_link = SocialLink.objects.create(
+            platform='Facebook',
+            url='https://facebook.com/dancestudio',
+            order=1
+        )
+
+    def test_list_sets_validators(self):
+        """Test GET /api/pages/ returns an ETag and no Last-Modified"""
+        response = self.client.get(reverse('page-list'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['ETag'].startswith('W/"'))
+        self.assertNotIn('Last-Modified', response)
+
+    def test_list_if_none_match_returns_304(self):
+        """Test a matching If-None-Match on a list skips the body"""
+        url = reverse('social-link-list')
+        etag = self.client.get(url)['ETag']
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['ETag'], etag)
+        self.assertLessEqual(len(ctx.captured_queries), 1)
+
+    def test_list_ignores_if_modified_since(self):
+        """Test If-Modified-Since cannot turn a list with a deleted row into a 304"""
+        SocialLink.objects.create(platform='YouTube', url='https://youtube.com/dancestudio', order=2)
+        url = reverse('social-link-list')
+        self.client.get(url)
+        SocialLink.objects.filter(platform='YouTube').delete()
+
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=http_date())
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn(b'YouTube', response.content)
+
+    def test_list_etag_changes_on_update(self):
+        """Test editing a row invalidates the list ETag"""
+        url = reverse('social-link-list')
+        etag = self.client.get(url)['ETag']
+        self.social_link.platform = 'Instagram'
+        self.social_link.save()
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_list_etag_changes_on_delete(self):
+        """Test deleting a row invalidates the list ETag"""
+        SocialLink.objects.create(platform='YouTube', url='https://youtube.com/dancestudio', order=2)
+        url = reverse('social-link-list')
+        etag = self.client.get(url)['ETag']
+        SocialLink.objects.filter(platform='YouTube').delete()
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_query_string_changes_etag(self):
+        """Test different query strings produce different ETags"""
+        url = reverse('page-list')
+        default = self.client.get(url)['ETag']
+        unfiltered = self.client.get(url, {'exclude_slugs': 'none'})['ETag']
+
+        self.assertNotEqual(default, unfiltered)
+
+    def test_by_slug_if_none_match_returns_304(self):
+        """Test GET /api/pages/slug/<slug>/ honours If-None-Match"""
+        url = reverse('page-by-slug', kwargs={'slug': 'about'})
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_detail_stale_etag_returns_200(self):
+        """Test a stale If-None-Match on a detail view returns the body"""
+        url = reverse('page-detail', kwargs={'pk': self.page.pk})
+        response = self.client.get(url, HTTP_IF_NONE_MATCH='W/"stale"')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['title'], 'About')
@@ -0,0 +1,162 @@
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.apps import apps
+from django.core.management import call_command
+from django.db import OperationalError
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from my_app import contact_spool
+from my_app.models import ContactMessage
+
+
+class ContactSpoolTestCase(APITestCase):
+    def setUp(self):
+        """Set up a fresh spool file"""
+        self.spool_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.spool_dir, ignore_errors=True)
+        settings = override_settings(
+            CONTACT_INTAKE='spool',
+            CONTACT_SPOOL_PATH=Path(self.spool_dir) / 'spool.sqlite3',
+            CONTACT_SPOOL_FLUSH_INTERVAL=0,
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.data = {
+            'name': 'John Doe',
+            'email': 'John.Doe@Example.com',
+            'subject': 'Enrolment',
+            'message': 'Is there space in the beginner ballet class?'
+        }
+
+    def restart(self):
+        """Drop this thread's spool connections, as a process restart would"""
+        for conn in contact_spool._local.__dict__.pop('connections', {}).values():
+            conn.close()
+
+    def test_post_is_acknowledged_without_insert(self):
+        """Test POST /api/contact-messages/ in spool mode returns 202 and defers the insert"""
+        response = self.client.post(reverse('contact-message-list'), self.data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['email'], 'john.doe@example.com')
+        self.assertNotIn('id', response.data)
+        self.assertEqual(ContactMessage.objects.count(), 0)
+        self.assertEqual(contact_spool.stats()['depth'], 1)
+
+    def test_invalid_post_is_not_spooled(self):
+        """Test validation still runs before anything is spooled"""
+        response = self.client.post(reverse('contact-message-list'), {'name': 'No email'}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(contact_spool.stats()['depth'], 0)
+
+    def test_flush_bulk_inserts_and_empties_spool(self):
+        """Test flush moves every spooled submission into ContactMessage"""
+        for i in range(3):
+            self.client.post(reverse('contact-message-list'), {**self.data, 'subject': f'Question {i}'}, format='json')
+
+        moved = contact_spool.flush(batch_size=2)
+
+        self.assertEqual(moved, 3)
+        self.assertEqual(contact_spool.stats()['depth'], 0)
+        self.assertEqual(
+            sorted(ContactMessage.objects.values_list('subject', flat=True)),
+            ['Question 0', 'Question 1', 'Question 2']
+        )
+
+    def test_submitted_at_is_receipt_time(self):
+        """Test flushed messages keep the time they were received"""
+        self.client.post(reverse('contact-message-list'), self.data, format='json')
+        contact_spool._connection().execute('UPDATE spool SET received_at = received_at - 3600')
+
+        contact_spool.flush()
+
+        message = ContactMessage.objects.get()
+        self.assertLess(message.submitted_at, message.updated_at - timedelta(minutes=59))
+
+    def test_spool_survives_restart(self):
+        """Test submissions spooled before a restart are flushed after it"""
+        self.client.post(reverse('contact-message-list'), self.data, format='json')
+        self.restart()
+
+        self.assertEqual(contact_spool.stats()['depth'], 1)
+        contact_spool.flush()
+        self.assertEqual(ContactMessage.objects.count(), 1)
+
+    def test_replayed_flush_does_not_duplicate(self):
+        """Test a batch committed but not removed from the spool is not inserted twice"""
+        self.client.post(reverse('contact-message-list'), self.data, format='json')
+        payload = contact_spool._connection().execute('SELECT payload FROM spool').fetchone()[0]
+        contact_spool.flush()
+        contact_spool._connection().execute(
+            'INSERT INTO spool (payload, received_at) VALUES (?, 0)', (payload,)
+        )
+
+        contact_spool.flush()
+
+        self.assertEqual(ContactMessage.objects.count(), 1)
+        self.assertEqual(contact_spool.stats()['depth'], 0)
+
+    def test_rejected_row_is_quarantined(self):
+        """Test a row that cannot be inserted is set aside and the rest of its batch is moved"""
+        self.client.post(reverse('contact-message-list'), self.data, format='json')
+        contact_spool._connection().execute(
+            'INSERT INTO spool (payload, received_at) VALUES (?, 0)', ('{"fax": "555"}',)
+        )
+        self.client.post(reverse('contact-message-list'), {**self.data, 'name': 'Jane Doe'}, format='json')
+
+        with self.assertLogs('my_app.contact_spool', 'ERROR'):
+            self.assertEqual(contact_spool.flush(), 2)
+
+        self.assertEqual(ContactMessage.objects.count(), 2)
+        self.assertEqual(contact_spool.stats()['depth'], 0)
+        self.assertEqual(contact_spool.stats()['quarantined'], 1)
+        payload, = contact_spool._connection().execute('SELECT payload FROM quarantine').fetchone()
+        self.assertEqual(payload, '{"fax": "555"}')
+
+    def test_database_outage_is_not_quarantined(self):
+        """Test rows stay spooled when the database itself is failing"""
+        self.client.post(reverse('contact-message-list'), self.data, format='json')
+
+        with mock.patch.object(contact_spool, '_insert', side_effect=OperationalError('gone away')), \
+                self.assertLogs('my_app.contact_spool', 'WARNING'), self.assertRaises(OperationalError):
+            contact_spool.flush()
+
+        self.assertEqual(contact_spool.stats()['depth'], 1)
+        self.assertEqual(contact_spool.stats()['quarantined'], 0)
+
+    def test_flusher_starts_with_the_app(self):
+        """Test spooled rows left by a previous process do not wait for a new submission"""
+        with mock.patch.object(contact_spool, 'ensure_flusher') as ensure_flusher:
+            apps.get_app_config('my_app').ready()
+        ensure_flusher.assert_called_once_with()
+
+        with override_settings(CONTACT_INTAKE='direct'), \
+                mock.patch.object(contact_spool, 'ensure_flusher') as ensure_flusher:
+            apps.get_app_config('my_app').ready()
+        ensure_flusher.assert_not_called()
+
+    def test_flush_command_reports_depth(self):
+        """Test flush_contact_spool --status prints the spool depth"""
+        self.client.post(reverse('contact-message-list'), self.data, format='json')
+        out = StringIO()
+
+        call_command('flush_contact_spool', '--status', stdout=out)
+        self.assertIn('depth: 1', out.getvalue())
+        call_command('flush_contact_spool', stdout=StringIO())
+        self.assertEqual(ContactMessage.objects.count(), 1)
+
+    @override_settings(CONTACT_INTAKE='direct')
+    def test_direct_mode_inserts_immediately(self):
+        """Test the default intake still creates the row on the request"""
+        response = self.client.post(reverse('contact-message-list'), self.data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(ContactMessage.objects.count(), 1)
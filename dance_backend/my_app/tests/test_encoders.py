@@ -0,0 +1,84 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+from my_app import encoders, response_cache
+from my_app.models import NewsPost, MediaItem, EventGallery
+from my_app.serializers import (
+    NewsPostSerializer, MediaItemSerializer, ContactMessageSerializer, EventGalleryWithMediaSerializer
+)
+
+SRCSET = {
+    '320w': {'image/webp': ['media/photos/a-320w.webp', 19], 'image/jpeg': ['media/photos/a-320w.jpg', 27]},
+    '640w': {'image/jpeg': ['media/photos/a-640w.jpg', 80]},
+}
+
+
+class RowEncoderTestCase(APITestCase):
+    def setUp(self):
+        """Set up test data covering nulls, images, srcsets and non-ASCII text"""
+        response_cache.clear()
+        self.event = EventGallery.objects.create(title='Ρεσιτάλ', slug='recital')
+        MediaItem.objects.create(
+            media_type='photo', title='Πρόβα', image='media/photos/a.jpg', image_srcset=SRCSET, event=self.event
+        )
+        MediaItem.objects.create(media_type='video', title='Show', video_url='https://example.com/v', image='')
+        MediaItem.objects.create(media_type='video', title='Unpublished ', video_url='https://example.com/w',
+                                 is_published=False)
+        NewsPost.objects.create(
+            title='Recital', slug='recital', body='Tickets "on sale".', image='news/a.jpg', image_srcset=SRCSET,
+            published_at=timezone.now()
+        )
+        NewsPost.objects.create(title='Summer', slug='summer', body='Workshops.', published_at=timezone.now())
+
+    def assertSameBytes(self, serializer_class, queryset, selection=None):
+        selection = selection or {}
+        expected = JSONRenderer().render(serializer_class(queryset, many=True, **selection).data)
+        actual = JSONRenderer().render(encoders.encoder_for(serializer_class, selection).serialize(queryset))
+        self.assertEqual(actual, expected)
+
+    def test_media_items_match_serializer(self):
+        """Test the MediaItem encoder renders byte-identical JSON"""
+        self.assertSameBytes(MediaItemSerializer, MediaItem.objects.order_by('id'))
+
+    def test_news_posts_match_serializer(self):
+        """Test the NewsPost encoder renders byte-identical JSON"""
+        self.assertSameBytes(NewsPostSerializer, NewsPost.objects.order_by('id'))
+
+    def test_sparse_fieldsets_match_serializer(self):
+        """Test encoders honour ?fields= and ?omit= selections"""
+        self.assertSameBytes(MediaItemSerializer, MediaItem.objects.all(), {'fields': ['title', 'image_srcset']})
+        self.assertSameBytes(NewsPostSerializer, NewsPost.objects.all(), {'omit': ['body', 'image']})
+
+    def test_encoder_is_compiled_once(self):
+        """Test the same serializer and selection reuse one encoder"""
+        self.assertIs(
+            encoders.encoder_for(MediaItemSerializer, {'fields': ['id', 'title']}),
+            encoders.encoder_for(MediaItemSerializer, {'fields': ['title', 'id']})
+        )
+
+    def test_equivalent_selections_share_an_encoder(self):
+        """Test selections naming the same fields in other ways reuse one encoder"""
+        encoder = encoders.encoder_for(MediaItemSerializer, {'fields': ['id', 'title']})
+        for selection in ({'fields': ['title', 'id', 'title']}, {'fields': ['id', 'title', 'image'], 'omit': ['image']},
+                          {'fields': ['id', 'title'], 'omit': ['image']}):
+            with self.subTest(selection=selection):
+                self.assertIs(encoders.encoder_for(MediaItemSerializer, selection), encoder)
+        self.assertIs(encoders.encoder_for(MediaItemSerializer, {'omit': []}), encoders.encoder_for(MediaItemSerializer))
+        self.assertEqual(encoders.compile_encoder.cache_info().maxsize, 256)
+
+    def test_nested_serializer_falls_back(self):
+        """Test serializers with nested fields are not compiled"""
+        self.assertIsNone(encoders.encoder_for(EventGalleryWithMediaSerializer))
+        self.assertIsNotNone(encoders.encoder_for(ContactMessageSerializer))
+
+    def test_list_views_use_one_query(self):
+        """Test GET /api/media-items/ still matches the serializer and reads rows in one query"""
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('media-item-list'))
+
+        expected = MediaItemSerializer(MediaItem.objects.order_by('-created_at', 'id'), many=True).data
+        self.assertEqual(response.content, JSONRenderer().render(expected))
+        self.assertEqual(len([q for q in ctx.captured_queries if 'my_app_mediaitem"."media_type' in q['sql']]), 1)
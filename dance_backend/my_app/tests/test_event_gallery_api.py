@@ -0,0 +1,101 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from my_app import response_cache
+from my_app.models import EventGallery, MediaItem
+
+
+class EventGalleryAPITestCase(APITestCase):
+    def setUp(self):
+        """Set up test data"""
+        response_cache.clear()
+        self.gallery = EventGallery.objects.create(
+            title='Spring Festival',
+            slug='spring-festival',
+            excerpt='Photos from the festival'
+        )
+        for i in range(3):
+            MediaItem.objects.create(
+                media_type='video',
+                title=f'Clip {i}',
+                video_url=f'https://youtube.com/watch?v={i}',
+                event=self.gallery
+            )
+        MediaItem.objects.create(
+            media_type='video',
+            title='Hidden clip',
+            video_url='https://youtube.com/watch?v=hidden',
+            is_published=False,
+            event=self.gallery
+        )
+
+    def test_list_without_include(self):
+        """Test GET /api/event-galleries/ does not nest media by default"""
+        response = self.client.get(reverse('event-gallery-list'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('media_items', response.data[0])
+
+    def test_list_include_media_items(self):
+        """Test ?include=media_items nests published media in order"""
+        response = self.client.get(reverse('event-gallery-list'), {'include': 'media_items'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        titles = [item['title'] for item in response.data[0]['media_items']]
+        self.assertEqual(titles, ['Clip 0', 'Clip 1', 'Clip 2'])
+
+    def test_media_limit(self):
+        """Test ?media_limit= caps the media per gallery"""
+        response = self.client.get(reverse('event-gallery-list'), {'include': 'media_items', 'media_limit': 2})
+
+        self.assertEqual(len(response.data[0]['media_items']), 2)
+
+    def test_query_count_is_constant(self):
+        """Test nested media costs the same number of queries for 1 or 30 galleries"""
+        url = reverse('event-gallery-list')
+        with CaptureQueriesContext(connection) as one:
+            self.client.get(url, {'include': 'media_items'})
+
+        for i in range(30):
+            gallery = EventGallery.objects.create(title=f'Event {i}', slug=f'event-{i}')
+            MediaItem.objects.create(media_type='video', video_url='https://youtube.com/watch?v=x', event=gallery)
+        with CaptureQueriesContext(connection) as many:
+            response = self.client.get(url, {'include': 'media_items'})
+
+        self.assertEqual(len(response.data), 31)
+        self.assertEqual(len(many.captured_queries), len(one.captured_queries))
+
+    def test_by_slug_include_media_items(self):
+        """Test GET /api/event-galleries/slug/<slug>/?include=media_items nests media"""
+        url = reverse('event-gallery-by-slug', kwargs={'slug': 'spring-festival'})
+        response = self.client.get(url, {'include': 'media_items'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['media_items']), 3)
+
+    def test_media_change_invalidates_nested_response(self):
+        """Test editing a media item changes the nested list and its ETag"""
+        url = reverse('event-gallery-list')
+        first = self.client.get(url, {'include': 'media_items'})
+        MediaItem.objects.filter(title='Clip 0').get().delete()
+        second = self.client.get(url, {'include': 'media_items'}, HTTP_IF_NONE_MATCH=first['ETag'])
+
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(second.data[0]['media_items']), 2)
+
+    def test_unknown_include_is_rejected(self):
+        """Test an unknown include returns 400"""
+        response = self.client.get(reverse('event-gallery-list'), {'include': 'comments'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_media_items_filter_by_event(self):
+        """Test GET /api/media-items/?event=<id> filters by gallery"""
+        other = EventGallery.objects.create(title='Other', slug='other')
+        MediaItem.objects.create(media_type='video', video_url='https://youtube.com/watch?v=o', event=other)
+        response = self.client.get(reverse('media-item-list'), {'event': other.pk})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 1)
@@ -0,0 +1,190 @@
+import io
+import shutil
+import tempfile
+
+from PIL import Image, features
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.utils import timezone
+from my_app import images
+from my_app.models import MediaItem, NewsPost
+
+
+def jpeg(name, width, height):
+    buffer = io.BytesIO()
+    Image.new('RGB', (width, height), 'blue').save(buffer, 'JPEG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/jpeg')
+
+
+class ImageDerivativesTestCase(APITestCase):
+    def setUp(self):
+        """Set up a throwaway media root with derivatives rendered inline"""
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings = override_settings(MEDIA_ROOT=media_root, IMAGE_DERIVATIVE_WORKERS=0)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def create_photo(self, width, height):
+        with self.captureOnCommitCallbacks(execute=True):
+            return MediaItem.objects.create(media_type='photo', title='Photo', image=jpeg('photo.jpg', width, height))
+
+    def test_large_image_gets_every_width(self):
+        """Test a wide upload gets thumbnail, card and full derivatives"""
+        item = self.create_photo(2000, 1000)
+        item.refresh_from_db()
+
+        self.assertEqual(sorted(item.image_srcset, key=lambda w: int(w[:-1])), ['320w', '768w', '1600w'])
+        name, _ = item.image_srcset['768w']['image/jpeg']
+        with default_storage.open(name) as fh:
+            self.assertEqual(Image.open(fh).size, (768, 384))
+
+    def test_small_image_is_not_upscaled(self):
+        """Test an image narrower than a width gets one copy at its own width"""
+        item = self.create_photo(500, 500)
+        item.refresh_from_db()
+
+        self.assertEqual(set(item.image_srcset), {'320w', '500w'})
+        self.assertNotEqual(item.image_srcset['500w']['image/jpeg'][0], item.image.name)
+
+    def test_transcodes_to_modern_formats(self):
+        """Test each width is stored as WebP (and AVIF when supported) next to the JPEG"""
+        item = self.create_photo(1000, 800)
+        item.refresh_from_db()
+
+        variants = item.image_srcset['320w']
+        self.assertIn('image/webp', variants)
+        if features.check('avif'):
+            self.assertIn('image/avif', variants)
+        for mime, (name, size) in variants.items():
+            self.assertEqual(default_storage.size(name), size)
+
+    def test_exif_is_stripped(self):
+        """Test derivatives carry no EXIF metadata"""
+        exif = Image.Exif()
+        exif[0x010F] = 'PhoneMaker'
+        buffer = io.BytesIO()
+        Image.new('RGB', (800, 600), 'green').save(buffer, 'JPEG', exif=exif.tobytes())
+        with self.captureOnCommitCallbacks(execute=True):
+            item = MediaItem.objects.create(
+                media_type='photo',
+                image=SimpleUploadedFile('exif.jpg', buffer.getvalue(), content_type='image/jpeg')
+            )
+        item.refresh_from_db()
+
+        for name, _ in item.image_srcset['320w'].values():
+            with default_storage.open(name) as fh:
+                self.assertEqual(dict(Image.open(fh).getexif()), {})
+
+    def test_serializer_exposes_srcset_urls(self):
+        """Test GET /api/media-items/<id>/ returns image_srcset as width -> versioned image URL"""
+        item = self.create_photo(1000, 800)
+        response = self.client.get(reverse('media-item-detail', kwargs={'pk': item.pk}))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(response.data['image_srcset']), {'320w', '768w', '1000w'})
+        url = reverse('media-item-image', kwargs={'pk': item.pk, 'descriptor': '320w'})
+        self.assertTrue(response.data['image_srcset']['320w'].startswith(url + '?v='))
+
+    def test_image_view_negotiates_format(self):
+        """Test the image view serves the smallest format the Accept header allows"""
+        item = self.create_photo(1000, 800)
+        item.refresh_from_db()
+        url = reverse('media-item-image', kwargs={'pk': item.pk, 'descriptor': '768w'})
+        variants = item.image_srcset['768w']
+
+        jpeg_only = self.client.get(url, HTTP_ACCEPT='image/jpeg')
+        self.assertEqual(jpeg_only['Content-Type'], 'image/jpeg')
+
+        webp = self.client.get(url, HTTP_ACCEPT='image/webp,image/jpeg;q=0.9')
+        smallest = min(('image/webp', 'image/jpeg'), key=lambda mime: variants[mime][1])
+        self.assertEqual(webp['Content-Type'], smallest)
+        self.assertIn('Accept', webp['Vary'])
+        self.assertIn('immutable', webp['Cache-Control'])
+
+        browser = self.client.get(url, HTTP_ACCEPT='image/avif,image/webp,image/*,*/*;q=0.8')
+        self.assertEqual(browser['Content-Type'], min(variants, key=lambda mime: variants[mime][1]))
+
+        self.assertEqual(self.client.get(url, HTTP_ACCEPT='text/html').status_code, status.HTTP_200_OK)
+
+    def test_image_view_unknown_size(self):
+        """Test the image view returns 404 for a size that was not rendered"""
+        item = self.create_photo(400, 400)
+        url = reverse('media-item-image', kwargs={'pk': item.pk, 'descriptor': '768w'})
+
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_replacing_image_rerenders(self):
+        """Test a new upload replaces the stored srcset"""
+        item = self.create_photo(1000, 800)
+        item.refresh_from_db()
+        with self.captureOnCommitCallbacks(execute=True):
+            item.image = jpeg('other.jpg', 400, 400)
+            item.save()
+        item.refresh_from_db()
+
+        self.assertEqual(set(item.image_srcset), {'320w', '400w'})
+
+    def test_replaced_image_derivatives_are_deleted(self):
+        """Test replacing or clearing an image deletes the derivatives of the old one"""
+        item = self.create_photo(1000, 800)
+        item.refresh_from_db()
+        old = images.derivative_names(item.image_srcset)
+        with self.captureOnCommitCallbacks(execute=True):
+            item.image = jpeg('other.jpg', 400, 400)
+            item.save()
+        item.refresh_from_db()
+        current = images.derivative_names(item.image_srcset)
+
+        self.assertFalse([name for name in old if default_storage.exists(name)])
+        self.assertTrue(all(default_storage.exists(name) for name in current))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            item.image = None
+            item.save()
+
+        self.assertFalse([name for name in current if default_storage.exists(name)])
+
+    def test_rerender_deletes_dropped_derivatives(self):
+        """Test storing a new srcset deletes files only the old one listed"""
+        item = self.create_photo(1000, 800)
+        item.refresh_from_db()
+        kept = {'320w': item.image_srcset['320w']}
+        dropped = images.derivative_names(item.image_srcset) - images.derivative_names(kept)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            images.store(MediaItem, item.pk, item.image.name, kept)
+
+        self.assertFalse([name for name in dropped if default_storage.exists(name)])
+        self.assertTrue(all(default_storage.exists(name) for name in images.derivative_names(kept)))
+
+    def test_superseded_render_is_deleted(self):
+        """Test derivatives rendered for an image the row no longer has are not kept"""
+        item = self.create_photo(1000, 800)
+        item.refresh_from_db()
+        srcset = item.image_srcset
+        MediaItem.objects.filter(pk=item.pk).update(image='photos/newer.jpg', image_srcset={})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertFalse(images.store(MediaItem, item.pk, item.image.name, srcset))
+
+        self.assertFalse([name for name in images.derivative_names(srcset) if default_storage.exists(name)])
+
+    def test_backfill_command(self):
+        """Test generate_image_derivatives fills in rows without derivatives"""
+        item = self.create_photo(1000, 800)
+        post = NewsPost.objects.create(title='News', slug='news', body='Body', published_at=timezone.now())
+        NewsPost.objects.filter(pk=post.pk).update(image=item.image.name)
+        MediaItem.objects.filter(pk=item.pk).update(image_srcset={})
+
+        call_command('generate_image_derivatives', workers=0, stdout=io.StringIO())
+
+        item.refresh_from_db()
+        post.refresh_from_db()
+        self.assertIn('320w', item.image_srcset)
+        self.assertIn('320w', post.image_srcset)
@@ -0,0 +1,87 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.utils import timezone
+from my_app import response_cache
+from my_app.models import Page, ClassSection, NewsPost, SocialLink
+
+
+class LayoutBundleAPITestCase(APITestCase):
+    def setUp(self):
+        """Set up test data"""
+        response_cache.clear()
+        Page.objects.create(
+            title='Contact',
+            slug='contact',
+            content='Call us.',
+            phone='210 000 0000',
+            is_system=True,
+            order=1
+        )
+        Page.objects.create(title='Social Media', slug='socialmedia', content='Follow us.', is_system=True, order=2)
+        Page.objects.create(title='About', slug='about', content='About us.', order=3)
+        Page.objects.create(title='Draft', slug='draft', content='Not yet.', is_published=False, order=4)
+        SocialLink.objects.create(platform='Facebook', url='https://facebook.com/dancestudio', order=1)
+        SocialLink.objects.create(platform='Old', url='https://example.com/old', is_active=False, order=2)
+        ClassSection.objects.create(
+            name='Folk Beginners',
+            slug='folk-beginners',
+            description='Traditional dances.',
+            age_group='Adults',
+            level='Beginner',
+            schedule='Mon 18:00',
+            order=1
+        )
+        for i in range(5):
+            NewsPost.objects.create(
+                title=f'Post {i}',
+                slug=f'post-{i}',
+                body='Body',
+                published_at=timezone.now() - timezone.timedelta(days=i)
+            )
+        self.url = reverse('layout-bundle')
+
+    def test_bundle_contents(self):
+        """Test GET /api/layout/ returns every layout section"""
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['contact_page']['phone'], '210 000 0000')
+        self.assertEqual([link['platform'] for link in response.data['social_links']], ['Facebook'])
+        self.assertEqual([post['title'] for post in response.data['news_posts']], ['Post 0', 'Post 1', 'Post 2'])
+        self.assertEqual([section['slug'] for section in response.data['class_sections']], ['folk-beginners'])
+        self.assertEqual([page['slug'] for page in response.data['pages']], ['about'])
+
+    def test_news_limit(self):
+        """Test ?news_limit= controls how many posts are included"""
+        response = self.client.get(self.url, {'news_limit': 1})
+
+        self.assertEqual(len(response.data['news_posts']), 1)
+
+    def test_one_query_per_model(self):
+        """Test the bundle is built with four queries"""
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(self.url)
+
+        self.assertEqual(len(ctx.captured_queries), 4)
+
+    def test_bundle_is_cached_as_a_unit(self):
+        """Test a repeated request is served from the cache and purged by any member model"""
+        self.client.get(self.url)
+        self.assertEqual(self.client.get(self.url)['X-Cache'], 'HIT')
+
+        SocialLink.objects.create(platform='Instagram', url='https://instagram.com/dancestudio', order=3)
+        response = self.client.get(self.url)
+
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(len(response.data['social_links']), 2)
+
+    def test_if_none_match_returns_304(self):
+        """Test the bundle honours If-None-Match"""
+        etag = self.client.get(self.url)['ETag']
+        response_cache.clear()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
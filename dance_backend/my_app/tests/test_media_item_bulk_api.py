@@ -0,0 +1,146 @@
+import io
+import shutil
+import tempfile
+
+from PIL import Image
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from my_app.models import MediaItem, EventGallery
+
+
+def png(name):
+    buffer = io.BytesIO()
+    Image.new('RGB', (4, 4), 'red').save(buffer, 'PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+
+
+class MediaItemBulkAPITestCase(APITestCase):
+    def setUp(self):
+        """Set up test data"""
+        self.url = reverse('media-item-bulk')
+        self.event = EventGallery.objects.create(title='Spring Show', slug='spring-show')
+        self.video = MediaItem.objects.create(
+            media_type='video',
+            title='Rehearsal',
+            video_url='https://vimeo.com/1',
+            event=self.event
+        )
+
+    def video_item(self, i, **extra):
+        return {'media_type': 'video', 'title': f'Clip {i}', 'video_url': f'https://youtube.com/watch?v={i}', **extra}
+
+    def test_bulk_create(self):
+        """Test POST /api/media-items/bulk/ - Create many items in a few queries"""
+        items = [self.video_item(i, event=self.event.pk) for i in range(300)]
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(self.url, items, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data['created']), 300)
+        self.assertEqual(response.data['errors'], [])
+        self.assertEqual(MediaItem.objects.filter(event=self.event).count(), 301)
+        self.assertLess(len(ctx.captured_queries), 10)
+
+    def test_bulk_create_reports_invalid_items(self):
+        """Test invalid items are reported by index while valid ones are written"""
+        items = [self.video_item(0), {'media_type': 'video'}, self.video_item(2, event=9999)]
+        response = self.client.post(self.url, items, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual([error['index'] for error in response.data['errors']], [1, 2])
+        self.assertIn('event', response.data['errors'][1]['errors'])
+        self.assertTrue(MediaItem.objects.filter(title='Clip 0').exists())
+
+    def test_bulk_create_atomic(self):
+        """Test ?atomic=true rejects the whole batch when one item is invalid"""
+        items = [self.video_item(0), {'media_type': 'video'}]
+        response = self.client.post(self.url + '?atomic=true', items, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(MediaItem.objects.filter(title='Clip 0').exists())
+
+    def test_bulk_create_rejects_non_list(self):
+        """Test POST /api/media-items/bulk/ - A single object returns 400"""
+        response = self.client.post(self.url, self.video_item(0), format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_create_photos_from_files(self):
+        """Test multipart upload creates one photo per file with shared fields"""
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        with override_settings(MEDIA_ROOT=media_root):
+            response = self.client.post(
+                self.url,
+                {'images': [png('a.png'), png('b.png')], 'event': self.event.pk, 'is_published': 'true'},
+                format='multipart'
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        photos = MediaItem.objects.filter(media_type='photo', event=self.event)
+        self.assertEqual(photos.count(), 2)
+        self.assertTrue(all(photo.image for photo in photos))
+
+    def test_bulk_update(self):
+        """Test PATCH /api/media-items/bulk/ - Partially update many items"""
+        other = MediaItem.objects.create(media_type='video', title='Other', video_url='https://vimeo.com/2')
+        response = self.client.patch(self.url, [
+            {'id': self.video.pk, 'is_published': False},
+            {'id': other.pk, 'title': 'Renamed'},
+        ], format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.video.refresh_from_db()
+        other.refresh_from_db()
+        self.assertFalse(self.video.is_published)
+        self.assertEqual(other.title, 'Renamed')
+        self.assertGreater(self.video.updated_at, self.video.created_at)
+
+    def test_bulk_update_validates_against_current_values(self):
+        """Test a partial update cannot leave a video without its URL"""
+        response = self.client.patch(self.url, [{'id': self.video.pk, 'video_url': ''}], format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('Video URL is required', str(response.data['errors']))
+
+    def test_bulk_update_unknown_and_duplicate_ids(self):
+        """Test unknown or repeated ids are reported per item"""
+        response = self.client.patch(self.url, [
+            {'id': self.video.pk, 'title': 'A'},
+            {'id': self.video.pk, 'title': 'B'},
+            {'id': 9999, 'title': 'C'},
+        ], format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual([error['index'] for error in response.data['errors']], [1, 2])
+        self.video.refresh_from_db()
+        self.assertEqual(self.video.title, 'A')
+
+    def test_bulk_delete(self):
+        """Test DELETE /api/media-items/bulk/ - Delete by ids and report missing ones"""
+        response = self.client.delete(self.url, {'ids': [self.video.pk, 9999]}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'deleted': 1, 'missing': [9999]})
+        self.assertFalse(MediaItem.objects.exists())
+
+    def test_bulk_delete_atomic(self):
+        """Test ?atomic=true deletes nothing when an id is missing"""
+        response = self.client.delete(self.url + '?atomic=true', {'ids': [self.video.pk, 9999]}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertTrue(MediaItem.objects.filter(pk=self.video.pk).exists())
+
+    def test_bulk_write_purges_cached_list(self):
+        """Test a bulk create is visible in the cached media list"""
+        list_url = reverse('event-gallery-list')
+        self.client.get(list_url, {'include': 'media_items'})
+        self.client.post(self.url, [self.video_item(0, event=self.event.pk)], format='json')
+
+        response = self.client.get(list_url, {'include': 'media_items'})
+        self.assertEqual(response['X-Cache'], 'MISS')
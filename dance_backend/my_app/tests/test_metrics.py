@@ -0,0 +1,158 @@
+import multiprocessing
+import os
+import re
+import shutil
+import tempfile
+import time
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.contrib.auth.models import User
+from django.http import HttpResponse
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from my_app import metrics, response_cache
+from my_app.models import Page
+
+
+def samples(body):
+    """{'name{labels}': value} from a text exposition body."""
+    return {
+        line.rsplit(' ', 1)[0]: float(line.rsplit(' ', 1)[1])
+        for line in body.splitlines() if line and not line.startswith('#')
+    }
+
+
+def other_worker():
+    """What another gunicorn worker does: record requests and flush them with its own pid."""
+    for seconds in (0.002, 0.2, 3.0):
+        metrics.record('page-list', 'GET', 200, seconds, 2)
+    metrics.enter('news-post-list')
+    metrics.flush()
+
+
+class MetricsTestCase(APITestCase):
+    def setUp(self):
+        """Set up an empty metrics store"""
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        settings = override_settings(
+            METRICS_ENABLED=True, METRICS_STORE=os.path.join(self.root, 'metrics.sqlite3'), METRICS_FLUSH_INTERVAL=0,
+            METRICS_TOKEN='scrape-secret',
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        metrics._pending.clear()
+        metrics._in_flight.clear()
+        response_cache.clear()
+        Page.objects.create(title='About', slug='about', content='About us')
+
+    def scrape(self):
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer scrape-secret')
+        self.assertEqual(response['Content-Type'], metrics.CONTENT_TYPE)
+        return response.content.decode(), samples(response.content.decode())
+
+    def test_counts_requests_per_url_name(self):
+        """Test GET /metrics - requests, statuses, queries and cache results are labelled by URL name"""
+        self.client.get(reverse('page-list'))
+        self.client.get(reverse('page-list'))
+        self.client.get(reverse('news-post-by-slug', kwargs={'slug': 'missing'}))
+
+        _, values = self.scrape()
+
+        self.assertEqual(values['http_requests_total{route="page-list",method="GET",status="200"}'], 2)
+        self.assertEqual(values['http_requests_total{route="news-post-by-slug",method="GET",status="404"}'], 1)
+        self.assertEqual(values['api_cache_requests_total{route="page-list",result="miss"}'], 1)
+        self.assertEqual(values['api_cache_requests_total{route="page-list",result="hit"}'], 1)
+        self.assertGreater(values['http_request_db_queries_total{route="page-list",method="GET"}'], 0)
+        self.assertEqual(values['http_request_duration_seconds_count{route="page-list",method="GET"}'], 2)
+        self.assertEqual(values['http_request_duration_seconds_bucket{route="page-list",method="GET",le="+Inf"}'], 2)
+        self.assertEqual(values['http_requests_in_flight{route="metrics"}'], 1)
+
+    async def test_async_stack(self):
+        """Test the middleware runs as a coroutine under ASGI and records async views"""
+        async def get_response(request):
+            return HttpResponse()
+        self.assertTrue(iscoroutinefunction(metrics.MetricsMiddleware(get_response)))
+
+        await self.async_client.get(reverse('async-page-by-slug', kwargs={'slug': 'about'}))
+        await sync_to_async(metrics.flush)()
+
+        series = {f'{name}{{{label_string}}}': value for name, label_string, value in await sync_to_async(metrics.collect)()}
+        self.assertEqual(series['http_requests_total{route="async-page-by-slug",method="GET",status="200"}'], 1)
+        self.assertGreater(series['http_request_db_queries_total{route="async-page-by-slug",method="GET"}'], 0)
+
+    def test_unusual_methods_share_one_label(self):
+        """Test methods outside the standard set are counted as other"""
+        for method in ('PROPFIND', 'X-RANDOM-1', 'X-RANDOM-2'):
+            self.client.generic(method, reverse('page-list'))
+
+        _, values = self.scrape()
+
+        self.assertEqual(values['http_request_duration_seconds_count{route="page-list",method="other"}'], 3)
+        self.assertFalse([key for key in values if 'RANDOM' in key or 'PROPFIND' in key])
+
+    def test_requires_token_or_staff(self):
+        """Test GET /metrics - anonymous scrapes and wrong tokens are refused and flush nothing"""
+        metrics.record('page-list', 'GET', 200, 0.001, 1)
+
+        for headers in ({}, {'HTTP_AUTHORIZATION': 'Bearer wrong'}, {'HTTP_AUTHORIZATION': 'Basic scrape-secret'}):
+            with self.subTest(headers=headers):
+                self.assertEqual(self.client.get('/metrics', **headers).status_code, 403)
+        self.assertEqual(metrics._connection().execute('SELECT COUNT(*) FROM samples').fetchone()[0], 0)
+
+        self.client.force_login(User.objects.create_user('admin', password='pw', is_staff=True))
+        self.assertEqual(self.client.get('/metrics').status_code, 200)
+
+    def test_exposition_format(self):
+        """Test each family is typed once and histogram buckets are cumulative in ascending order"""
+        self.client.get(reverse('page-list'))
+
+        body, _ = self.scrape()
+
+        for name in ('http_requests_total', 'http_request_duration_seconds', 'http_requests_in_flight'):
+            self.assertEqual(body.count(f'# TYPE {name} '), 1)
+        buckets = re.findall(r'^http_request_duration_seconds_bucket\{route="page-list",method="GET",le="([^"]+)"\} (\d+)',
+                             body, re.MULTILINE)
+        self.assertEqual([le for le, _ in buckets], [repr(b) for b in metrics.BUCKETS[:-1]] + ['+Inf'])
+        counts = [int(count) for _, count in buckets]
+        self.assertEqual(counts, sorted(counts))
+
+    def test_aggregates_across_processes(self):
+        """Test counts flushed by another worker process are summed into the scrape"""
+        metrics.record('page-list', 'GET', 200, 0.001, 1)
+        worker = multiprocessing.get_context('fork').Process(target=other_worker)
+        worker.start()
+        worker.join()
+        self.assertEqual(worker.exitcode, 0)
+
+        _, values = self.scrape()
+
+        page_list = 'route="page-list",method="GET"'
+        self.assertEqual(values[f'http_requests_total{{{page_list},status="200"}}'], 4)
+        self.assertEqual(values[f'http_request_db_queries_total{{{page_list}}}'], 7)
+        self.assertAlmostEqual(values[f'http_request_duration_seconds_sum{{{page_list}}}'], 3.203)
+        self.assertEqual(
+            [values[f'http_request_duration_seconds_bucket{{{page_list},le="{le}"}}'] for le in ('0.005', '0.25', '2.5', '5.0')],
+            [2, 3, 3, 4]
+        )
+        self.assertEqual(values['http_requests_in_flight{route="news-post-list"}'], 1)
+
+    def test_dead_workers_drop_out_of_gauges(self):
+        """Test in-flight gauges from a worker that stopped reporting are ignored"""
+        metrics._connection().execute(
+            'INSERT INTO gauges (name, labels, pid, value, updated) VALUES (?, ?, ?, ?, ?)',
+            ('http_requests_in_flight', 'route="page-list"', 1, 7, time.time() - 3600),
+        )
+
+        _, values = self.scrape()
+
+        self.assertNotIn('http_requests_in_flight{route="page-list"}', values)
+
+    def test_reports_contact_spool(self):
+        """Test the contact spool depth is exported while the spool is in use"""
+        with override_settings(CONTACT_INTAKE='spool', CONTACT_SPOOL_FLUSH_INTERVAL=0,
+                               CONTACT_SPOOL_PATH=os.path.join(self.root, 'spool.sqlite3')):
+            _, values = self.scrape()
+
+        self.assertEqual(values['contact_spool_depth'], 0)
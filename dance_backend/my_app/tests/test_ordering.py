@@ -0,0 +1,108 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from my_app.models import OrderSequence, Page, ClassSection, SocialLink
+
+
+class OrderAllocationTestCase(APITestCase):
+    def create_link(self, platform, **extra):
+        return SocialLink.objects.create(platform=platform, url=f'https://{platform.lower()}.com/studio', **extra)
+
+    def test_inserts_get_consecutive_positions(self):
+        """Test rows saved with order 0 get the next position per model"""
+        links = [self.create_link(name) for name in ('Facebook', 'Instagram', 'YouTube')]
+        section = ClassSection.objects.create(
+            name='Ballet', slug='ballet', description='Ballet', age_group='Kids', level='Beginner', schedule='Mon'
+        )
+
+        self.assertEqual([link.order for link in links], [1, 2, 3])
+        self.assertEqual(section.order, 1)
+
+    def test_allocation_skips_explicit_positions(self):
+        """Test an explicit order on insert moves later allocations past it"""
+        self.create_link('Facebook', order=10)
+
+        self.assertEqual(self.create_link('Instagram').order, 11)
+
+    def test_allocation_continues_after_existing_rows(self):
+        """Test a missing sequence starts after the highest existing order"""
+        self.create_link('Facebook', order=7)
+        OrderSequence.objects.all().delete()
+
+        self.assertEqual(self.create_link('Instagram').order, 8)
+
+    def test_allocation_does_not_scan_table(self):
+        """Test allocating an order runs no MAX() aggregate"""
+        self.create_link('Facebook')
+        with CaptureQueriesContext(connection) as ctx:
+            self.create_link('Instagram')
+
+        self.assertFalse(any('MAX(' in query['sql'].upper() for query in ctx.captured_queries))
+
+
+class ReorderAPITestCase(APITestCase):
+    def setUp(self):
+        """Set up test data"""
+        self.pages = [
+            Page.objects.create(title=f'Page {i}', slug=f'page-{i}', content='Content') for i in range(4)
+        ]
+
+    def ids(self, *indexes):
+        return [self.pages[i].pk for i in indexes]
+
+    def test_reorder_rewrites_positions(self):
+        """Test POST /api/pages/reorder/ - listed pages take positions 1..n"""
+        response = self.client.post(reverse('page-reorder'), {'ids': self.ids(3, 0, 2, 1)}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        ordered = list(Page.objects.order_by('order', 'id').values_list('pk', flat=True))
+        self.assertEqual(ordered, self.ids(3, 0, 2, 1))
+
+    def test_reorder_subset_moves_others_after(self):
+        """Test pages left out of the list keep their relative order after the listed ones"""
+        self.client.post(reverse('page-reorder'), {'ids': self.ids(2)}, format='json')
+
+        ordered = list(Page.objects.order_by('order', 'id').values_list('pk', flat=True))
+        self.assertEqual(ordered, self.ids(2, 0, 1, 3))
+        new = Page.objects.create(title='New', slug='new', content='Content')
+        self.assertGreater(new.order, max(Page.objects.exclude(pk=new.pk).values_list('order', flat=True)))
+
+    def test_reorder_from_legacy_zero_positions(self):
+        """Test rows that all still have order 0 end up after the listed ones without ties"""
+        Page.objects.update(order=0)
+        self.client.post(reverse('page-reorder'), {'ids': self.ids(2, 0)}, format='json')
+
+        orders = dict(Page.objects.values_list('pk', 'order'))
+        self.assertEqual([orders[pk] for pk in self.ids(2, 0)], [1, 2])
+        self.assertTrue(all(orders[pk] > 2 for pk in self.ids(1, 3)))
+        ordered = list(Page.objects.order_by('order', 'id').values_list('pk', flat=True))
+        self.assertEqual(ordered, self.ids(2, 0, 1, 3))
+        new = Page.objects.create(title='New', slug='new', content='Content')
+        self.assertGreater(new.order, max(orders.values()))
+
+    def test_reorder_is_one_update(self):
+        """Test the reorder itself is written with a single UPDATE on the pages table"""
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.post(reverse('page-reorder'), {'ids': self.ids(1, 0)}, format='json')
+
+        updates = [q for q in ctx.captured_queries if q['sql'].startswith('UPDATE "my_app_page"')]
+        self.assertEqual(len(updates), 1)
+
+    def test_reorder_validates_ids(self):
+        """Test unknown, repeated or non-integer ids return 400"""
+        url = reverse('social-link-reorder')
+        for ids in ([9999], [1, 1], ['a'], []):
+            response = self.client.post(url, {'ids': ids}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_reorder_purges_cached_list(self):
+        """Test a reorder is visible in the cached page list"""
+        url = reverse('page-list')
+        self.client.get(url)
+        self.client.post(reverse('page-reorder'), {'ids': self.ids(3, 2, 1, 0)}, format='json')
+
+        response = self.client.get(url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual([page['id'] for page in response.data], self.ids(3, 2, 1, 0))
@@ -0,0 +1,57 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from my_app import response_cache
+from my_app.models import Page
+
+
+class PageExclusionTestCase(APITestCase):
+    def setUp(self):
+        """Set up test data"""
+        response_cache.clear()
+        Page.objects.create(title='Contact', slug='contact', content='Call us.', is_system=True, order=1)
+        Page.objects.create(title='Social Media', slug='socialmedia', content='Follow us.', is_system=True, order=2)
+        for i in range(5):
+            Page.objects.create(title=f'Page {i}', slug=f'page-{i}', content='Content', order=i + 3)
+        self.url = reverse('page-list')
+
+    def list_sql(self, params=None):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.url, params or {})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # Validators aggregate, then the list itself.
+        self.assertEqual(len(ctx.captured_queries), 2)
+        return response, ctx.captured_queries[-1]['sql']
+
+    def test_default_hides_system_pages(self):
+        """Test GET /api/pages/ hides is_system pages with a boolean filter"""
+        response, sql = self.list_sql()
+
+        self.assertEqual(len(response.data), 5)
+        self.assertIn('"is_system"', sql)
+        self.assertNotIn('"slug"', sql.split('WHERE', 1)[1])
+
+    def test_exclude_slugs_is_single_in_clause(self):
+        """Test ?exclude_slugs= compiles to one NOT IN regardless of length"""
+        response, sql = self.list_sql({'exclude_slugs': 'page-0,PAGE-1,page-2,page-3'})
+        where = sql.split('WHERE', 1)[1]
+
+        self.assertEqual([page['slug'] for page in response.data], ['contact', 'socialmedia', 'page-4'])
+        self.assertEqual(where.count('"slug"'), 1)
+        self.assertIn(' IN (', where)
+        self.assertNotIn('LIKE', where.upper())
+
+    def test_exclude_slugs_none_returns_everything(self):
+        """Test ?exclude_slugs=none applies no filter"""
+        response, sql = self.list_sql({'exclude_slugs': 'none'})
+
+        self.assertEqual(len(response.data), 7)
+        self.assertNotIn('WHERE', sql)
+
+    def test_explicit_slugs_keep_system_pages_visible(self):
+        """Test listing slugs replaces the default system-page filter"""
+        response, _ = self.list_sql({'exclude_slugs': 'page-0'})
+
+        self.assertEqual(len(response.data), 6)
@@ -0,0 +1,117 @@
+import base64
+import json
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.utils import timezone
+from my_app.models import NewsPost, ClassSection
+
+
+class KeysetPaginationTestCase(APITestCase):
+    def setUp(self):
+        """Set up test data"""
+        now = timezone.now()
+        # Two posts share a timestamp so the id tiebreaker is exercised
+        for i in range(5):
+            NewsPost.objects.create(
+                title=f'Post {i}',
+                slug=f'post-{i}',
+                body='Body',
+                published_at=now - timezone.timedelta(days=i // 2),
+                is_published=True
+            )
+        for i in range(3):
+            ClassSection.objects.create(
+                name=f'Class {i}',
+                slug=f'class-{i}',
+                description='Description',
+                age_group='Adults',
+                level='Beginner',
+                schedule='Mon 18:00',
+                order=1
+            )
+
+    def collect_pages(self, url):
+        titles = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            titles.extend(item.get('title') or item.get('name') for item in response.data['results'])
+            url = response.data['next']
+        return titles
+
+    def test_unpaginated_by_default(self):
+        """Test GET /api/news-posts/ still returns a plain list without cursor/limit"""
+        response = self.client.get(reverse('news-post-list'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsInstance(response.data, list)
+        self.assertEqual(len(response.data), 5)
+
+    def test_limit_returns_page_envelope(self):
+        """Test GET /api/news-posts/?limit=2 returns next/previous/results"""
+        response = self.client.get(reverse('news-post-list'), {'limit': 2})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIsNotNone(response.data['next'])
+        self.assertIsNone(response.data['previous'])
+
+    def test_walks_all_rows_in_natural_order(self):
+        """Test following next links visits every post once in (-published_at, id) order"""
+        expected = list(NewsPost.objects.order_by('-published_at', 'id').values_list('title', flat=True))
+        titles = self.collect_pages(reverse('news-post-list') + '?limit=2')
+
+        self.assertEqual(titles, expected)
+
+    def test_tied_order_values_use_id_tiebreaker(self):
+        """Test sections sharing the same order are paged by id without duplicates"""
+        titles = self.collect_pages(reverse('class-section-list') + '?limit=1')
+
+        self.assertEqual(titles, ['Class 0', 'Class 1', 'Class 2'])
+
+    def test_previous_link_returns_prior_page(self):
+        """Test the previous link of page two yields page one"""
+        url = reverse('news-post-list')
+        first = self.client.get(url, {'limit': 2})
+        second = self.client.get(first.data['next'])
+        back = self.client.get(second.data['previous'])
+
+        self.assertEqual(back.data['results'], first.data['results'])
+
+    def test_limit_is_capped(self):
+        """Test limit above the maximum is clamped"""
+        for i in range(5, 120):
+            NewsPost.objects.create(title=f'Post {i}', slug=f'post-{i}', body='Body', published_at=timezone.now())
+        response = self.client.get(reverse('news-post-list'), {'limit': 1000})
+
+        self.assertEqual(len(response.data['results']), 100)
+
+    def test_invalid_cursor(self):
+        """Test a malformed cursor returns 404"""
+        response = self.client.get(reverse('news-post-list'), {'cursor': 'not-a-cursor'})
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_tampered_cursor(self):
+        """Test a well-formed cursor with values of the wrong type returns 404, not 500"""
+        for position in (['yesterday', 1], ['2026-01-01T00:00:00+00:00', 'x'], [None, 1], [[1], {'a': 1}]):
+            with self.subTest(position=position):
+                cursor = base64.urlsafe_b64encode(json.dumps({'p': position}).encode()).decode().rstrip('=')
+                for name in ('news-post-list', 'async-news-post-list'):
+                    response = self.client.get(reverse(name), {'cursor': cursor})
+
+                    self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_page_query_uses_no_offset(self):
+        """Test a cursor page is fetched with a keyset query without OFFSET"""
+        first = self.client.get(reverse('news-post-list'), {'limit': 2})
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(first.data['next'])
+
+        sql = ctx.captured_queries[-1]['sql'].upper()
+        self.assertNotIn('OFFSET', sql)
+        self.assertIn('LIMIT 3', sql)
@@ -0,0 +1,90 @@
+from unittest import skipUnless
+
+from django.db import connection, transaction
+from django.test import TestCase
+from django.utils import timezone
+from my_app.models import NewsPost, MediaItem, EventGallery, ClassSection, SocialLink
+
+
+def explain(queryset):
+    """The query plan of `queryset`, forcing index use on Postgres where tiny test tables would be scanned."""
+    if connection.vendor == 'postgresql':
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+            return queryset.explain()
+    return queryset.explain()
+
+
+@skipUnless(connection.vendor in ('sqlite', 'postgresql'), 'Plans are checked on SQLite and Postgres')
+class PublishedIndexTestCase(TestCase):
+    def setUp(self):
+        """Set up a published and a hidden row of each model"""
+        self.gallery = EventGallery.objects.create(title='Recital', slug='recital')
+        EventGallery.objects.create(title='Draft', slug='draft', is_published=False)
+        for published in (True, False):
+            NewsPost.objects.create(
+                title='Post', slug=f'post-{published}', body='Body', published_at=timezone.now(), is_published=published
+            )
+            MediaItem.objects.create(
+                media_type='video', video_url='https://example.com/v', event=self.gallery, is_published=published
+            )
+            ClassSection.objects.create(
+                name='Ballet', slug=f'ballet-{published}', description='Classical', age_group='Kids',
+                level='Beginner', schedule='Mon 17:00', is_active=published
+            )
+            SocialLink.objects.create(platform='Facebook', url='https://facebook.com/x', is_active=published)
+
+    def assertIndexScan(self, queryset, index):
+        plan = explain(queryset)
+        if connection.vendor == 'postgresql':
+            self.assertRegex(plan, rf'Index (Only )?Scan( Backward)? using {index}\b')
+            self.assertNotIn('Sort', plan)
+        else:
+            self.assertRegex(plan, rf'USING (COVERING )?INDEX {index}\b')
+            self.assertNotIn('TEMP B-TREE', plan)
+        return plan
+
+    def test_managers_hide_unpublished_rows(self):
+        """Test the published/active managers return only the visible rows"""
+        for manager in (NewsPost.published, MediaItem.published, EventGallery.published,
+                        ClassSection.active, SocialLink.active):
+            with self.subTest(model=manager.model.__name__):
+                self.assertEqual(manager.count(), 1)
+                self.assertLess(manager.count(), manager.model.objects.count())
+
+    def test_public_lists_use_partial_indexes(self):
+        """Test each published list, in its view's order, is read from its index without a sort"""
+        for queryset, index in (
+            (NewsPost.published.order_by('-published_at', 'id'), 'newspost_published_idx'),
+            (MediaItem.published.order_by('-created_at', 'id'), 'mediaitem_published_idx'),
+            (EventGallery.published.order_by('-created_at', 'id'), 'eventgallery_published_idx'),
+            (ClassSection.active.order_by('order', 'id'), 'classsection_active_order_idx'),
+            (SocialLink.active.order_by('order', 'id'), 'sociallink_active_order_idx'),
+        ):
+            with self.subTest(index=index):
+                self.assertIndexScan(queryset, index)
+
+    def test_keyset_page_is_range_scan(self):
+        """Test a later page of published news seeks into the index instead of scanning it"""
+        plan = self.assertIndexScan(
+            NewsPost.published.filter(published_at__lt=timezone.now()).order_by('-published_at', 'id')[:20],
+            'newspost_published_idx'
+        )
+        if connection.vendor == 'sqlite':
+            self.assertIn('SEARCH', plan)
+        else:
+            self.assertIn('Index Cond', plan)
+
+    def test_gallery_media_use_event_index(self):
+        """Test one gallery's published media come from the (event, created_at, id) index in order"""
+        self.assertIndexScan(
+            MediaItem.published.filter(event=self.gallery).order_by('created_at', 'id'),
+            'mediaitem_event_published_idx'
+        )
+
+    def test_image_reference_checks_use_image_index(self):
+        """Test images.in_use() looks a file name up in an index instead of scanning the table"""
+        for model, index in ((NewsPost, 'newspost_image_idx'), (MediaItem, 'mediaitem_image_idx')):
+            with self.subTest(index=index):
+                self.assertIndexScan(model.objects.filter(image='news/photo.jpg').order_by().values('pk')[:1], index)
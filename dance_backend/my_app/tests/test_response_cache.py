@@ -0,0 +1,168 @@
+import sys
+import threading
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from my_app import response_cache
+from my_app.models import Page, SocialLink
+
+
+class ResponseCacheTestCase(APITestCase):
+    def setUp(self):
+        """Set up test data"""
+        response_cache.clear()
+        self.about = Page.objects.create(title='About', slug='about', content='About us.', order=1)
+        self.contact = Page.objects.create(title='Contact', slug='contact', content='Call us.', is_system=True, order=2)
+        self.social_link = SocialLink.objects.create(
+            platform='Facebook',
+            url='https://facebook.com/dancestudio',
+            order=1
+        )
+
+    def test_second_request_is_served_from_cache(self):
+        """Test a repeated GET /api/social-links/ hits the cache without queries"""
+        url = reverse('social-link-list')
+        first = self.client.get(url)
+        with CaptureQueriesContext(connection) as ctx:
+            second = self.client.get(url)
+
+        self.assertEqual(first['X-Cache'], 'MISS')
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second['ETag'], first['ETag'])
+        self.assertEqual(len(ctx.captured_queries), 0)
+
+    def test_stats_count_hits_and_misses(self):
+        """Test hit/miss counters are reported"""
+        url = reverse('social-link-list')
+        self.client.get(url)
+        self.client.get(url)
+        self.client.get(url)
+
+        stats = response_cache.stats()
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['hits'], 2)
+
+    def test_cached_entry_honours_if_none_match(self):
+        """Test a cache hit still answers 304 for a current ETag"""
+        url = reverse('social-link-list')
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['X-Cache'], 'HIT')
+
+    def test_save_purges_list(self):
+        """Test saving a social link purges the cached list"""
+        url = reverse('social-link-list')
+        self.client.get(url)
+        self.social_link.platform = 'Instagram'
+        self.social_link.save()
+        response = self.client.get(url)
+
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data[0]['platform'], 'Instagram')
+
+    def test_delete_purges_list(self):
+        """Test deleting a social link purges the cached list"""
+        url = reverse('social-link-list')
+        self.client.get(url)
+        self.social_link.delete()
+        response = self.client.get(url)
+
+        self.assertEqual(response.data, [])
+
+    def test_query_strings_are_cached_separately(self):
+        """Test each query string has its own entry"""
+        url = reverse('page-list')
+        default = self.client.get(url)
+        everything = self.client.get(url, {'exclude_slugs': 'none'})
+
+        self.assertEqual(len(default.data), 1)
+        self.assertEqual(len(everything.data), 2)
+
+    def test_excluded_page_change_keeps_variant(self):
+        """Test editing an excluded page keeps the variants that hide it"""
+        url = reverse('page-list')
+        self.client.get(url)
+        self.client.get(url, {'exclude_slugs': 'none'})
+        self.contact.content = 'Call us today.'
+        self.contact.save()
+
+        self.assertEqual(self.client.get(url)['X-Cache'], 'HIT')
+        self.assertEqual(self.client.get(url, {'exclude_slugs': 'none'})['X-Cache'], 'MISS')
+
+    def test_visible_page_change_purges_variant(self):
+        """Test editing a visible page purges every variant that shows it"""
+        url = reverse('page-list')
+        self.client.get(url)
+        self.about.title = 'About Us'
+        self.about.save()
+        response = self.client.get(url)
+
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data[0]['title'], 'About Us')
+
+    def test_renamed_page_purges_variant_excluding_old_slug(self):
+        """Test renaming an excluded page into view purges the variant excluding it"""
+        url = reverse('page-list')
+        self.client.get(url, {'exclude_slugs': 'contact'})
+        self.contact.slug = 'contact-us'
+        self.contact.save()
+        response = self.client.get(url, {'exclude_slugs': 'contact'})
+
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(len(response.data), 2)
+
+    def test_unflagged_system_page_purges_default_variant(self):
+        """Test clearing is_system on a page purges the default variant"""
+        url = reverse('page-list')
+        self.client.get(url)
+        self.contact.is_system = False
+        self.contact.save()
+        response = self.client.get(url)
+
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(len(response.data), 2)
+
+    def test_concurrent_stores_are_all_purged(self):
+        """Test variants cached by concurrent workers are all indexed and purged"""
+        cache = response_cache.get_cache()
+        generations = response_cache._generations(cache, ('my_app.sociallink',))
+        response = self.client.get(reverse('social-link-list'))
+        keys = [f'{response_cache.ENTRY_PREFIX}variant-{i}' for i in range(40)]
+        start = threading.Barrier(8)
+        # Switch threads as often as possible so stores interleave.
+        self.addCleanup(sys.setswitchinterval, sys.getswitchinterval())
+        sys.setswitchinterval(1e-6)
+
+        def worker(batch):
+            start.wait()
+            for key in batch:
+                response_cache._store(cache, key, response, generations, None)
+
+        threads = [threading.Thread(target=worker, args=(keys[i::8],)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        response_cache.invalidate(SocialLink)
+
+        self.assertEqual(cache.get_many(keys), {})
+
+    def test_lost_index_slot_purges_generation(self):
+        """Test a variant whose index slot was evicted is still purged"""
+        url = reverse('page-list')
+        self.client.get(url)
+        self.client.get(url, {'exclude_slugs': 'none'})
+        cache = response_cache.get_cache()
+        (_, generation), = response_cache._generations(cache, ('my_app.page',))
+        cache.delete(response_cache._slot_key(generation, 1))
+        self.contact.content = 'Call us today.'
+        self.contact.save()
+
+        self.assertEqual(self.client.get(url)['X-Cache'], 'MISS')
+        self.assertEqual(self.client.get(url, {'exclude_slugs': 'none'})['X-Cache'], 'MISS')
@@ -0,0 +1,114 @@
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.utils import timezone
+from my_app.models import Page, NewsPost, ClassSection
+
+
+class SearchAPITestCase(APITestCase):
+    def setUp(self):
+        """Set up test data"""
+        self.page = Page.objects.create(
+            title='Ballet Classes',
+            slug='ballet',
+            excerpt='Classical training',
+            content='<p>Our ballet programme covers technique &amp; performance.</p>',
+            is_published=True,
+            order=1
+        )
+        self.post = NewsPost.objects.create(
+            title='Summer Recital',
+            slug='summer-recital',
+            body='Students perform ballet and jazz pieces at the summer recital.',
+            published_at=timezone.now(),
+            is_published=True
+        )
+        self.section = ClassSection.objects.create(
+            name='Χορός για παιδιά',
+            slug='kids',
+            excerpt='Μαθήματα χορού',
+            description='Παραδοσιακοί χοροί για παιδιά.',
+            age_group='Kids',
+            level='Beginner',
+            schedule='Sat 10:00',
+            order=1
+        )
+
+    def search(self, **params):
+        return self.client.get(reverse('search'), params)
+
+    def test_requires_query(self):
+        """Test GET /api/search/ without q returns 400"""
+        response = self.search()
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_ranks_title_matches_first(self):
+        """Test GET /api/search/?q= ranks a title match above a body match"""
+        response = self.search(q='ballet')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data['results']
+        self.assertEqual([(r['type'], r['id']) for r in results], [('page', self.page.pk), ('news', self.post.pk)])
+        self.assertGreater(results[0]['rank'], results[1]['rank'])
+
+    def test_highlights_and_escapes(self):
+        """Test titles and snippets are HTML-escaped with <mark> around matches"""
+        result = self.search(q='techn')
+        page = result.data['results'][0]
+
+        self.assertEqual(page['title'], 'Ballet Classes')
+        self.assertIn('<mark>technique</mark> &amp; performance', page['snippet'])
+        self.assertNotIn('<p>', page['snippet'])
+
+    def test_prefix_and_multiple_terms(self):
+        """Test every term must match, each as a prefix"""
+        response = self.search(q='summ rec')
+
+        self.assertEqual([r['slug'] for r in response.data['results']], ['summer-recital'])
+
+    def test_accent_and_case_insensitive(self):
+        """Test Greek queries match regardless of accents and final sigma"""
+        response = self.search(q='ΧΟΡΟΣ')
+
+        results = response.data['results']
+        self.assertEqual([(r['type'], r['slug']) for r in results], [('class', 'kids')])
+        self.assertEqual(results[0]['title'], '<mark>Χορός</mark> για παιδιά')
+
+    def test_type_filter(self):
+        """Test ?type= restricts results to the given kinds"""
+        response = self.search(q='ballet', type='news')
+
+        self.assertEqual([r['type'] for r in response.data['results']], ['news'])
+
+    def test_unknown_type(self):
+        """Test an unknown ?type= returns 400"""
+        response = self.search(q='ballet', type='gallery')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_index_follows_edits(self):
+        """Test saving a row re-indexes it"""
+        self.post.title = 'Winter Showcase'
+        self.post.save()
+
+        results = self.search(q='showcase').data['results']
+        self.assertEqual([r['title'] for r in results], ['Winter <mark>Showcase</mark>'])
+
+    def test_unpublished_and_deleted_rows_leave_index(self):
+        """Test unpublishing or deleting a row removes it from results"""
+        self.page.is_published = False
+        self.page.save()
+        self.post.delete()
+
+        self.assertEqual(self.search(q='ballet').data['results'], [])
+
+        self.page.is_published = True
+        self.page.save()
+        self.assertEqual(len(self.search(q='ballet').data['results']), 1)
+
+    def test_limit(self):
+        """Test ?limit= caps the number of results"""
+        response = self.search(q='ballet', limit=1)
+
+        self.assertEqual(len(response.data['results']), 1)
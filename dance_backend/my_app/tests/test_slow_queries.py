@@ -0,0 +1,97 @@
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from asgiref.sync import iscoroutinefunction
+from django.core.management import call_command
+from django.db import connection
+from django.http import HttpResponse
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from my_app import slow_queries
+from my_app.models import NewsPost
+
+
+class SlowQueryLogTestCase(APITestCase):
+    def setUp(self):
+        """Set up a slow-query log that records every statement"""
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root, ignore_errors=True)
+        settings = override_settings(
+            SLOW_QUERY_LOG_ENABLED=True, SLOW_QUERY_THRESHOLD_MS=0,
+            SLOW_QUERY_STORE=os.path.join(root, 'slow_queries.sqlite3'),
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        slow_queries.clear()
+        NewsPost.objects.create(title='Open day', slug='open-day', body='Come along', published_at=timezone.now())
+
+    def get(self, url):
+        with self.assertLogs('my_app.slow_queries', 'WARNING') as logs:
+            self.client.get(url)
+        return [json.loads(record.getMessage()) for record in logs.records]
+
+    def test_logs_view_params_and_plan(self):
+        """Test GET /api/news-posts/slug/<slug>/ - its lookup is logged with params, view and plan"""
+        records = self.get(reverse('news-post-by-slug', kwargs={'slug': 'open-day'}))
+
+        record = next(r for r in records if 'open-day' in r['params'])
+        self.assertEqual(record['view'], 'news-post-by-slug')
+        self.assertTrue(record['sql'].startswith('SELECT'))
+        if connection.vendor == 'sqlite':
+            self.assertIn('USING INDEX', record['plan'])
+            self.assertEqual(record['full_scans'], [])
+
+    async def test_async_stack(self):
+        """Test the middleware runs as a coroutine under ASGI and logs the async view's queries"""
+        async def get_response(request):
+            return HttpResponse()
+        self.assertTrue(iscoroutinefunction(slow_queries.SlowQueryMiddleware(get_response)))
+
+        with self.assertLogs('my_app.slow_queries', 'WARNING') as logs:
+            await self.async_client.get(reverse('async-news-post-by-slug', kwargs={'slug': 'open-day'}))
+
+        views = {json.loads(record.getMessage())['view'] for record in logs.records}
+        self.assertEqual(views, {'async-news-post-by-slug'})
+
+    def test_flags_unbounded_scans(self):
+        """Test an unpaginated list is flagged as unbounded"""
+        records = self.get(reverse('news-post-list'))
+
+        listing = [r for r in records if r['unbounded'] and 'my_app_newspost' in r['sql']]
+        self.assertTrue(listing)
+
+    def test_aggregates_by_fingerprint(self):
+        """Test the same lookup with different slugs counts as one offender"""
+        for slug in ('open-day', 'missing', 'another-missing'):
+            self.get(reverse('news-post-by-slug', kwargs={'slug': slug}))
+
+        lookups = [row for row in slow_queries.offenders() if row['views'] == 'news-post-by-slug']
+        self.assertEqual([row['count'] for row in lookups], [3])
+        self.assertIn('"slug" = ?', lookups[0]['statement'])
+
+        out = StringIO()
+        call_command('slow_queries', '--plans', stdout=out)
+        self.assertIn(lookups[0]['fingerprint'], out.getvalue())
+
+    def test_explain_is_not_a_request_query(self):
+        """Test EXPLAIN runs outside the request's wrapped cursors"""
+        with self.assertLogs('my_app.slow_queries', 'WARNING'):
+            with self.assertNumQueries(1):
+                self.client.get(reverse('news-post-by-slug', kwargs={'slug': 'open-day'}))
+
+    def test_ignores_other_apps(self):
+        """Test queries outside my_app views are not logged"""
+        with self.assertNoLogs('my_app.slow_queries'):
+            self.client.get('/admin/login/')
+
+    def test_normalize(self):
+        """Test literals, placeholders and IN lists collapse to one fingerprint"""
+        self.assertEqual(
+            slow_queries.fingerprint('SELECT * FROM "t1" WHERE "id" IN (%s, %s) AND "slug" = \'a\' LIMIT 21'),
+            slow_queries.fingerprint('SELECT * FROM "t1"  WHERE "id" IN (%s) AND "slug" = \'bb\' LIMIT 5'),
+        )
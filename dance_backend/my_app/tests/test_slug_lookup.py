@@ -0,0 +1,76 @@
+from unittest import skipUnless
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.utils import timezone
+from my_app.models import Page, ClassSection, NewsPost, EventGallery
+
+
+class CanonicalSlugTestCase(APITestCase):
+    def setUp(self):
+        """Set up test data"""
+        self.page = Page.objects.create(title='Contact', slug='Contact', content='Call us.', order=1)
+        ClassSection.objects.create(
+            name='Folk',
+            slug='Folk-Beginners',
+            description='Traditional dances.',
+            age_group='Adults',
+            level='Beginner',
+            schedule='Mon 18:00'
+        )
+        NewsPost.objects.create(title='News', slug='Big-News', body='Body', published_at=timezone.now())
+        EventGallery.objects.create(title='Festival', slug='Spring-Festival')
+
+    def test_slug_is_stored_lowercase(self):
+        """Test model saves store the canonical lowercase slug"""
+        self.page.refresh_from_db()
+
+        self.assertEqual(self.page.slug, 'contact')
+        self.assertTrue(Page.objects.filter(slug='CONTACT').exists())
+
+    def test_by_slug_lookups_are_case_insensitive(self):
+        """Test every by-slug endpoint resolves a mixed-case slug"""
+        for name, slug in (
+            ('page-by-slug', 'CONTACT'),
+            ('class-section-by-slug', 'folk-BEGINNERS'),
+            ('news-post-by-slug', 'BIG-news'),
+            ('event-gallery-by-slug', 'spring-FESTIVAL'),
+        ):
+            response = self.client.get(reverse(name, kwargs={'slug': slug}))
+            self.assertEqual(response.status_code, status.HTTP_200_OK, name)
+
+    def test_by_slug_lookup_is_exact_match(self):
+        """Test the by-slug query is a plain equality rather than UPPER()/LIKE"""
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(reverse('page-by-slug', kwargs={'slug': 'Contact'}))
+
+        sql = ctx.captured_queries[0]['sql']
+        self.assertIn('"slug" = ', sql)
+        self.assertNotIn('LIKE', sql.upper())
+        self.assertNotIn('UPPER(', sql.upper())
+
+    @skipUnless(connection.vendor == 'sqlite', 'SQLite query plan')
+    def test_sqlite_plan_uses_unique_index(self):
+        """Test SQLite searches the unique slug index"""
+        for model in (Page, ClassSection, NewsPost, EventGallery):
+            plan = model.objects.filter(slug='Contact').explain()
+            self.assertIn('USING INDEX', plan, model.__name__)
+            self.assertIn('(slug=?)', plan, model.__name__)
+
+    @skipUnless(connection.vendor == 'postgresql', 'Postgres query plan')
+    def test_postgres_plan_uses_index(self):
+        """Test Postgres uses an index for exact and iexact slug lookups"""
+        with connection.cursor() as cursor:
+            cursor.execute('SET enable_seqscan = off')
+        try:
+            for model in (Page, ClassSection, NewsPost, EventGallery):
+                exact = model.objects.filter(slug='Contact').explain()
+                self.assertIn('Index', exact, model.__name__)
+                iexact = model.objects.filter(slug__iexact='Contact').explain()
+                self.assertIn('slug_upper_idx', iexact, model.__name__)
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute('SET enable_seqscan = on')
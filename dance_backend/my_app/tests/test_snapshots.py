@@ -0,0 +1,193 @@
+import gzip
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from my_app import images, response_cache, snapshots
+from my_app.models import Page, NewsPost, ClassSection
+
+
+class SnapshotTestCase(APITestCase):
+    def setUp(self):
+        """Set up test data and an empty snapshot root"""
+        response_cache.clear()
+        snapshot_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, snapshot_dir, ignore_errors=True)
+        settings = override_settings(API_SNAPSHOT_ROOT=Path(snapshot_dir), API_SNAPSHOT_PUBLISH_DELAY=0)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.root = snapshot_dir
+        Page.objects.create(title='About', slug='about', content='About us.', order=1)
+        ClassSection.objects.create(
+            name='Ballet', slug='ballet', description='Classical', age_group='Kids',
+            level='Beginner', schedule='Mon 17:00', order=1
+        )
+        self.post = NewsPost.objects.create(
+            title='Recital', slug='recital', body='Tickets on sale.', published_at=timezone.now(), is_published=True
+        )
+        NewsPost.objects.create(title='Summer', slug='summer', body='Workshops.', published_at=timezone.now())
+
+    def snapshot_path(self, *parts):
+        return os.path.join(self.root, snapshots.CURRENT, *parts, snapshots.INDEX)
+
+    def read(self, *parts):
+        with open(self.snapshot_path(*parts), 'rb') as handle:
+            return handle.read()
+
+    def test_publish_matches_api(self):
+        """Test publish_snapshot writes lists and by-slug details identical to the API"""
+        call_command('publish_snapshot', stdout=StringIO())
+
+        self.assertEqual(self.read('news-posts'), self.client.get(reverse('news-post-list')).content)
+        self.assertEqual(
+            self.read('pages', 'slug', 'about'),
+            self.client.get(reverse('page-by-slug', kwargs={'slug': 'about'})).content
+        )
+        self.assertTrue(os.path.exists(self.snapshot_path('class-sections', 'slug', 'ballet')))
+        self.assertTrue(os.path.exists(self.snapshot_path('event-galleries')))
+
+    def test_compressed_copies(self):
+        """Test every document has a gzip copy of the same body"""
+        snapshots.publish()
+        path = self.snapshot_path('news-posts', 'slug', 'recital')
+
+        with gzip.open(path + '.gz') as handle:
+            self.assertEqual(handle.read(), self.read('news-posts', 'slug', 'recital'))
+        if snapshots.brotli is not None:
+            self.assertTrue(os.path.exists(path + '.br'))
+
+    def test_served_without_queries(self):
+        """Test GET /api-snapshot/news-posts/ is answered from the snapshot without a query"""
+        snapshots.publish()
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api-snapshot/news-posts/', HTTP_ACCEPT_ENCODING='gzip')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(len(ctx.captured_queries), 0)
+
+    def test_unpublished_snapshot_is_not_found(self):
+        """Test the snapshot URL 404s before anything is published"""
+        response = self.client.get('/api-snapshot/news-posts/')
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_save_rewrites_only_affected_files(self):
+        """Test saving a post re-renders its list and detail and hard-links the rest"""
+        snapshots.publish()
+        before = os.stat(self.snapshot_path('news-posts', 'slug', 'summer')).st_ino
+        page_before = os.stat(self.snapshot_path('pages', 'slug', 'about')).st_ino
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.title = 'Spring recital'
+            self.post.save()
+
+        self.assertIn(b'Spring recital', self.read('news-posts', 'slug', 'recital'))
+        self.assertIn(b'Spring recital', self.read('news-posts'))
+        self.assertEqual(os.stat(self.snapshot_path('news-posts', 'slug', 'summer')).st_ino, before)
+        self.assertEqual(os.stat(self.snapshot_path('pages', 'slug', 'about')).st_ino, page_before)
+
+    @override_settings(API_SNAPSHOT_PUBLISH_DELAY=60)
+    def test_saves_are_published_in_the_background(self):
+        """Test saves queue their slugs and a later publish writes them as one version"""
+        snapshots.publish()
+        version = snapshots.current_version()
+
+        with mock.patch('my_app.snapshots.ensure_publisher') as ensure_publisher:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.post.title = 'Spring recital'
+                self.post.save()
+                Page.objects.filter(slug='about').get().save()
+
+        ensure_publisher.assert_called()
+        self.assertEqual(snapshots.current_version(), version)
+        self.assertEqual(set(snapshots.publish_pending()), {NewsPost, Page})
+        self.assertIn(b'Spring recital', self.read('news-posts', 'slug', 'recital'))
+        self.assertEqual(snapshots.publish_pending(), [])
+
+    def test_middleware_follows_swaps(self):
+        """Test the snapshot URL serves the new version after a swap"""
+        snapshots.publish()
+        self.client.get('/api-snapshot/news-posts/slug/recital/')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.title = 'Spring recital'
+            self.post.save()
+
+        response = self.client.get('/api-snapshot/news-posts/slug/recital/')
+        self.assertIn(b'Spring recital', b''.join(response.streaming_content))
+
+    def test_renamed_slug_removes_old_file(self):
+        """Test changing a slug drops the old by-slug document"""
+        snapshots.publish()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.slug = 'spring-recital'
+            self.post.save()
+
+        self.assertFalse(os.path.exists(self.snapshot_path('news-posts', 'slug', 'recital')))
+        self.assertTrue(os.path.exists(self.snapshot_path('news-posts', 'slug', 'spring-recital')))
+
+    def test_delete_removes_file(self):
+        """Test deleting a post removes its document"""
+        snapshots.publish()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.delete()
+
+        self.assertFalse(os.path.exists(self.snapshot_path('news-posts', 'slug', 'recital')))
+
+    def test_stored_derivatives_refresh_snapshot(self):
+        """Test a srcset written by the derivative pipeline, which sends no post_save, reaches the snapshot"""
+        NewsPost.objects.filter(pk=self.post.pk).update(image='news/recital.jpg')
+        snapshots.publish()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            images.store(NewsPost, self.post.pk, 'news/recital.jpg', {'320w': {'image/jpeg': ['news/recital-320w.jpg', 10]}})
+
+        self.assertIn(b'"320w"', self.read('news-posts', 'slug', 'recital'))
+        self.assertIn(b'"320w"', self.read('news-posts'))
+
+    @override_settings(API_SNAPSHOT_BASE_URL='https://dance.example', ALLOWED_HOSTS=['dance.example'])
+    def test_absolute_urls_use_base_url(self):
+        """Test absolute URLs rendered for the snapshot point at API_SNAPSHOT_BASE_URL over https"""
+        status_code, body = snapshots.render(reverse('news-post-list') + '?limit=1')
+
+        self.assertEqual(status_code, status.HTTP_200_OK)
+        self.assertTrue(json.loads(body)['next'].startswith('https://dance.example/api/news-posts/?'))
+
+    def test_swap_leaves_old_version_intact(self):
+        """Test a new version does not modify the files of the one it replaces"""
+        snapshots.publish()
+        old_version = snapshots.current_version()
+        with open(os.path.join(old_version, 'news-posts', 'slug', 'recital', snapshots.INDEX), 'rb') as handle:
+            old_body = handle.read()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.title = 'Spring recital'
+            self.post.save()
+
+        self.assertNotEqual(snapshots.current_version(), old_version)
+        with open(os.path.join(old_version, 'news-posts', 'slug', 'recital', snapshots.INDEX), 'rb') as handle:
+            self.assertEqual(handle.read(), old_body)
+
+    def test_old_versions_are_pruned(self):
+        """Test only the latest few versions are kept"""
+        for _ in range(snapshots.KEEP_VERSIONS + 2):
+            snapshots.publish({NewsPost: set()})
+
+        self.assertEqual(len(os.listdir(os.path.join(self.root, snapshots.VERSIONS))), snapshots.KEEP_VERSIONS)
@@ -170,4 +170,4 @@ class SocialLinkAPITestCase(APITestCase):
         
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertEqual(response.data['is_active'], True)  # Default value
-        self.assertEqual(response.data['order'], 0)  # Default value
\ No newline at end of file
+        self.assertGreater(response.data['order'], 0)  # Auto-assigned
\ No newline at end of file
@@ -0,0 +1,76 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.utils import timezone
+from my_app.models import Page, NewsPost
+
+
+class SparseFieldsetTestCase(APITestCase):
+    def setUp(self):
+        """Set up test data"""
+        self.page = Page.objects.create(
+            title='About',
+            slug='about',
+            excerpt='Who we are',
+            content='A very long page body.',
+            order=1
+        )
+        for i in range(3):
+            NewsPost.objects.create(
+                title=f'Post {i}',
+                slug=f'post-{i}',
+                body='A very long post body.',
+                published_at=timezone.now() - timezone.timedelta(days=i)
+            )
+
+    def test_fields_trims_output(self):
+        """Test GET /api/pages/?fields=title,slug,excerpt returns only those keys"""
+        response = self.client.get(reverse('page-list'), {'fields': 'title,slug,excerpt'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(response.data[0]), {'title', 'slug', 'excerpt'})
+
+    def test_omit_drops_fields(self):
+        """Test GET /api/news-posts/?omit=body drops the body"""
+        response = self.client.get(reverse('news-post-list'), {'omit': 'body'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('body', response.data[0])
+        self.assertIn('title', response.data[0])
+
+    def test_unknown_field_is_rejected(self):
+        """Test an unknown field name returns 400"""
+        response = self.client.get(reverse('page-list'), {'fields': 'title,nope'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('fields', response.data)
+
+    def test_fields_are_not_selected_from_database(self):
+        """Test the heavy column is left out of the list query"""
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(reverse('page-list'), {'fields': 'id,title,slug'})
+
+        sql = ctx.captured_queries[-1]['sql']
+        self.assertIn('"title"', sql)
+        self.assertNotIn('"content"', sql)
+
+    def test_omit_is_deferred_in_database(self):
+        """Test an omitted column is deferred in the list query"""
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(reverse('news-post-list'), {'omit': 'body'})
+
+        sql = ctx.captured_queries[-1]['sql']
+        self.assertNotIn('"body"', sql)
+
+    def test_sparse_fieldset_with_pagination(self):
+        """Test cursor pagination keeps working when ordering columns are not requested"""
+        url = reverse('news-post-list')
+        first = self.client.get(url, {'fields': 'title', 'limit': 2})
+        with CaptureQueriesContext(connection) as ctx:
+            second = self.client.get(first.data['next'])
+
+        self.assertEqual(set(first.data['results'][0]), {'title'})
+        self.assertEqual([item['title'] for item in second.data['results']], ['Post 2'])
+        self.assertEqual(len(ctx.captured_queries), 2)
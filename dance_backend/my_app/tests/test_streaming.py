@@ -0,0 +1,109 @@
+import gc
+import json
+import tracemalloc
+from unittest import mock
+
+from django.db.models import Prefetch
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from my_app import streaming
+from my_app.models import ContactMessage, MediaItem, EventGallery
+from my_app.serializers import EventGalleryWithMediaSerializer
+
+
+class StreamingListTestCase(APITestCase):
+    def setUp(self):
+        """Set up test data"""
+        self.event = EventGallery.objects.create(title='Recital', slug='recital')
+        for i in range(5):
+            MediaItem.objects.create(
+                media_type='photo', title=f'Πρόβα {i}', image=f'media/photos/{i}.jpg', event=self.event
+            )
+            ContactMessage.objects.create(
+                name=f'Jo {i}', email=f'jo{i}@example.com', subject='Hi', message='Hello there'
+            )
+
+    def stream(self, url, **params):
+        response = self.client.get(url, {'stream': 'true', **params})
+        self.assertTrue(response.streaming)
+        return response, b''.join(response.streaming_content)
+
+    def test_stream_matches_list(self):
+        """Test GET /api/media-items/?stream=true returns the same bytes as the plain list"""
+        for name in ('media-item-list', 'contact-message-list'):
+            response, body = self.stream(reverse(name))
+
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response['Content-Type'], 'application/json')
+            self.assertEqual(body, self.client.get(reverse(name)).content)
+
+    def test_stream_across_chunks(self):
+        """Test chunks are joined into one valid array"""
+        with mock.patch('my_app.streaming.CHUNK_SIZE', 2):
+            _, body = self.stream(reverse('contact-message-list'), fields='id,name')
+
+        self.assertEqual(len(json.loads(body)), 5)
+        self.assertEqual(body, self.client.get(reverse('contact-message-list'), {'fields': 'id,name'}).content)
+
+    def test_stream_empty_list(self):
+        """Test an empty queryset streams as []"""
+        _, body = self.stream(reverse('media-item-list'), event=self.event.pk + 1)
+
+        self.assertEqual(body, b'[]')
+
+    def test_stream_keeps_validators(self):
+        """Test streamed lists still carry an ETag and honour If-None-Match"""
+        response, _ = self.stream(reverse('media-item-list'))
+
+        cached = self.client.get(reverse('media-item-list'), {'stream': 'true'}, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(cached.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_paginated_request_is_not_streamed(self):
+        """Test ?stream= is ignored for keyset pages"""
+        response = self.client.get(reverse('media-item-list'), {'stream': 'true', 'limit': 2})
+
+        self.assertFalse(response.streaming)
+        self.assertEqual(len(response.data['results']), 2)
+
+    def test_serializer_fallback(self):
+        """Test serializers without a compiled encoder stream through the serializer, prefetches included"""
+        galleries = EventGallery.objects.order_by('id').prefetch_related(
+            Prefetch('media_items', queryset=MediaItem.objects.order_by('id'), to_attr='published_media_items')
+        )
+        response = streaming.stream_list(EventGalleryWithMediaSerializer, galleries)
+
+        body = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(len(body[0]['media_items']), 5)
+
+
+class StreamingMemoryTestCase(APITestCase):
+    def peak_memory(self, rows, stream=True):
+        ContactMessage.objects.all().delete()
+        now = timezone.now()
+        ContactMessage.objects.bulk_create(
+            ContactMessage(
+                name=f'Sender {i}', email=f'sender{i}@example.com', subject='Enrolment',
+                message='Is there space in the beginner ballet class? ' * 10, submitted_at=now
+            )
+            for i in range(rows)
+        )
+        gc.collect()
+        tracemalloc.start()
+        try:
+            response = self.client.get(reverse('contact-message-list'), {'stream': 'true'} if stream else {})
+            size = sum(len(part) for part in response.streaming_content) if stream else len(response.content)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        self.assertGreater(size, rows * 500)
+        return peak
+
+    def test_memory_is_flat(self):
+        """Test streaming 10x more contact messages does not raise peak memory"""
+        small = self.peak_memory(1000)
+        large = self.peak_memory(10000)
+
+        self.assertLess(large, small * 1.5)
+        self.assertGreater(self.peak_memory(10000, stream=False), large * 5)
@@ -0,0 +1,145 @@
+import shutil
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from my_app import throttling
+
+RATES = {
+    'write': '3/min',
+    'write_endpoint': '100/min',
+    'contact': '2/min',
+    'contact_endpoint': '3/min',
+}
+
+
+class WriteRateThrottleTestCase(APITestCase):
+    def setUp(self):
+        """Set up an empty bucket store with small limits"""
+        store_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, store_dir, ignore_errors=True)
+        settings = override_settings(
+            RATE_LIMITS_ENABLED=True,
+            RATE_LIMIT_STORE=Path(store_dir) / 'buckets.sqlite3',
+            REST_FRAMEWORK={
+                'DEFAULT_THROTTLE_CLASSES': ['my_app.throttling.WriteRateThrottle'],
+                'DEFAULT_THROTTLE_RATES': RATES,
+            },
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.social_link = {'platform': 'Facebook', 'url': 'https://facebook.com/dancestudio'}
+        self.contact = {'name': 'Jo', 'email': 'jo@example.com', 'subject': 'Hi', 'message': 'Hello'}
+
+    def test_burst_then_429_with_retry_after(self):
+        """Test POST beyond the bucket size returns 429 and a Retry-After header"""
+        url = reverse('social-link-list')
+        codes = [self.client.post(url, self.social_link, format='json').status_code for _ in range(3)]
+        response = self.client.post(url, self.social_link, format='json')
+
+        self.assertEqual(codes, [status.HTTP_201_CREATED] * 3)
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response['Retry-After'], '20')
+
+    def test_reads_are_not_limited(self):
+        """Test GET requests never take tokens"""
+        url = reverse('social-link-list')
+        for _ in range(10):
+            self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+
+        self.assertEqual(self.client.post(url, self.social_link, format='json').status_code, status.HTTP_201_CREATED)
+
+    def test_tokens_refill_over_time(self):
+        """Test a denied client is allowed again once a token has refilled"""
+        url = reverse('social-link-list')
+        now = 1_000_000.0
+        with mock.patch('my_app.throttling.time.time', return_value=now):
+            for _ in range(4):
+                self.client.post(url, self.social_link, format='json')
+        with mock.patch('my_app.throttling.time.time', return_value=now + 20):
+            response = self.client.post(url, self.social_link, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_buckets_are_per_client(self):
+        """Test another client address has its own bucket"""
+        url = reverse('social-link-list')
+        for _ in range(3):
+            self.client.post(url, self.social_link, format='json')
+        response = self.client.post(url, self.social_link, format='json', REMOTE_ADDR='10.0.0.2')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_forwarded_for_is_not_trusted_by_default(self):
+        """Test a client cannot get a fresh bucket by sending its own X-Forwarded-For"""
+        url = reverse('social-link-list')
+        codes = [
+            self.client.post(url, self.social_link, format='json', HTTP_X_FORWARDED_FOR=f'10.9.0.{i}').status_code
+            for i in range(4)
+        ]
+
+        self.assertEqual(codes[-1], status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_forwarded_for_behind_trusted_proxy(self):
+        """Test with NUM_PROXIES the address the proxy appended is the client"""
+        url = reverse('social-link-list')
+        with override_settings(REST_FRAMEWORK={
+            'DEFAULT_THROTTLE_CLASSES': ['my_app.throttling.WriteRateThrottle'],
+            'DEFAULT_THROTTLE_RATES': RATES,
+            'NUM_PROXIES': 1,
+        }):
+            for _ in range(3):
+                self.client.post(url, self.social_link, format='json', HTTP_X_FORWARDED_FOR='6.6.6.6, 10.0.0.2')
+            spoofed = self.client.post(url, self.social_link, format='json', HTTP_X_FORWARDED_FOR='7.7.7.7, 10.0.0.2')
+            other = self.client.post(url, self.social_link, format='json', HTTP_X_FORWARDED_FOR='10.0.0.3')
+
+        self.assertEqual(spoofed.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(other.status_code, status.HTTP_201_CREATED)
+
+    def test_buckets_are_per_endpoint(self):
+        """Test exhausting one endpoint leaves others available"""
+        for _ in range(4):
+            self.client.post(reverse('social-link-list'), self.social_link, format='json')
+        response = self.client.post(reverse('contact-message-list'), self.contact, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_view_scope_policy(self):
+        """Test ContactMessageAPIView uses the stricter 'contact' rates"""
+        url = reverse('contact-message-list')
+        codes = [self.client.post(url, self.contact, format='json').status_code for _ in range(3)]
+
+        self.assertEqual(codes[-1], status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_endpoint_bucket_limits_all_clients(self):
+        """Test the endpoint-wide bucket throttles many clients together"""
+        url = reverse('contact-message-list')
+        codes = [
+            self.client.post(url, self.contact, format='json', REMOTE_ADDR=f'10.0.0.{i}').status_code
+            for i in range(4)
+        ]
+
+        self.assertEqual(codes, [status.HTTP_201_CREATED] * 3 + [status.HTTP_429_TOO_MANY_REQUESTS])
+
+    def test_denied_request_takes_no_tokens(self):
+        """Test a request denied by one bucket does not drain the other"""
+        url = reverse('contact-message-list')
+        for i in range(3):
+            self.client.post(url, self.contact, format='json', REMOTE_ADDR=f'10.0.1.{i}')
+        for _ in range(5):
+            self.client.post(url, self.contact, format='json', REMOTE_ADDR='10.0.2.1')
+
+        buckets = dict(throttling._connection().execute('SELECT key, tokens FROM buckets').fetchall())
+        self.assertNotIn('contact-message-list|10.0.2.1', buckets)
+
+    def test_disabled_setting(self):
+        """Test RATE_LIMITS_ENABLED=False turns throttling off"""
+        url = reverse('contact-message-list')
+        with override_settings(RATE_LIMITS_ENABLED=False):
+            codes = {self.client.post(url, self.contact, format='json').status_code for _ in range(5)}
+
+        self.assertEqual(codes, {status.HTTP_201_CREATED})
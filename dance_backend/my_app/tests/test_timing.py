@@ -0,0 +1,89 @@
+import json
+import re
+
+from asgiref.sync import iscoroutinefunction
+from django.db import connection
+from django.http import HttpResponse
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from my_app import response_cache
+from my_app.models import Page, MediaItem, EventGallery
+from my_app.timing import ServerTimingMiddleware
+
+
+def server_timing(response):
+    """{'db': (ms, desc), ...} from a Server-Timing header."""
+    metrics = {}
+    for entry in response['Server-Timing'].split(', '):
+        match = re.fullmatch(r'(\w+);dur=([\d.]+)(?:;desc="([^"]*)")?', entry)
+        metrics[match[1]] = (float(match[2]), match[3])
+    return metrics
+
+
+@override_settings(SERVER_TIMING_SAMPLE_RATE=1.0)
+class ServerTimingTestCase(APITestCase):
+    def setUp(self):
+        """Set up test data"""
+        response_cache.clear()
+        self.page = Page.objects.create(title='About', slug='about', content='About us')
+        gallery = EventGallery.objects.create(title='Recital', slug='recital')
+        for i in range(3):
+            MediaItem.objects.create(media_type='photo', title=f'Photo {i}', image=f'photos/{i}.jpg', event=gallery)
+
+    def get(self, url):
+        with self.assertLogs('my_app.timing', 'INFO'):
+            return self.client.get(url)
+
+    def test_list_reports_phases(self):
+        """Test GET /api/media-items/ - db, serialize, render, app and total add up"""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get(reverse('media-item-list'))
+
+        metrics = server_timing(response)
+        self.assertEqual(list(metrics), ['db', 'render', 'serialize', 'app', 'total'])
+        self.assertEqual(metrics['db'][1], f'{len(queries)} queries')
+        parts = sum(metrics[name][0] for name in ('db', 'render', 'serialize', 'app'))
+        self.assertAlmostEqual(parts, metrics['total'][0], delta=0.5)
+
+    def test_by_slug_and_async_views(self):
+        """Test GET /api/pages/slug/<slug>/ and its async twin are timed without view changes"""
+        for name in ('page-by-slug', 'async-page-by-slug'):
+            with self.subTest(view=name):
+                response = self.get(reverse(name, kwargs={'slug': 'about'}))
+
+                metrics = server_timing(response)
+                self.assertGreater(int(metrics['db'][1].split()[0]), 0)
+                self.assertIn('serialize', metrics)
+                self.assertIn('render', metrics)
+
+    async def test_async_stack(self):
+        """Test the middleware runs as a coroutine under ASGI and still counts the async view's queries"""
+        async def get_response(request):
+            return HttpResponse()
+        self.assertTrue(iscoroutinefunction(ServerTimingMiddleware(get_response)))
+
+        with self.assertLogs('my_app.timing', 'INFO'):
+            response = await self.async_client.get(reverse('async-page-by-slug', kwargs={'slug': 'about'}))
+
+        self.assertGreater(int(server_timing(response)['db'][1].split()[0]), 0)
+
+    def test_logs_json_line(self):
+        """Test each sampled request is logged as JSON on my_app.timing"""
+        with self.assertLogs('my_app.timing', 'INFO') as logs:
+            self.client.get(reverse('page-list'))
+
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['view'], 'page-list')
+        self.assertEqual(record['status'], 200)
+        self.assertEqual(record, logs.records[0].timing)
+        self.assertIn('serialize_ms', record)
+
+    @override_settings(SERVER_TIMING_SAMPLE_RATE=0.0)
+    def test_unsampled_requests_are_untouched(self):
+        """Test requests outside the sample get no header and no log line"""
+        with self.assertNoLogs('my_app.timing'):
+            response = self.client.get(reverse('page-list'))
+
+        self.assertNotIn('Server-Timing', response)
@@ -0,0 +1,135 @@
+"""
+Token-bucket rate limiting for write requests.
+
+Each unsafe request takes a token from two buckets: one for the client
+address on that endpoint and one for the endpoint as a whole, so neither a
+single client nor a crowd can flood it. Buckets live in a small SQLite file
+at RATE_LIMIT_STORE shared by every worker process on the host; a check is
+one short write transaction.
+
+Rates are DRF-style 'N/period' strings in REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'],
+looked up under the view's `throttle_scope` ('<scope>' per client,
+'<scope>_endpoint' per endpoint) and falling back to 'write'. N is the
+burst size; tokens refill at N per period.
+
+The client is REMOTE_ADDR, or the address REST_FRAMEWORK['NUM_PROXIES']
+trusted proxies recorded in X-Forwarded-For.
+"""
+import os
+import random
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+
+from django.conf import settings
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+DEFAULT_SCOPE = 'write'
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS buckets ('
+    'key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL, full_at REAL NOT NULL) WITHOUT ROWID'
+)
+# Roughly one check in this many also drops buckets that have refilled completely.
+PRUNE_EVERY = 1000
+
+_local = threading.local()
+
+
+@lru_cache(maxsize=64)
+def parse_rate(rate):
+    """'30/min' -> (30 tokens, 0.5 tokens per second)."""
+    count, period = rate.split('/')
+    count = int(count)
+    return count, count / PERIODS[period[0]]
+
+
+def _connection():
+    key = (os.getpid(), str(settings.RATE_LIMIT_STORE))
+    connections = _local.__dict__.setdefault('connections', {})
+    conn = connections.get(key)
+    if conn is None:
+        os.makedirs(os.path.dirname(key[1]) or '.', exist_ok=True)
+        conn = sqlite3.connect(key[1], timeout=5, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        # Losing the last few bucket updates in a crash is harmless.
+        conn.execute('PRAGMA synchronous=OFF')
+        conn.execute(SCHEMA)
+        connections[key] = conn
+    return conn
+
+
+def take(buckets):
+    """
+    Take one token from each (key, capacity, refill_per_second) bucket.
+
+    Returns 0 when every bucket had a token, else the seconds until all of
+    them will; nothing is taken from any bucket in that case.
+    """
+    now = time.time()
+    conn = _connection()
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        levels = []
+        for key, capacity, rate in buckets:
+            row = conn.execute('SELECT tokens, updated FROM buckets WHERE key = ?', (key,)).fetchone()
+            levels.append(capacity if row is None else min(capacity, row[0] + (now - row[1]) * rate))
+        wait = max(
+            ((1 - tokens) / rate for tokens, (_, _, rate) in zip(levels, buckets) if tokens < 1),
+            default=0.0,
+        )
+        if not wait:
+            conn.executemany(
+                'INSERT INTO buckets (key, tokens, updated, full_at) VALUES (?, ?, ?, ?) '
+                'ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, '
+                'updated = excluded.updated, full_at = excluded.full_at',
+                [
+                    (key, tokens - 1, now, now + (capacity - tokens + 1) / rate)
+                    for (key, capacity, rate), tokens in zip(buckets, levels)
+                ],
+            )
+        if random.randrange(PRUNE_EVERY) == 0:
+            conn.execute('DELETE FROM buckets WHERE full_at < ?', (now,))
+        conn.execute('COMMIT')
+    except BaseException:
+        conn.execute('ROLLBACK')
+        raise
+    return wait
+
+
+class WriteRateThrottle(BaseThrottle):
+    def allow_request(self, request, view):
+        self.wait_seconds = 0.0
+        if request.method in SAFE_METHODS or not settings.RATE_LIMITS_ENABLED:
+            return True
+        scope = getattr(view, 'throttle_scope', DEFAULT_SCOPE)
+        match = request.resolver_match
+        endpoint = match.view_name if match else type(view).__name__
+        buckets = []
+        for suffix, client in (('', self.get_ident(request)), ('_endpoint', '*')):
+            rate = self.get_rate(scope, suffix)
+            if rate:
+                capacity, per_second = parse_rate(rate)
+                buckets.append((f'{endpoint}|{client}', capacity, per_second))
+        if buckets:
+            self.wait_seconds = take(buckets)
+        return not self.wait_seconds
+
+    def get_ident(self, request):
+        # X-Forwarded-For is whatever the client sent unless NUM_PROXIES says
+        # how many of its entries were added by proxies we trust.
+        if api_settings.NUM_PROXIES is None:
+            return request.META['REMOTE_ADDR']
+        return super().get_ident(request)
+
+    def get_rate(self, scope, suffix):
+        rates = api_settings.DEFAULT_THROTTLE_RATES
+        if scope in rates:
+            return rates.get(scope + suffix)
+        return rates.get(DEFAULT_SCOPE + suffix)
+
+    def wait(self):
+        return self.wait_seconds
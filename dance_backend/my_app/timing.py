@@ -0,0 +1,166 @@
+"""
+Per-request timings, reported in a Server-Timing header and a log line.
+
+ServerTimingMiddleware samples SERVER_TIMING_SAMPLE_RATE of requests. For a
+sampled request it wraps every database connection with execute_wrapper to
+add up query time and count, and times the rendering of DRF responses with
+a post-render callback. Serializers and encoders time themselves through
+`phase()`, which does nothing outside a sampled request. A phase leaves out
+the queries run inside it (a lazy queryset evaluated while serializing is
+db time, not serialize time), so db + serialize + render + app = total.
+
+Lists streamed with ?stream= query and serialize after the response has
+left the middleware; their header and log line cover the work before that.
+
+The middleware runs natively in both sync and async stacks, so the async
+views are not adapted back to sync on its account. `wrap_connections()` is
+shared with the other middleware that watch every query.
+"""
+import contextvars
+import json
+import logging
+import random
+import time
+from contextlib import ExitStack, contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+current = contextvars.ContextVar('server_timing', default=None)
+
+
+class Timer:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db = 0.0
+        self.queries = 0
+        self.phases = {}
+        self.active = None
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db += time.perf_counter() - started
+            self.queries += 1
+
+    def add(self, name, seconds):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def metrics(self):
+        """(name, milliseconds) for db, each phase, the unaccounted rest as app, and total."""
+        total = time.perf_counter() - self.started
+        measured = [('db', self.db), *sorted(self.phases.items())]
+        app = total - sum(seconds for _, seconds in measured)
+        return [(name, seconds * 1000) for name, seconds in (*measured, ('app', max(app, 0.0)), ('total', total))]
+
+
+@contextmanager
+def phase(name):
+    """Attribute the time spent in the block to `name`. Nested phases count towards the outer one."""
+    timer = current.get()
+    if timer is None or timer.active is not None:
+        yield
+        return
+    timer.active = name
+    db = timer.db
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timer.add(name, time.perf_counter() - started - (timer.db - db))
+        timer.active = None
+
+
+@contextmanager
+def wrap_connections(wrapper):
+    """Install `wrapper` as an execute_wrapper on every database connection."""
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(wrapper))
+        yield
+
+
+def header(metrics, queries):
+    parts = []
+    for name, ms in metrics:
+        desc = f';desc="{queries} queries"' if name == 'db' else ''
+        parts.append(f'{name};dur={ms:.1f}{desc}')
+    return ', '.join(parts)
+
+
+class ServerTimingMiddleware:
+    """
+    Adds `Server-Timing: db;dur=..;desc="N queries", serialize;dur=..,
+    render;dur=.., app;dur=.., total;dur=..` to a sampled share of responses
+    and logs the same numbers as JSON on the my_app.timing logger.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.sampled():
+            return self.get_response(request)
+
+        timer = Timer()
+        token = current.set(timer)
+        try:
+            with wrap_connections(timer):
+                response = self.get_response(request)
+        finally:
+            current.reset(token)
+        return self.report(request, response, timer)
+
+    async def __acall__(self, request):
+        if not self.sampled():
+            return await self.get_response(request)
+
+        timer = Timer()
+        token = current.set(timer)
+        try:
+            with wrap_connections(timer):
+                response = await self.get_response(request)
+        finally:
+            current.reset(token)
+        return self.report(request, response, timer)
+
+    def sampled(self):
+        rate = settings.SERVER_TIMING_SAMPLE_RATE
+        return rate > 0 and (rate >= 1 or random.random() < rate)
+
+    def report(self, request, response, timer):
+        metrics = timer.metrics()
+        response['Server-Timing'] = header(metrics, timer.queries)
+        self.log(request, response, timer.queries, metrics)
+        return response
+
+    def process_template_response(self, request, response):
+        timer = current.get()
+        if timer is not None:
+            started = time.perf_counter()
+            response.add_post_render_callback(lambda rendered: timer.add('render', time.perf_counter() - started))
+        return response
+
+    def log(self, request, response, queries, metrics):
+        match = request.resolver_match
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'view': match.view_name if match else None,
+            'status': response.status_code,
+            'queries': queries,
+            **{f'{name}_ms': round(ms, 2) for name, ms in metrics},
+        }
+        logger.info(json.dumps(record), extra={'timing': record})
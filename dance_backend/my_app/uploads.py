@@ -0,0 +1,155 @@
+"""
+Part files for resumable uploads.
+
+A ChunkedUpload's bytes live in CHUNKED_UPLOAD_DIR/<id>.part. Each chunk is
+first copied from the request stream to a staging file of its own,
+<id>.<random>.chunk, in fixed-size blocks, so neither the chunk nor the
+whole upload is held in memory and no transaction is open while a slow
+client sends it. Only then is the row locked, briefly, to check the offset,
+append the staged bytes to the part file and advance `offset`.
+"""
+import datetime
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.db import transaction
+from django.utils import timezone
+
+BLOCK_SIZE = 64 * 1024
+STAGED_SUFFIX = '.chunk'
+
+
+class OffsetMismatch(Exception):
+    def __init__(self, offset):
+        super().__init__(f'Upload is at offset {offset}.')
+        self.offset = offset
+
+
+class ChunkTooLarge(Exception):
+    pass
+
+
+def part_path(upload_id):
+    return os.path.join(settings.CHUNKED_UPLOAD_DIR, f'{upload_id}.part')
+
+
+def create_part(upload):
+    os.makedirs(settings.CHUNKED_UPLOAD_DIR, exist_ok=True)
+    open(part_path(upload.pk), 'wb').close()
+
+
+def append_chunk(upload_id, offset, stream, length):
+    """
+    Write `length` bytes from `stream` at `offset` and return the upload with
+    its new offset. Raises OffsetMismatch unless `offset` is where the upload
+    currently ends, and ChunkTooLarge if the chunk would pass its size.
+    """
+    from .models import ChunkedUpload
+
+    # Reject a chunk that cannot apply before reading any of it.
+    check(ChunkedUpload.objects.get(pk=upload_id), offset, length)
+    staged, written = stage_chunk(upload_id, stream, length)
+    try:
+        with transaction.atomic():
+            upload = ChunkedUpload.objects.select_for_update().get(pk=upload_id)
+            # Another request may have appended while this chunk was arriving.
+            check(upload, offset, length)
+            with open(part_path(upload.pk), 'r+b') as part, open(staged, 'rb') as chunk:
+                part.seek(offset)
+                part.truncate()
+                shutil.copyfileobj(chunk, part, BLOCK_SIZE)
+            # A dropped connection keeps what arrived; the client resumes from there.
+            upload.offset = offset + written
+            upload.save(update_fields=['offset', 'updated_at'])
+    finally:
+        os.remove(staged)
+    return upload
+
+
+def check(upload, offset, length):
+    if offset != upload.offset:
+        raise OffsetMismatch(upload.offset)
+    if length > settings.CHUNKED_UPLOAD_MAX_CHUNK or offset + length > upload.size:
+        raise ChunkTooLarge()
+
+
+def stage_chunk(upload_id, stream, length):
+    """Copy up to `length` bytes of `stream` to a new staging file; return its path and the bytes copied."""
+    os.makedirs(settings.CHUNKED_UPLOAD_DIR, exist_ok=True)
+    fd, path = tempfile.mkstemp(suffix=STAGED_SUFFIX, prefix=f'{upload_id}.', dir=settings.CHUNKED_UPLOAD_DIR)
+    written = 0
+    try:
+        with os.fdopen(fd, 'wb') as staged:
+            while written < length:
+                block = stream.read(min(BLOCK_SIZE, length - written))
+                if not block:
+                    break
+                staged.write(block)
+                written += len(block)
+    except BaseException:
+        os.remove(path)
+        raise
+    return path, written
+
+
+def assembled_file(upload):
+    """The finished part file as an upload Django storage can move into place."""
+    return AssembledUpload(part_path(upload.pk), upload.filename, upload.size)
+
+
+class AssembledUpload(UploadedFile):
+    """
+    Exposes `temporary_file_path()` like Django's own large uploads, so
+    FileSystemStorage renames the part file instead of copying it.
+    """
+
+    def __init__(self, path, name, size):
+        super().__init__(open(path, 'rb'), name, None, size)
+        self.path = path
+
+    def temporary_file_path(self):
+        return self.path
+
+
+def discard(upload):
+    try:
+        os.remove(part_path(upload.pk))
+    except FileNotFoundError:
+        pass
+    upload.delete()
+
+
+def expired(now=None):
+    from .models import ChunkedUpload
+
+    cutoff = (now or timezone.now()) - datetime.timedelta(hours=settings.CHUNKED_UPLOAD_EXPIRY_HOURS)
+    return ChunkedUpload.objects.filter(updated_at__lt=cutoff)
+
+
+def orphaned_parts(now=None):
+    """
+    Part files with no upload row, e.g. left by a crash during finalize, and
+    staged chunks of a request that died before appending them.
+    """
+    from .models import ChunkedUpload
+
+    try:
+        names = os.listdir(settings.CHUNKED_UPLOAD_DIR)
+    except FileNotFoundError:
+        return []
+    known = {str(pk) for pk in ChunkedUpload.objects.values_list('pk', flat=True)}
+    cutoff = (now or timezone.now()).timestamp() - settings.CHUNKED_UPLOAD_EXPIRY_HOURS * 3600
+    orphans = []
+    for name in names:
+        path = os.path.join(settings.CHUNKED_UPLOAD_DIR, name)
+        if name.endswith('.part'):
+            if name[:-len('.part')] not in known:
+                orphans.append(path)
+        elif name.endswith(STAGED_SUFFIX):
+            # A staged chunk is in use only while its request is still sending it.
+            if name.split('.', 1)[0] not in known or os.path.getmtime(path) < cutoff:
+                orphans.append(path)
+    return orphans
@@ -1,23 +1,53 @@
-from django.urls import path
-from . import views
+from django.urls import include, path
+from . import async_views, views
+from .models import Page, ClassSection, SocialLink, MediaItem, NewsPost
 
 urlpatterns = [
     path('pages/', views.PageAPIView.as_view(), name='page-list'),
+    path('pages/reorder/', views.ReorderAPIView.as_view(model=Page), name='page-reorder'),
     path('pages/slug/<str:slug>/', views.PageBySlugAPIView.as_view(), name='page-by-slug'),
     path('pages/<int:pk>/', views.PageDetailAPIView.as_view(), name='page-detail'),
     path('class-sections/', views.ClassSectionAPIView.as_view(), name='class-section-list'),
+    path('class-sections/reorder/', views.ReorderAPIView.as_view(model=ClassSection), name='class-section-reorder'),
     path('class-sections/slug/<str:slug>/', views.ClassSectionBySlugAPIView.as_view(), name='class-section-by-slug'),
     path('class-sections/<int:pk>/', views.ClassSectionDetailAPIView.as_view(), name='class-section-detail'),
     path('news-posts/', views.NewsPostAPIView.as_view(), name='news-post-list'),
     path('news-posts/slug/<str:slug>/', views.NewsPostBySlugAPIView.as_view(), name='news-post-by-slug'),
     path('news-posts/<int:pk>/', views.NewsPostDetailAPIView.as_view(), name='news-post-detail'),
+    path('news-posts/<int:pk>/image/<str:descriptor>/', views.ImageVariantView.as_view(model=NewsPost), name='news-post-image'),
     path('contact-messages/', views.ContactMessageAPIView.as_view(), name='contact-message-list'),
     path('contact-messages/<int:pk>/', views.ContactMessageDetailAPIView.as_view(), name='contact-message-detail'),
     path('social-links/', views.SocialLinkAPIView.as_view(), name='social-link-list'),
+    path('social-links/reorder/', views.ReorderAPIView.as_view(model=SocialLink), name='social-link-reorder'),
     path('social-links/<int:pk>/', views.SocialLinkDetailAPIView.as_view(), name='social-link-detail'),
     path('media-items/', views.MediaItemAPIView.as_view(), name='media-item-list'),
+    path('media-items/bulk/', views.MediaItemBulkAPIView.as_view(), name='media-item-bulk'),
     path('media-items/<int:pk>/', views.MediaItemDetailAPIView.as_view(), name='media-item-detail'),
+    path('media-items/<int:pk>/image/<str:descriptor>/', views.ImageVariantView.as_view(model=MediaItem), name='media-item-image'),
+    path('uploads/', views.ChunkedUploadAPIView.as_view(), name='chunked-upload-list'),
+    path('uploads/<uuid:pk>/', views.ChunkedUploadDetailAPIView.as_view(), name='chunked-upload-detail'),
+    path('uploads/<uuid:pk>/finalize/', views.ChunkedUploadFinalizeAPIView.as_view(), name='chunked-upload-finalize'),
     path('event-galleries/', views.EventGalleryAPIView.as_view(), name='event-gallery-list'),
     path('event-galleries/slug/<str:slug>/', views.EventGalleryBySlugAPIView.as_view(), name='event-gallery-by-slug'),
     path('event-galleries/<int:pk>/', views.EventGalleryDetailAPIView.as_view(), name='event-gallery-detail'),
-]
\ No newline at end of file
+    path('layout/', views.LayoutBundleAPIView.as_view(), name='layout-bundle'),
+    path('search/', views.SearchAPIView.as_view(), name='search'),
+    path('async/', include([
+        path('pages/', async_views.AsyncPageListView.as_view(), name='async-page-list'),
+        path('pages/slug/<str:slug>/', async_views.AsyncPageView.as_view(), name='async-page-by-slug'),
+        path('pages/<int:pk>/', async_views.AsyncPageView.as_view(), name='async-page-detail'),
+        path('class-sections/', async_views.AsyncClassSectionListView.as_view(), name='async-class-section-list'),
+        path('class-sections/slug/<str:slug>/', async_views.AsyncClassSectionView.as_view(), name='async-class-section-by-slug'),
+        path('class-sections/<int:pk>/', async_views.AsyncClassSectionView.as_view(), name='async-class-section-detail'),
+        path('news-posts/', async_views.AsyncNewsPostListView.as_view(), name='async-news-post-list'),
+        path('news-posts/slug/<str:slug>/', async_views.AsyncNewsPostView.as_view(), name='async-news-post-by-slug'),
+        path('news-posts/<int:pk>/', async_views.AsyncNewsPostView.as_view(), name='async-news-post-detail'),
+        path('social-links/', async_views.AsyncSocialLinkListView.as_view(), name='async-social-link-list'),
+        path('social-links/<int:pk>/', async_views.AsyncSocialLinkView.as_view(), name='async-social-link-detail'),
+        path('media-items/', async_views.AsyncMediaItemListView.as_view(), name='async-media-item-list'),
+        path('media-items/<int:pk>/', async_views.AsyncMediaItemView.as_view(), name='async-media-item-detail'),
+        path('event-galleries/', async_views.AsyncEventGalleryListView.as_view(), name='async-event-gallery-list'),
+        path('event-galleries/slug/<str:slug>/', async_views.AsyncEventGalleryBySlugView.as_view(), name='async-event-gallery-by-slug'),
+        path('event-galleries/<int:pk>/', async_views.AsyncEventGalleryView.as_view(), name='async-event-gallery-detail'),
+    ])),
+]
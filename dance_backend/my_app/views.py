@@ -1,27 +1,94 @@
-from rest_framework import views, status
+from rest_framework import views, status, serializers
 from rest_framework.response import Response
-from django.db.models import Q
-from .models import Page, ClassSection, NewsPost, ContactMessage, SocialLink, MediaItem, EventGallery
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Case, F, Max, Min, Prefetch, Q, Value, When
+from django.http import FileResponse, Http404
+from django.utils import timezone
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.views import View
+from .models import (
+    SYSTEM_PAGES, Page, ClassSection, NewsPost, ContactMessage, SocialLink, MediaItem, EventGallery, ChunkedUpload,
+    OrderSequence
+)
 from .serializers import (
     PageSerializer, ClassSectionSerializer, NewsPostSerializer,
     ContactMessageSerializer, SocialLinkSerializer, MediaItemSerializer,
-    EventGallerySerializer
+    EventGallerySerializer, EventGalleryWithMediaSerializer, MediaItemBulkSerializer,
+    ChunkedUploadSerializer
 )
+from .conditional import Validators
+from .pagination import KeysetPagination
+from .response_cache import cache_response
+from .signals import purge_cached_responses
+from . import contact_spool, encoders, images, search, snapshots, streaming, uploads
+
+
+def page_exclusions(request):
+    """
+    What ?exclude_slugs= hides from page lists: the listed slugs, nothing for
+    'none', or every `is_system` page when the parameter is absent.
+    """
+    exclude_slugs = request.query_params.get('exclude_slugs')
+    if exclude_slugs is None:
+        return [SYSTEM_PAGES]
+    if exclude_slugs.lower() == 'none':
+        return []
+    return [s.strip().lower() for s in exclude_slugs.split(',') if s.strip()]
+
+
+def exclude_pages(pages, exclusions):
+    if SYSTEM_PAGES in exclusions:
+        pages = pages.filter(is_system=False)
+    slugs = [token for token in exclusions if token != SYSTEM_PAGES]
+    if slugs:
+        pages = pages.exclude(slug__in=slugs)
+    return pages
+
+
+def is_page_excluded(page, exclusions):
+    return page.slug in exclusions or (page.is_system and SYSTEM_PAGES in exclusions)
+
+
+def gallery_includes(request):
+    include = {name.strip() for name in request.query_params.get('include', '').split(',') if name.strip()}
+    unknown = include - {'media_items'}
+    if unknown:
+        raise serializers.ValidationError({'include': f"Unknown include(s): {', '.join(sorted(unknown))}"})
+    return include
+
+
+def published_media_prefetch(request):
+    """Published media per gallery, oldest first, optionally capped with ?media_limit=."""
+    items = MediaItem.published.order_by('created_at', 'id')
+    try:
+        limit = int(request.query_params['media_limit'])
+    except (KeyError, ValueError):
+        limit = None
+    if limit is not None and limit > 0:
+        items = items[:limit]
+    return Prefetch('media_items', queryset=items, to_attr='published_media_items')
 
 
 class PageAPIView(views.APIView):
+    ordering = ('order', 'id')
+
+    @cache_response(Page, exclusions=page_exclusions)
     def get(self, request):
-        exclude_slugs = request.query_params.get('exclude_slugs', 'contact,socialmedia')
-        if exclude_slugs.lower() == 'none':
-            pages = Page.objects.all()
-        else:
-            slugs = [s.strip().lower() for s in exclude_slugs.split(',')]
-            query = Q()
-            for slug in slugs:
-                query |= Q(slug__iexact=slug)
-            pages = Page.objects.exclude(query)
-        serializer = PageSerializer(pages, many=True)
-        return Response(serializer.data)
+        pages = exclude_pages(Page.objects.all(), page_exclusions(request))
+        selection = PageSerializer.get_sparse_fieldset(request)
+        pages = PageSerializer.restrict_queryset(pages, selection, required=self.ordering)
+        validators = Validators.for_queryset(request, pages)
+        not_modified = validators.check(request)
+        if not_modified is not None:
+            return not_modified
+        paginator = KeysetPagination(self.ordering)
+        page = paginator.paginate_queryset(pages, request, view=self)
+        if page is not None:
+            serializer = PageSerializer(page, many=True, **selection)
+            return validators.apply(paginator.get_paginated_response(serializer.data))
+        serializer = PageSerializer(pages.order_by(*self.ordering), many=True, **selection)
+        return validators.apply(Response(serializer.data))
 
     def post(self, request):
         serializer = PageSerializer(data=request.data)
@@ -42,8 +109,12 @@ class PageDetailAPIView(views.APIView):
         page = self.get_object(pk)
         if page is None:
             return Response(status=status.HTTP_404_NOT_FOUND)
+        validators = Validators.for_object(request, page)
+        not_modified = validators.check(request)
+        if not_modified is not None:
+            return not_modified
         serializer = PageSerializer(page)
-        return Response(serializer.data)
+        return validators.apply(Response(serializer.data))
 
     def put(self, request, pk):
         page = self.get_object(pk)
@@ -66,18 +137,36 @@ class PageDetailAPIView(views.APIView):
 class PageBySlugAPIView(views.APIView):
     def get(self, request, slug):
         try:
-            page = Page.objects.get(slug__iexact=slug)
+            page = Page.objects.get(slug=slug)
         except Page.DoesNotExist:
             return Response(status=status.HTTP_404_NOT_FOUND)
+        validators = Validators.for_object(request, page)
+        not_modified = validators.check(request)
+        if not_modified is not None:
+            return not_modified
         serializer = PageSerializer(page)
-        return Response(serializer.data)
+        return validators.apply(Response(serializer.data))
 
 
 class ClassSectionAPIView(views.APIView):
+    ordering = ('order', 'id')
+
+    @cache_response(ClassSection)
     def get(self, request):
         sections = ClassSection.objects.all()
-        serializer = ClassSectionSerializer(sections, many=True)
-        return Response(serializer.data)
+        selection = ClassSectionSerializer.get_sparse_fieldset(request)
+        sections = ClassSectionSerializer.restrict_queryset(sections, selection, required=self.ordering)
+        validators = Validators.for_queryset(request, sections)
+        not_modified = validators.check(request)
+        if not_modified is not None:
+            return not_modified
+        paginator = KeysetPagination(self.ordering)
+        page = paginator.paginate_queryset(sections, request, view=self)
+        if page is not None:
+            serializer = ClassSectionSerializer(page, many=True, **selection)
+            return validators.apply(paginator.get_paginated_response(serializer.data))
+        serializer = ClassSectionSerializer(sections.order_by(*self.ordering), many=True, **selection)
+        return validators.apply(Response(serializer.data))
 
     def post(self, request):
         serializer = ClassSectionSerializer(data=request.data)
@@ -98,8 +187,12 @@ class ClassSectionDetailAPIView(views.APIView):
         section = self.get_object(pk)
         if section is None:
             return Response(status=status.HTTP_404_NOT_FOUND)
+        validators = Validators.for_object(request, section)
+        not_modified = validators.check(request)
+        if not_modified is not None:
+            return not_modified
         serializer = ClassSectionSerializer(section)
-        return Response(serializer.data)
+        return validators.apply(Response(serializer.data))
 
     def put(self, request, pk):
         section = self.get_object(pk)
@@ -122,18 +215,36 @@ class ClassSectionDetailAPIView(views.APIView):
 class ClassSectionBySlugAPIView(views.APIView):
     def get(self, request, slug):
         try:
-            section = ClassSection.objects.get(slug__iexact=slug)
+            section = ClassSection.objects.get(slug=slug)
         except ClassSection.DoesNotExist:
             return Response(status=status.HTTP_404_NOT_FOUND)
+        validators = Validators.for_object(request, section)
+        not_modified = validators.check(request)
+        if not_modified is not None:
+            return not_modified
         serializer = ClassSectionSerializer(section)
-        return Response(serializer.data)
+        return validators.apply(Response(serializer.data))
 
 
 class NewsPostAPIView(views.APIView):
+    ordering = ('-published_at', 'id')
+
+    @cache_response(NewsPost)
     def get(self, request):
         posts = NewsPost.objects.all()
-        serializer = NewsPostSerializer(posts, many=True)
-        return Response(serializer.data)
+        selection = NewsPostSerializer.get_sparse_fieldset(request)
+        posts = NewsPostSerializer.restrict_queryset(posts, selection, required=self.ordering)
+        validators = Validators.for_queryset(request, posts)
+        not_modified = validators.check(request)
+        if not_modified is not None:
+            return not_modified
+        paginator = KeysetPagination(self.ordering)
+        page = paginator.paginate_queryset(posts, request, view=self)
+        if page is not None:
+            serializer = NewsPostSerializer(page, many=True, **selection)
+            return validators.apply(paginator.get_paginated_response(serializer.data))
+        data = encoders.serialize_list(NewsPostSerializer, posts.order_by(*self.ordering), selection)
+        return validators.apply(Response(data))
 
     def post(self, request):
         serializer = NewsPostSerializer(data=request.data)
@@ -154,8 +265,12 @@ class NewsPostDetailAPIView(views.APIView):
         post = self.get_object(pk)
         if post is None:
             return Response(status=status.HTTP_404_NOT_FOUND)
+        validators = Validators.for_object(request, post)
+        not_modified = validators.check(request)
+        if not_modified is not None:
+            return not_modified
         serializer = NewsPostSerializer(post)
-        return Response(serializer.data)
+        return validators.apply(Response(serializer.data))
 
     def put(self, request, pk):
         post = self.get_object(pk)
@@ -178,22 +293,46 @@ class NewsPostDetailAPIView(views.APIView):
 class NewsPostBySlugAPIView(views.APIView):
     def get(self, request, slug):
         try:
-            post = NewsPost.objects.get(slug__iexact=slug)
+            post = NewsPost.objects.get(slug=slug)
         except NewsPost.DoesNotExist:
             return Response(status=status.HTTP_404_NOT_FOUND)
+        validators = Validators.for_object(request, post)
+        not_modified = validators.check(request)
+        if not_modified is not None:
+            return not_modified
         serializer = NewsPostSerializer(post)
-        return Response(serializer.data)
+        return validators.apply(Response(serializer.data))
 
 
 class ContactMessageAPIView(views.APIView):
+    ordering = ('-submitted_at', 'id')
+    throttle_scope = 'contact'
+
     def get(self, request):
         messages = ContactMessage.objects.all()
-        serializer = ContactMessageSerializer(messages, many=True)
-        return Response(serializer.data)
+        selection = ContactMessageSerializer.get_sparse_fieldset(request)
+        messages = ContactMessageSerializer.restrict_queryset(messages, selection, required=self.ordering)
+        validators = Validators.for_queryset(request, messages)
+        not_modified = validators.check(request)
+        if not_modified is not None:
+            return not_modified
+        paginator = KeysetPagination(self.ordering)
+        page = paginator.paginate_queryset(messages, request, view=self)
+        if page is not None:
+            serializer = ContactMessageSerializer(page, many=True, **selection)
+            return validators.apply(paginator.get_paginated_response(serializer.data))
+        messages = messages.order_by(*self.ordering)
+        if streaming.wants_stream(request):
+            return validators.apply(streaming.stream_list(ContactMessageSerializer, messages, selection))
+        serializer = ContactMessageSerializer(messages, many=True, **selection)
+        return validators.apply(Response(serializer.data))
 
     def post(self, request):
         serializer = ContactMessageSerializer(data=request.data)
         if serializer.is_valid():
+            if contact_spool.is_enabled():
+                contact_spool.enqueue(serializer.validated_data)
+                return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
             serializer.save()
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -210,8 +349,12 @@ class ContactMessageDetailAPIView(views.APIView):
         message = self.get_object(pk)
         if message is None:
             return Response(status=status.HTTP_404_NOT_FOUND)
+        validators = Validators.for_object(request, message)
+        not_modified = validators.check(request)
+        if not_modified is not None:
+            return not_modified
         serializer = ContactMessageSerializer(message)
-        return Response(serializer.data)
+        return validators.apply(Response(serializer.data))
 
     def put(self, request, pk):
         message = self.get_object(pk)
@@ -232,10 +375,24 @@ class ContactMessageDetailAPIView(views.APIView):
 
 
 class SocialLinkAPIView(views.APIView):
+    ordering = ('order', 'id')
+
+    @cache_response(SocialLink)
     def get(self, request):
         links = SocialLink.objects.all()
-        serializer = SocialLinkSerializer(links, many=True)
-        return Response(serializer.data)
+        selection = SocialLinkSerializer.get_sparse_fieldset(request)
+        links = SocialLinkSerializer.restrict_queryset(links, selection, required=self.ordering)
+        validators = Validators.for_queryset(request, links)
+        not_modified = validators.check(request)
+        if not_modified is not None:
+            return not_modified
+        paginator = KeysetPagination(self.ordering)
+        page = paginator.paginate_queryset(links, request, view=self)
+        if page is not None:
+            serializer = SocialLinkSerializer(page, many=True, **selection)
+            return validators.apply(paginator.get_paginated_response(serializer.data))
+        serializer = SocialLinkSerializer(links.order_by(*self.ordering), many=True, **selection)
+        return validators.apply(Response(serializer.data))
 
     def post(self, request):
         serializer = SocialLinkSerializer(data=request.data)
@@ -256,8 +413,12 @@ class SocialLinkDetailAPIView(views.APIView):
         link = self.get_object(pk)
         if link is None:
             return Response(status=status.HTTP_404_NOT_FOUND)
+        validators = Validators.for_object(request, link)
+        not_modified = validators.check(request)
+        if not_modified is not None:
+            return not_modified
         serializer = SocialLinkSerializer(link)
-        return Response(serializer.data)
+        return validators.apply(Response(serializer.data))
 
     def put(self, request, pk):
         link = self.get_object(pk)
@@ -278,10 +439,31 @@ class SocialLinkDetailAPIView(views.APIView):
 
 
 class MediaItemAPIView(views.APIView):
+    ordering = ('-created_at', 'id')
+
     def get(self, request):
         items = MediaItem.objects.all()
-        serializer = MediaItemSerializer(items, many=True)
-        return Response(serializer.data)
+        event = request.query_params.get('event')
+        if event is not None:
+            if not event.isdigit():
+                raise serializers.ValidationError({'event': 'A valid integer is required.'})
+            items = items.filter(event_id=int(event))
+        selection = MediaItemSerializer.get_sparse_fieldset(request)
+        items = MediaItemSerializer.restrict_queryset(items, selection, required=self.ordering)
+        validators = Validators.for_queryset(request, items)
+        not_modified = validators.check(request)
+        if not_modified is not None:
+            return not_modified
+        paginator = KeysetPagination(self.ordering)
+        page = paginator.paginate_queryset(items, request, view=self)
+        if page is not None:
+            serializer = MediaItemSerializer(page, many=True, **selection)
+            return validators.apply(paginator.get_paginated_response(serializer.data))
+        items = items.order_by(*self.ordering)
+        if streaming.wants_stream(request):
+            return validators.apply(streaming.stream_list(MediaItemSerializer, items, selection))
+        data = encoders.serialize_list(MediaItemSerializer, items, selection)
+        return validators.apply(Response(data))
 
     def post(self, request):
         serializer = MediaItemSerializer(data=request.data)
@@ -291,6 +473,234 @@ class MediaItemAPIView(views.APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+class MediaItemBulkAPIView(views.APIView):
+    """
+    POST   /api/media-items/bulk/ - create from a JSON list, or from multipart
+           with one photo per `images` file and the other fields shared
+    PATCH  /api/media-items/bulk/ - partial update from a JSON list of items with `id`
+    DELETE /api/media-items/bulk/ - delete {"ids": [...]}
+
+    All items are validated in one pass and the valid ones are written with a
+    single bulk query inside one transaction. Invalid items are reported by
+    index and the rest are still written (207); with ?atomic=true any invalid
+    item rejects the whole batch (400).
+    """
+    max_items = 1000
+    batch_size = 200
+
+    def post(self, request):
+        items = self.get_items(request, allow_files=True)
+        context = {'preloaded': self.preload_events(items)}
+        created, errors = [], []
+        for index, item in enumerate(items):
+            serializer = MediaItemBulkSerializer(data=item, context=context)
+            if serializer.is_valid():
+                created.append(MediaItem(**serializer.validated_data))
+            else:
+                errors.append({'index': index, 'errors': serializer.errors})
+        if errors and (self.is_atomic(request) or not created):
+            return Response({'created': [], 'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        with transaction.atomic():
+            created = MediaItem.objects.bulk_create(created, batch_size=self.batch_size)
+            purge_cached_responses(MediaItem)
+            for item in created:
+                images.generate(item)
+        return Response(
+            {'created': MediaItemSerializer(created, many=True).data, 'errors': errors},
+            status=status.HTTP_207_MULTI_STATUS if errors else status.HTTP_201_CREATED,
+        )
+
+    def patch(self, request):
+        items = self.get_items(request)
+        ids = [self.parse_id(item.get('id')) for item in items if isinstance(item, dict)]
+        instances = MediaItem.objects.in_bulk([pk for pk in ids if pk is not None])
+        context = {'preloaded': self.preload_events(items)}
+        updated, fields, seen, errors = [], set(), set(), []
+        for index, item in enumerate(items):
+            pk = self.parse_id(item.get('id')) if isinstance(item, dict) else None
+            if pk not in instances:
+                errors.append({'index': index, 'errors': {'id': ['No media item with this id.']}})
+                continue
+            if pk in seen:
+                errors.append({'index': index, 'errors': {'id': ['Duplicate id in this request.']}})
+                continue
+            seen.add(pk)
+            serializer = MediaItemBulkSerializer(instances[pk], data=item, partial=True, context=context)
+            if not serializer.is_valid():
+                errors.append({'index': index, 'errors': serializer.errors})
+                continue
+            for name, value in serializer.validated_data.items():
+                setattr(instances[pk], name, value)
+            fields.update(serializer.validated_data)
+            updated.append(instances[pk])
+        if errors and (self.is_atomic(request) or not updated):
+            return Response({'updated': [], 'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        # bulk_update() skips auto_now, so stamp updated_at for the list ETags.
+        now = timezone.now()
+        for instance in updated:
+            instance.updated_at = now
+        with transaction.atomic():
+            MediaItem.objects.bulk_update(updated, sorted(fields | {'updated_at'}), batch_size=self.batch_size)
+            purge_cached_responses(MediaItem)
+        return Response(
+            {'updated': MediaItemSerializer(updated, many=True).data, 'errors': errors},
+            status=status.HTTP_207_MULTI_STATUS if errors else status.HTTP_200_OK,
+        )
+
+    def delete(self, request):
+        ids = request.data.get('ids') if isinstance(request.data, dict) else None
+        if not isinstance(ids, list) or not ids or len(ids) > self.max_items:
+            raise serializers.ValidationError({'ids': f'Expected a list of 1 to {self.max_items} ids.'})
+        parsed = [self.parse_id(pk) for pk in ids]
+        if None in parsed:
+            raise serializers.ValidationError({'ids': 'Every id must be an integer.'})
+        with transaction.atomic():
+            items = MediaItem.objects.filter(pk__in=parsed)
+            found = set(items.values_list('pk', flat=True))
+            missing = sorted(set(parsed) - found)
+            if missing and self.is_atomic(request):
+                return Response({'deleted': 0, 'missing': missing}, status=status.HTTP_400_BAD_REQUEST)
+            items.delete()
+        return Response({'deleted': len(found), 'missing': missing})
+
+    def get_items(self, request, allow_files=False):
+        files = request.FILES.getlist('images') if allow_files else []
+        if files:
+            shared = {key: value for key, value in request.data.items() if key != 'images'}
+            items = [{**shared, 'media_type': 'photo', 'image': file} for file in files]
+        else:
+            items = request.data
+        if not isinstance(items, list) or not items:
+            raise serializers.ValidationError({'items': 'Expected a non-empty list of items.'})
+        if len(items) > self.max_items:
+            raise serializers.ValidationError({'items': f'At most {self.max_items} items per request.'})
+        return items
+
+    def preload_events(self, items):
+        ids = {self.parse_id(item.get('event')) for item in items if isinstance(item, dict)}
+        ids.discard(None)
+        return {'event': EventGallery.objects.in_bulk(ids) if ids else {}}
+
+    @staticmethod
+    def parse_id(value):
+        if isinstance(value, bool):
+            return None
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return None
+
+    @staticmethod
+    def is_atomic(request):
+        return request.query_params.get('atomic', '').lower() in ('1', 'true', 'yes')
+
+
+def upload_response(data, upload, status_code=status.HTTP_200_OK):
+    response = Response(data, status=status_code)
+    response['Upload-Offset'] = str(upload.offset)
+    return response
+
+
+class ChunkedUploadAPIView(views.APIView):
+    """
+    POST /api/uploads/ {"filename", "size", "title"?, "event"?, "is_published"?}
+    starts a resumable photo upload. Send the bytes with PATCH to
+    /api/uploads/<id>/ and POST /api/uploads/<id>/finalize/ to create the
+    MediaItem.
+    """
+
+    def post(self, request):
+        serializer = ChunkedUploadSerializer(data=request.data)
+        if serializer.is_valid():
+            upload = serializer.save()
+            uploads.create_part(upload)
+            return upload_response(serializer.data, upload, status.HTTP_201_CREATED)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class ChunkedUploadDetailAPIView(views.APIView):
+    """
+    GET    - current offset, to resume after a failure
+    PATCH  - append the raw request body at the `Upload-Offset` header;
+             409 with the real offset if it does not match
+    DELETE - abandon the upload
+    """
+    throttle_scope = 'uploads'
+
+    def get_object(self, pk):
+        try:
+            return ChunkedUpload.objects.get(pk=pk)
+        except ChunkedUpload.DoesNotExist:
+            return None
+
+    def get(self, request, pk):
+        upload = self.get_object(pk)
+        if upload is None:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+        return upload_response(ChunkedUploadSerializer(upload).data, upload)
+
+    def patch(self, request, pk):
+        try:
+            offset = int(request.headers['Upload-Offset'])
+            length = int(request.headers['Content-Length'])
+        except (KeyError, ValueError):
+            raise serializers.ValidationError({'Upload-Offset': 'Upload-Offset and Content-Length headers are required.'})
+        if offset < 0 or length <= 0:
+            raise serializers.ValidationError({'Upload-Offset': 'Expected a non-empty chunk at a non-negative offset.'})
+        try:
+            upload = uploads.append_chunk(pk, offset, request.stream, length)
+        except ChunkedUpload.DoesNotExist:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+        except uploads.OffsetMismatch as exc:
+            response = Response({'detail': str(exc), 'offset': exc.offset}, status=status.HTTP_409_CONFLICT)
+            response['Upload-Offset'] = str(exc.offset)
+            return response
+        except uploads.ChunkTooLarge:
+            return Response(
+                {'detail': 'Chunk is larger than allowed or runs past the upload size.'},
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            )
+        return upload_response(ChunkedUploadSerializer(upload).data, upload)
+
+    def delete(self, request, pk):
+        upload = self.get_object(pk)
+        if upload is None:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+        uploads.discard(upload)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class ChunkedUploadFinalizeAPIView(views.APIView):
+    """POST /api/uploads/<id>/finalize/ - turn a complete upload into a photo MediaItem."""
+
+    def post(self, request, pk):
+        try:
+            upload = ChunkedUpload.objects.get(pk=pk)
+        except ChunkedUpload.DoesNotExist:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+        if not upload.is_complete:
+            return upload_response(
+                {'detail': f'Upload has {upload.offset} of {upload.size} bytes.', 'offset': upload.offset},
+                upload,
+                status.HTTP_409_CONFLICT,
+            )
+
+        image = uploads.assembled_file(upload)
+        try:
+            serializer = MediaItemSerializer(data={**upload.media_fields, 'media_type': 'photo', 'image': image})
+            if not serializer.is_valid():
+                uploads.discard(upload)
+                return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+            with transaction.atomic():
+                serializer.save()
+                uploads.discard(upload)
+        finally:
+            image.close()
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
 class MediaItemDetailAPIView(views.APIView):
     def get_object(self, pk):
         try:
@@ -302,8 +712,12 @@ class MediaItemDetailAPIView(views.APIView):
         item = self.get_object(pk)
         if item is None:
             return Response(status=status.HTTP_404_NOT_FOUND)
+        validators = Validators.for_object(request, item)
+        not_modified = validators.check(request)
+        if not_modified is not None:
+            return not_modified
         serializer = MediaItemSerializer(item)
-        return Response(serializer.data)
+        return validators.apply(Response(serializer.data))
 
     def put(self, request, pk):
         item = self.get_object(pk)
@@ -324,10 +738,30 @@ class MediaItemDetailAPIView(views.APIView):
 
 
 class EventGalleryAPIView(views.APIView):
+    ordering = ('-created_at', 'id')
+
+    @cache_response(EventGallery, MediaItem)
     def get(self, request):
         galleries = EventGallery.objects.all()
-        serializer = EventGallerySerializer(galleries, many=True)
-        return Response(serializer.data)
+        related = ()
+        serializer_class = EventGallerySerializer
+        if 'media_items' in gallery_includes(request):
+            serializer_class = EventGalleryWithMediaSerializer
+            related = (MediaItem.published.filter(event__in=galleries),)
+            galleries = galleries.prefetch_related(published_media_prefetch(request))
+        selection = serializer_class.get_sparse_fieldset(request)
+        galleries = serializer_class.restrict_queryset(galleries, selection, required=self.ordering)
+        validators = Validators.for_queryset(request, galleries, *related)
+        not_modified = validators.check(request)
+        if not_modified is not None:
+            return not_modified
+        paginator = KeysetPagination(self.ordering)
+        page = paginator.paginate_queryset(galleries, request, view=self)
+        if page is not None:
+            serializer = serializer_class(page, many=True, **selection)
+            return validators.apply(paginator.get_paginated_response(serializer.data))
+        serializer = serializer_class(galleries.order_by(*self.ordering), many=True, **selection)
+        return validators.apply(Response(serializer.data))
 
     def post(self, request):
         serializer = EventGallerySerializer(data=request.data)
@@ -348,8 +782,12 @@ class EventGalleryDetailAPIView(views.APIView):
         gallery = self.get_object(pk)
         if gallery is None:
             return Response(status=status.HTTP_404_NOT_FOUND)
+        validators = Validators.for_object(request, gallery)
+        not_modified = validators.check(request)
+        if not_modified is not None:
+            return not_modified
         serializer = EventGallerySerializer(gallery)
-        return Response(serializer.data)
+        return validators.apply(Response(serializer.data))
 
     def put(self, request, pk):
         gallery = self.get_object(pk)
@@ -371,9 +809,170 @@ class EventGalleryDetailAPIView(views.APIView):
 
 class EventGalleryBySlugAPIView(views.APIView):
     def get(self, request, slug):
+        galleries = EventGallery.objects.all()
+        include_media = 'media_items' in gallery_includes(request)
+        if include_media:
+            galleries = galleries.prefetch_related(published_media_prefetch(request))
         try:
-            gallery = EventGallery.objects.get(slug__iexact=slug)
+            gallery = galleries.get(slug=slug)
         except EventGallery.DoesNotExist:
             return Response(status=status.HTTP_404_NOT_FOUND)
-        serializer = EventGallerySerializer(gallery)
-        return Response(serializer.data)
\ No newline at end of file
+        if include_media:
+            validators = Validators.for_objects(request, gallery._meta.label, [gallery, *gallery.published_media_items])
+        else:
+            validators = Validators.for_object(request, gallery)
+        not_modified = validators.check(request)
+        if not_modified is not None:
+            return not_modified
+        if include_media:
+            serializer = EventGalleryWithMediaSerializer(gallery)
+        else:
+            serializer = EventGallerySerializer(gallery)
+        return validators.apply(Response(serializer.data))
+
+
+class LayoutBundleAPIView(views.APIView):
+    """
+    Everything the layout and home page render, in one response: the contact
+    page, active social links, the latest news, active classes and published
+    pages. Each model is read with a single query.
+    """
+    contact_slug = 'contact'
+    default_news_limit = 3
+    max_news_limit = 20
+
+    @cache_response(Page, SocialLink, NewsPost, ClassSection)
+    def get(self, request):
+        pages = list(
+            Page.objects.filter(Q(is_published=True) | Q(slug=self.contact_slug)).order_by('order', 'id')
+        )
+        links = list(SocialLink.active.order_by('order', 'id'))
+        posts = list(
+            NewsPost.published.order_by('-published_at', 'id')[:self.get_news_limit(request)]
+        )
+        sections = list(ClassSection.active.order_by('order', 'id'))
+
+        validators = Validators.for_objects(request, 'layout', pages + links + posts + sections)
+        not_modified = validators.check(request)
+        if not_modified is not None:
+            return not_modified
+
+        exclusions = page_exclusions(request)
+        contact = next((page for page in pages if page.slug == self.contact_slug), None)
+        listed = [page for page in pages if page.is_published and not is_page_excluded(page, exclusions)]
+        return validators.apply(Response({
+            'contact_page': PageSerializer(contact).data if contact else None,
+            'social_links': SocialLinkSerializer(links, many=True).data,
+            'news_posts': NewsPostSerializer(posts, many=True).data,
+            'class_sections': ClassSectionSerializer(sections, many=True).data,
+            'pages': PageSerializer(listed, many=True).data,
+        }))
+
+    def get_news_limit(self, request):
+        try:
+            limit = int(request.query_params['news_limit'])
+        except (KeyError, ValueError):
+            return self.default_news_limit
+        return max(0, min(limit, self.max_news_limit))
+
+
+class SearchAPIView(views.APIView):
+    """
+    GET /api/search/?q=...&type=page,news,class&limit=20
+
+    Ranked full-text matches over published pages, published news and active
+    classes, with <mark>-highlighted titles and snippets. Not response-cached:
+    free-text queries would only churn the cache's variant index.
+    """
+    default_limit = 20
+    max_limit = 50
+    kinds = ('page', 'news', 'class')
+
+    def get(self, request):
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            raise serializers.ValidationError({'q': 'This parameter is required.'})
+        try:
+            results = search.search(query, kinds=self.get_kinds(request), limit=self.get_limit(request))
+        except search.SearchNotSupported as exc:
+            return Response({'detail': str(exc)}, status=status.HTTP_501_NOT_IMPLEMENTED)
+        return Response({'query': query, 'results': results})
+
+    def get_kinds(self, request):
+        kinds = {name.strip() for name in request.query_params.get('type', '').split(',') if name.strip()}
+        unknown = kinds - set(self.kinds)
+        if unknown:
+            raise serializers.ValidationError({'type': f"Unknown type(s): {', '.join(sorted(unknown))}"})
+        return sorted(kinds)
+
+    def get_limit(self, request):
+        try:
+            limit = int(request.query_params['limit'])
+        except (KeyError, ValueError):
+            return self.default_limit
+        return max(1, min(limit, self.max_limit))
+
+
+class ImageVariantView(View):
+    """
+    GET /api/<media-items|news-posts>/<pk>/image/<descriptor>/ - one size of
+    a row's image in the smallest format the Accept header allows. The URLs
+    handed out by the serializers carry a version, so responses are cached
+    for a year, varying on Accept.
+    """
+    model = None
+    max_age = 365 * 24 * 60 * 60
+
+    def get(self, request, pk, descriptor):
+        srcset = self.model.objects.filter(pk=pk).values_list('image_srcset', flat=True).first()
+        variants = (srcset or {}).get(descriptor)
+        if not variants:
+            raise Http404
+        mime, (name, _) = images.negotiate(variants, request.headers.get('Accept', ''))
+        try:
+            file = default_storage.open(name, 'rb')
+        except FileNotFoundError:
+            raise Http404
+        response = FileResponse(file, content_type=mime)
+        patch_vary_headers(response, ('Accept',))
+        patch_cache_control(response, public=True, max_age=self.max_age, immutable=True)
+        return response
+
+
+class ReorderAPIView(views.APIView):
+    """
+    POST /api/<pages|class-sections|social-links>/reorder/ {"ids": [3, 1, 2]}
+
+    Gives the listed rows positions 1..n in the given order and moves every
+    other row after them, keeping their relative order, in one UPDATE. The
+    others are shifted so the lowest of them lands on n + 1, whatever
+    positions they held before.
+    """
+    model = None
+    max_items = 1000
+
+    def post(self, request):
+        ids = request.data.get('ids') if isinstance(request.data, dict) else None
+        if not isinstance(ids, list) or not ids or len(ids) > self.max_items:
+            raise serializers.ValidationError({'ids': f'Expected a list of 1 to {self.max_items} ids.'})
+        if not all(isinstance(pk, int) and not isinstance(pk, bool) for pk in ids):
+            raise serializers.ValidationError({'ids': 'Every id must be an integer.'})
+        if len(set(ids)) != len(ids):
+            raise serializers.ValidationError({'ids': 'Ids must not repeat.'})
+
+        with transaction.atomic():
+            missing = sorted(set(ids) - set(self.model.objects.filter(pk__in=ids).values_list('pk', flat=True)))
+            if missing:
+                raise serializers.ValidationError({'ids': f"Unknown id(s): {', '.join(map(str, missing))}"})
+            others = self.model.objects.exclude(pk__in=ids).aggregate(low=Min('order'), high=Max('order'))
+            shift = len(ids) + 1 - (others['low'] or 0)
+            positions = [When(pk=pk, then=Value(position)) for position, pk in enumerate(ids, start=1)]
+            self.model.objects.update(
+                order=Case(*positions, default=F('order') + shift),
+                updated_at=timezone.now(),
+            )
+            last = len(ids) if others['high'] is None else others['high'] + shift
+            OrderSequence.advance(self.model, last)
+            purge_cached_responses(self.model)
+            snapshots.schedule(self.model)
+        return Response({'ids': ids})
@@ -10,6 +10,7 @@ export const classSectionsApi = {
   update: (id, data) => client.put(`/class-sections/${id}/`, data),
   patch: (id, data) => client.patch(`/class-sections/${id}/`, data),
   delete: (id) => client.delete(`/class-sections/${id}/`),
+  reorder: (ids) => client.post('/class-sections/reorder/', { ids }),
 };
 
 export const useClassList = (params = {}) => {
@@ -5,7 +5,7 @@ import { queryKeys } from '../queryKeys.js';
 export const eventGalleriesApi = {
   getAll: (params = {}) => client.get('/event-galleries/', params),
   getById: (id) => client.get(`/event-galleries/${id}/`),
-  getBySlug: (slug) => client.get(`/event-galleries/slug/${slug}/`),
+  getBySlug: (slug, params = {}) => client.get(`/event-galleries/slug/${slug}/`, params),
   create: (data) => client.post('/event-galleries/', data),
   update: (id, data) => client.put(`/event-galleries/${id}/`, data),
   patch: (id, data) => client.patch(`/event-galleries/${id}/`, data),
@@ -27,10 +27,10 @@ export const useEventGallery = (id) => {
   });
 };
 
-export const useEventGalleryBySlug = (slug) => {
+export const useEventGalleryBySlug = (slug, params = {}) => {
   return useQuery({
-    queryKey: queryKeys.eventGalleries.bySlug(slug),
-    queryFn: () => eventGalleriesApi.getBySlug(slug),
+    queryKey: [...queryKeys.eventGalleries.bySlug(slug), params],
+    queryFn: () => eventGalleriesApi.getBySlug(slug, params),
     enabled: !!slug,
   });
 };
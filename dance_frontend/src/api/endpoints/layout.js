@@ -0,0 +1,14 @@
+import { useQuery } from '@tanstack/react-query';
+import client from '../client.js';
+import { queryKeys } from '../queryKeys.js';
+
+export const layoutApi = {
+  get: (params = {}) => client.get('/layout/', params),
+};
+
+export const useLayoutBundle = (params = {}) => {
+  return useQuery({
+    queryKey: queryKeys.layout.bundle(params),
+    queryFn: () => layoutApi.get(params),
+  });
+};
@@ -9,6 +9,12 @@ export const mediaItemsApi = {
   update: (id, data) => client.put(`/media-items/${id}/`, data),
   patch: (id, data) => client.patch(`/media-items/${id}/`, data),
   delete: (id) => client.delete(`/media-items/${id}/`),
+  bulkCreate: (items) => client.post('/media-items/bulk/', items),
+  bulkPatch: (items) => client.patch('/media-items/bulk/', items),
+  bulkDelete: (ids) => client.request('/media-items/bulk/', {
+    method: 'DELETE',
+    body: JSON.stringify({ ids }),
+  }),
 };
 
 export const useMediaItemsList = (params = {}) => {
@@ -10,13 +10,13 @@ export const pagesApi = {
   update: (id, data) => client.put(`/pages/${id}/`, data),
   patch: (id, data) => client.patch(`/pages/${id}/`, data),
   delete: (id) => client.delete(`/pages/${id}/`),
+  reorder: (ids) => client.post('/pages/reorder/', { ids }),
 };
 
 export const usePagesList = (params = {}) => {
-  const defaultParams = { exclude_slugs: 'contact,socialmedia', ...params };
   return useQuery({
-    queryKey: queryKeys.pages.list(defaultParams),
-    queryFn: () => pagesApi.getAll(defaultParams),
+    queryKey: queryKeys.pages.list(params),
+    queryFn: () => pagesApi.getAll(params),
   });
 };
 
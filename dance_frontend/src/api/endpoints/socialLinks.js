@@ -9,6 +9,7 @@ export const socialLinksApi = {
   update: (id, data) => client.put(`/social-links/${id}/`, data),
   patch: (id, data) => client.patch(`/social-links/${id}/`, data),
   delete: (id) => client.delete(`/social-links/${id}/`),
+  reorder: (ids) => client.post('/social-links/reorder/', { ids }),
 };
 
 export const useSocialLinksList = (params = {}) => {
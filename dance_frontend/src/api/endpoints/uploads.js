@@ -0,0 +1,60 @@
+import { useMutation, useQueryClient } from '@tanstack/react-query';
+import client from '../client.js';
+import { queryKeys } from '../queryKeys.js';
+
+const DEFAULT_CHUNK_SIZE = 2 * 1024 * 1024;
+const MAX_RETRIES = 5;
+
+export const uploadsApi = {
+  start: (data) => client.post('/uploads/', data),
+  status: (id) => client.get(`/uploads/${id}/`),
+  sendChunk: (id, offset, chunk) => client.request(`/uploads/${id}/`, {
+    method: 'PATCH',
+    headers: {
+      'Content-Type': 'application/offset+octet-stream',
+      'Upload-Offset': String(offset),
+    },
+    body: chunk,
+  }),
+  finalize: (id) => client.post(`/uploads/${id}/finalize/`),
+  abort: (id) => client.delete(`/uploads/${id}/`),
+};
+
+/**
+ * Upload a photo in chunks, resuming from the server's offset after a failed
+ * chunk, and return the created media item.
+ * @param {File} file - Image file to upload
+ * @param {Object} fields - MediaItem fields: title, event, is_published
+ * @param {Object} options - chunkSize in bytes, onProgress(sent, total) callback
+ */
+export const uploadInChunks = async (file, fields = {}, { chunkSize = DEFAULT_CHUNK_SIZE, onProgress } = {}) => {
+  const upload = await uploadsApi.start({ filename: file.name, size: file.size, ...fields });
+  let offset = upload.offset;
+  let retries = 0;
+
+  while (offset < file.size) {
+    try {
+      const result = await uploadsApi.sendChunk(upload.id, offset, file.slice(offset, offset + chunkSize));
+      offset = result.offset;
+      retries = 0;
+      onProgress?.(offset, file.size);
+    } catch (error) {
+      if (++retries > MAX_RETRIES) throw error;
+      await new Promise((resolve) => setTimeout(resolve, 500 * 2 ** retries));
+      offset = (await uploadsApi.status(upload.id)).offset;
+    }
+  }
+
+  return uploadsApi.finalize(upload.id);
+};
+
+export const useChunkedUpload = () => {
+  const queryClient = useQueryClient();
+
+  return useMutation({
+    mutationFn: ({ file, fields, options }) => uploadInChunks(file, fields, options),
+    onSuccess: () => {
+      queryClient.invalidateQueries({ queryKey: queryKeys.mediaItems.lists() });
+    },
+  });
+};
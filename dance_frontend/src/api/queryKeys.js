@@ -51,4 +51,8 @@ export const queryKeys = {
     detail: (id) => [...queryKeys.eventGalleries.details(), id],
     bySlug: (slug) => [...queryKeys.eventGalleries.all, 'slug', slug],
   },
+  layout: {
+    all: ['layout'],
+    bundle: (params) => [...queryKeys.layout.all, 'bundle', params],
+  },
 }
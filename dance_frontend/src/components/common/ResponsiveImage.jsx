@@ -0,0 +1,37 @@
+import React from 'react';
+
+/**
+ * ResponsiveImage component - Image that lets the browser pick a resized copy
+ * @param {Object} props - Component props
+ * @param {string} props.src - Original image URL, used when no sizes are available
+ * @param {Object} props.srcSet - API `image_srcset` map of width descriptor to URL, e.g. { '320w': url }
+ * @param {string} props.sizes - Rendered width of the image, e.g. '(min-width: 768px) 33vw, 100vw'
+ * @param {string} props.alt - Alternative text
+ * @returns {JSX.Element} Image element
+ */
+const ResponsiveImage = ({
+  src,
+  srcSet = {},
+  sizes = '100vw',
+  alt = '',
+  ...props
+}) => {
+  const candidates = Object.entries(srcSet || {})
+    .sort(([a], [b]) => parseInt(a, 10) - parseInt(b, 10))
+    .map(([width, url]) => `${url} ${width}`)
+    .join(', ');
+
+  return (
+    <img
+      src={src}
+      srcSet={candidates || undefined}
+      sizes={candidates ? sizes : undefined}
+      alt={alt}
+      loading="lazy"
+      decoding="async"
+      {...props}
+    />
+  );
+};
+
+export default ResponsiveImage;
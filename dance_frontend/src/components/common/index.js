@@ -2,4 +2,5 @@
 export { default as Loading } from './Loading';
 export { default as ErrorMessage } from './ErrorMessage';
 export { default as EmptyState } from './EmptyState';
-export { default as EmptyStatePresets } from './EmptyStatePresets';
\ No newline at end of file
+export { default as EmptyStatePresets } from './EmptyStatePresets';
+export { default as ResponsiveImage } from './ResponsiveImage';
@@ -1,12 +1,12 @@
 import React from 'react';
 import { Link } from 'react-router-dom';
 import { textVariants } from '../../styles/designSystem';
-import { usePageBySlug } from '../../api/endpoints/pages';
-import { useSocialLinksList } from '../../api/endpoints/socialLinks';
+import { useLayoutBundle } from '../../api/endpoints/layout';
 
 function Footer() {
-  const { data: contactPage } = usePageBySlug('contact');
-  const { data: socialLinks } = useSocialLinksList();
+  const { data: layout } = useLayoutBundle();
+  const contactPage = layout?.contact_page;
+  const socialLinks = layout?.social_links;
 
   return (
     <footer className="bg-neutral-50 border-t border-neutral-200">
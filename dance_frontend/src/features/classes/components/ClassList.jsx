@@ -5,7 +5,7 @@ import { Loading, ErrorMessage, EmptyStatePresets } from '../../../components/co
 import { textVariants, cardVariants } from '../../../styles/designSystem';
 
 const ClassList = () => {
-  const { data: classes, isLoading, error } = useClassList();
+  const { data: classes, isLoading, error } = useClassList({ omit: 'description' });
 
   if (isLoading) {
     return <Loading size="medium" text="Loading classes..." />;
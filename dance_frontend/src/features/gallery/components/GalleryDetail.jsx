@@ -1,12 +1,12 @@
 import React from 'react';
 import { useParams, Link } from 'react-router-dom';
 import { useEventGalleryBySlug } from '../../../api/endpoints/eventGalleries';
-import { Loading, ErrorMessage } from '../../../components/common';
+import { Loading, ErrorMessage, ResponsiveImage } from '../../../components/common';
 import { textVariants, buttonVariants } from '../../../styles/designSystem';
 
 const GalleryDetail = () => {
   const { slug } = useParams();
-  const { data: gallery, isLoading, error } = useEventGalleryBySlug(slug);
+  const { data: gallery, isLoading, error } = useEventGalleryBySlug(slug, { include: 'media_items' });
 
   if (isLoading) {
     return <Loading size="medium" text="Loading gallery..." />;
@@ -56,8 +56,10 @@ const GalleryDetail = () => {
           gallery.media_items.map((item) => (
             <div key={item.id} className="aspect-square bg-gray-200 rounded-lg overflow-hidden">
               {item.media_type === 'photo' && item.image && (
-                <img 
-                  src={item.image} 
+                <ResponsiveImage
+                  src={item.image}
+                  srcSet={item.image_srcset}
+                  sizes="(min-width: 1024px) 33vw, (min-width: 640px) 50vw, 100vw"
                   alt={item.title || 'Gallery image'}
                   className="w-full h-full object-cover"
                 />
@@ -1,7 +1,7 @@
 import React from 'react';
 import { useParams, Link } from 'react-router-dom';
 import { useNewsPostBySlug } from '../../../api/endpoints/newsPosts';
-import { Loading, ErrorMessage } from '../../../components/common';
+import { Loading, ErrorMessage, ResponsiveImage } from '../../../components/common';
 import { textVariants, buttonVariants } from '../../../styles/designSystem';
 
 const NewsDetail = () => {
@@ -52,8 +52,11 @@ const NewsDetail = () => {
       )}
 
       {post.image && (
-        <img 
-          src={post.image} 
+        <ResponsiveImage
+          src={post.image}
+          srcSet={post.image_srcset}
+          sizes="(min-width: 672px) 672px, 100vw"
+          loading="eager"
           alt={post.title}
           className="w-full max-w-2xl h-auto rounded-lg mb-8"
         />
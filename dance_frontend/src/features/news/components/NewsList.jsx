@@ -1,7 +1,7 @@
 import React from 'react';
 import { Link } from 'react-router-dom';
 import { useNewsList } from '../../../api/endpoints/newsPosts';
-import { Loading, ErrorMessage, EmptyStatePresets } from '../../../components/common';
+import { Loading, ErrorMessage, EmptyStatePresets, ResponsiveImage } from '../../../components/common';
 import { textVariants, cardVariants } from '../../../styles/designSystem';
 
 const NewsList = () => {
@@ -38,8 +38,10 @@ const NewsList = () => {
             <div className="flex flex-col md:flex-row gap-6">
               {post.image && (
                 <div className="md:w-1/3">
-                  <img 
-                    src={post.image} 
+                  <ResponsiveImage
+                    src={post.image}
+                    srcSet={post.image_srcset}
+                    sizes="(min-width: 768px) 33vw, 100vw"
                     alt={post.title}
                     className="w-full h-48 md:h-full object-cover rounded-lg"
                   />
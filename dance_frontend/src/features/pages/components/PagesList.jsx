@@ -16,7 +16,7 @@ const getLink = (slug) => {
 };
 
 const PagesList = () => {
-  const { data: pages, isLoading, error } = usePagesList();
+  const { data: pages, isLoading, error } = usePagesList({ fields: 'id,title,slug,excerpt' });
 
   if (isLoading) {
     return <Loading size="medium" text="Loading pages..." />;